@@ -0,0 +1,176 @@
+# asset_loader.py - 集中式素材載入器
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class AssetLoader:
+    """在執行緒池解碼圖片和音效，並依路徑去除重複載入
+
+    解碼（PNG/WAV）在背景執行緒進行；convert_alpha 和縮放只在主執行緒執行。
+    """
+
+    IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or min(8, os.cpu_count() or 2)
+        self.executor = None
+        self.lock = threading.Lock()
+
+        self.futures = {}  # (類型, 路徑) -> Future（所有請求過的素材）
+        self.images = {}   # 路徑 -> 已 convert_alpha 的 Surface
+        self.sounds = {}   # 路徑 -> pygame.mixer.Sound
+
+    def normalize_path(self, path):
+        """統一路徑格式，讓相同檔案只載入一次"""
+        return os.path.normcase(os.path.abspath(path))
+
+    def get_executor(self):
+        """第一次使用時才建立執行緒池"""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix="asset_loader")
+        return self.executor
+
+    def submit(self, kind, path, decode):
+        """提交解碼工作，相同路徑重複請求時回傳同一個 Future"""
+        key = (kind, self.normalize_path(path))
+        with self.lock:
+            future = self.futures.get(key)
+            if future is None:
+                future = self.get_executor().submit(decode, path)
+                self.futures[key] = future
+            return future
+
+    # ======= 預先載入（背景解碼） =======
+    def request_image(self, path):
+        """在背景解碼圖片"""
+        return self.submit("image", path, pygame.image.load)
+
+    def request_sound(self, path):
+        """在背景解碼音效"""
+        return self.submit("sound", path, pygame.mixer.Sound)
+
+    def request_file(self, path):
+        """在背景讀取檔案內容（例如已烘焙的精靈圖）"""
+        return self.submit("file", path, read_file)
+
+    def prefetch_directory(self, directory, skip=()):
+        """預先解碼資料夾（含子資料夾）中的所有圖片，skip 中的路徑（已正規化）會略過"""
+        count = 0
+        if not os.path.isdir(directory):
+            return count
+
+        for root, _, files in os.walk(directory):
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                if filename.lower().endswith(self.IMAGE_EXTENSIONS) and self.normalize_path(path) not in skip:
+                    self.request_image(path)
+                    count += 1
+        return count
+
+    # ======= 取得素材（主執行緒） =======
+    def load_image(self, path, cache=True):
+        """取得已轉換格式的圖片，尚未解碼時會等待背景工作完成
+
+        回傳的 Surface 是共用的，呼叫端應縮放或複製後再修改。
+        cache=False 時由呼叫端接手（例如精靈圖登錄表），載入器不再保留。
+        """
+        key = self.normalize_path(path)
+        if not cache:
+            image = self.images.pop(key, None)
+            with self.lock:
+                future = self.futures.pop(("image", key), None)
+            if image is not None:
+                return image
+            if future is None:
+                future = self.get_executor().submit(pygame.image.load, path)
+            return self.convert_image(future.result())
+
+        image = self.images.get(key)
+        if image is not None:
+            return image
+
+        image = self.convert_image(self.request_image(path).result())
+        self.images[key] = image
+        return image
+
+    def convert_image(self, image):
+        """轉換成顯示格式（需要已建立的顯示視窗，無頭模式下保留原始格式）"""
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            return image.convert_alpha()
+        return image
+
+    def load_scaled_image(self, path, size):
+        """取得縮放後的圖片（每次都會產生新的 Surface）"""
+        return pygame.transform.scale(self.load_image(path), size)
+
+    def load_sound(self, path):
+        """取得音效，尚未解碼時會等待背景工作完成"""
+        key = self.normalize_path(path)
+        sound = self.sounds.get(key)
+        if sound is None:
+            sound = self.request_sound(path).result()
+            self.sounds[key] = sound
+        return sound
+
+    def load_file(self, path):
+        """取得檔案內容，結果交給呼叫端（不保留在快取中）"""
+        with self.lock:
+            future = self.futures.pop(("file", self.normalize_path(path)), None)
+        if future is None:
+            return read_file(path)
+        return future.result()
+
+    def finish_pending_images(self):
+        """在主執行緒轉換所有已請求的圖片（會等待尚未完成的解碼）"""
+        for kind, key in list(self.futures):
+            if kind == "image" and key not in self.images:
+                try:
+                    self.load_image(key)
+                except Exception as e:
+                    print(f"❌ 載入圖片失敗: {key} - {e}")
+
+    # ======= 進度 =======
+    def get_progress(self):
+        """回傳 (完成數, 總數)"""
+        with self.lock:
+            futures = list(self.futures.values())
+        done = sum(1 for future in futures if future.done())
+        return done, len(futures)
+
+    def is_idle(self):
+        """所有背景工作都已完成"""
+        done, total = self.get_progress()
+        return done == total
+
+    def clear_images(self):
+        """清除圖片快取，下次載入會重新讀取檔案（用於熱更新）"""
+        with self.lock:
+            for key in [key for key in self.futures if key[0] == "image"]:
+                del self.futures[key]
+        self.images.clear()
+
+    def clear(self):
+        """清除所有快取"""
+        with self.lock:
+            self.futures.clear()
+        self.images.clear()
+        self.sounds.clear()
+
+    def shutdown(self):
+        """關閉執行緒池"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+# 全域素材載入器實例
+asset_loader = AssetLoader()
@@ -2,6 +2,48 @@
 import pygame
 import os
 from font_manager import font_manager
+from sprite_registry import sprite_registry
+
+# 🆕 角色資料（模組常數，平衡工具等不需要畫面的程式也能讀取）
+CHARACTERS = [
+    {
+        "name": "學生A",
+        "description": "普通的交大學生，\n有著堅強的意志力",
+        "sprite_paths": {
+            "down": "assets/images/player/student_a_down.png",
+            "up": "assets/images/player/student_a_up.png",
+            "left": "assets/images/player/student_a_left.png",
+            "right": "assets/images/player/student_a_right.png"
+        },
+        "fallback_path": "assets/images/player/student_a.png",
+        "stats": {"hp": 100, "speed": 8}
+    },
+    {
+        "name": "學生B", 
+        "description": "運動系的學生，\n體力充沛，行動敏捷",
+        "sprite_paths": {
+            "down": "assets/images/player/student_b_down.png",
+            "up": "assets/images/player/student_b_up.png", 
+            "left": "assets/images/player/student_b_left.png",
+            "right": "assets/images/player/student_b_right.png"
+        },
+        "fallback_path": "assets/images/player/student_b.png",
+        "stats": {"hp": 120, "speed": 10}
+    },
+    {
+        "name": "學生C",
+        "description": "理工科系學生，\n聰明機智，善於分析",
+        "sprite_paths": {
+            "down": "assets/images/player/student_c_down.png",
+            "up": "assets/images/player/student_c_up.png",
+            "left": "assets/images/player/student_c_left.png", 
+            "right": "assets/images/player/student_c_right.png"
+        },
+        "fallback_path": "assets/images/player/student_c.png",
+        "stats": {"hp": 90, "speed": 8}  # 🔧 修復：改為8避免移動問題
+    }
+]
+
 
 class CharacterSelector:
     def __init__(self, screen):
@@ -14,47 +56,12 @@ class CharacterSelector:
         self.character_selected = False  # 是否已經選擇完成
         
         # 角色資料
-        self.characters = [
-            {
-                "name": "學生A",
-                "description": "普通的交大學生，\n有著堅強的意志力",
-                "sprite_paths": {
-                    "down": "assets/images/player/student_a_down.png",
-                    "up": "assets/images/player/student_a_up.png",
-                    "left": "assets/images/player/student_a_left.png",
-                    "right": "assets/images/player/student_a_right.png"
-                },
-                "fallback_path": "assets/images/player/student_a.png",
-                "stats": {"hp": 100, "speed": 8}
-            },
-            {
-                "name": "學生B", 
-                "description": "運動系的學生，\n體力充沛，行動敏捷",
-                "sprite_paths": {
-                    "down": "assets/images/player/student_b_down.png",
-                    "up": "assets/images/player/student_b_up.png", 
-                    "left": "assets/images/player/student_b_left.png",
-                    "right": "assets/images/player/student_b_right.png"
-                },
-                "fallback_path": "assets/images/player/student_b.png",
-                "stats": {"hp": 120, "speed": 10}
-            },
-            {
-                "name": "學生C",
-                "description": "理工科系學生，\n聰明機智，善於分析",
-                "sprite_paths": {
-                    "down": "assets/images/player/student_c_down.png",
-                    "up": "assets/images/player/student_c_up.png",
-                    "left": "assets/images/player/student_c_left.png", 
-                    "right": "assets/images/player/student_c_right.png"
-                },
-                "fallback_path": "assets/images/player/student_c.png",
-                "stats": {"hp": 90, "speed": 8}  # 🔧 修復：改為8避免移動問題
-            }
-        ]
+        self.characters = CHARACTERS
         
         # 載入角色預覽圖片
         self.character_sprites = {}
+        self.preview_size = (64, 80)
+        self.sprite_keys = []  # 🆕 從共用登錄表取得的鍵
         self.load_character_previews()
         
         # UI設定
@@ -72,6 +79,9 @@ class CharacterSelector:
         
         self.animation_timer = 0
         
+        # 🆕 髒矩形追蹤
+        self.last_dirty_signature = None
+        
         print("🎭 角色選擇器初始化完成")
     
     def load_character_previews(self):
@@ -86,11 +96,8 @@ class CharacterSelector:
             for direction, path in character["sprite_paths"].items():
                 if os.path.exists(path):
                     try:
-                        sprite = pygame.image.load(path).convert_alpha()
                         # 縮放到預覽大小 (較大一點以便顯示)
-                        preview_size = (64, 80)
-                        sprite = pygame.transform.scale(sprite, preview_size)
-                        character_sprites[direction] = sprite
+                        character_sprites[direction] = self.acquire_sprite(path)
                         sprites_loaded += 1
                         print(f"  ✅ 載入角色{i+1} {direction}圖片: {path}")
                     except Exception as e:
@@ -101,15 +108,13 @@ class CharacterSelector:
                 fallback_path = character["fallback_path"]
                 if os.path.exists(fallback_path):
                     try:
-                        base_sprite = pygame.image.load(fallback_path).convert_alpha()
-                        preview_size = (64, 80)
-                        base_sprite = pygame.transform.scale(base_sprite, preview_size)
+                        base_sprite = self.acquire_sprite(fallback_path)
                         
                         # 為所有方向使用同一張圖片
                         character_sprites["down"] = base_sprite
                         character_sprites["up"] = base_sprite
                         character_sprites["right"] = base_sprite
-                        character_sprites["left"] = pygame.transform.flip(base_sprite, True, False)
+                        character_sprites["left"] = self.acquire_sprite(fallback_path, "flip_x")
                         sprites_loaded = 4
                         print(f"  ✅ 載入角色{i+1}備用圖片: {fallback_path}")
                     except Exception as e:
@@ -123,6 +128,18 @@ class CharacterSelector:
             self.character_sprites[i] = character_sprites
             print(f"  📋 角色{i+1} ({character['name']}) 載入完成")
     
+    def acquire_sprite(self, path, transform=None):
+        """🆕 從共用登錄表取得預覽大小的圖片"""
+        sprite = sprite_registry.acquire(path, self.preview_size, transform)
+        self.sprite_keys.append(sprite_registry.make_key(path, self.preview_size, transform))
+        return sprite
+    
+    def release_sprites(self):
+        """🆕 釋放預覽圖片（角色選擇結束後呼叫）"""
+        sprite_registry.release_all(self.sprite_keys)
+        self.sprite_keys = []
+        self.character_sprites.clear()
+    
     def create_default_character_sprite(self, character_index):
         """創建預設角色圖片"""
         sprites = {}
@@ -235,6 +252,18 @@ class CharacterSelector:
             scale_diff = target_scale - current_scale
             self.hover_scale[i] += scale_diff * 0.1
     
+    def get_dirty_rects(self):
+        """🆕 回報本幀有變化的區域 - 卡片區域有發光與縮放動畫"""
+        signature = (self.active, self.selected_character)
+        if signature != self.last_dirty_signature:
+            self.last_dirty_signature = signature
+            return [self.screen.get_rect()]
+        
+        # 放大1.1倍的卡片、發光邊框和下方的選擇指示器
+        margin = 30
+        return [pygame.Rect(self.cards_start_x - margin, self.cards_y - margin,
+                            self.total_cards_width + margin * 2, self.card_height + margin * 3)]
+    
     def render(self):
         """渲染角色選擇畫面"""
         if not self.active:
@@ -1,9 +1,23 @@
 import pygame
-import random
 from font_manager import font_manager  # 添加這行導入
+from scheduler import Scheduler
+from rng_service import rng_service
+from game_logger import game_logger
+
+# 🆕 戰鬥公式參數（平衡模擬工具 tools/combat_balance.py 使用同一組數值）
+PLAYER_DAMAGE_RANGE = (8, 15)   # 玩家基礎傷害
+CRITICAL_CHANCE = 0.15          # 暴擊率
+CRITICAL_MULTIPLIER = 1.5       # 暴擊倍率
+ENEMY_DAMAGE_SPREAD = 2         # 敵人傷害 = 攻擊力 ± 2
+ESCAPE_CHANCE = 0.6             # 逃跑成功率
 
 class CombatSystem:
     def __init__(self):
+        # 🆕 戰鬥計時器：只在戰鬥更新時推進，戰鬥以外時間暫停
+        self.timers = Scheduler()
+        self.animation_countdown = None
+        self.shake_countdown = None
+        
         self.in_combat = False
         self.current_enemy = None
         self.player_turn = True
@@ -14,6 +28,13 @@ class CombatSystem:
         # 戰鬥動畫
         self.shake_timer = 0
         self.shake_intensity = 0
+        self.rng = rng_service.stream("combat")  # 🆕 戰鬥專用亂數串流
+        self.effect_rng = rng_service.stream("effects")  # 🆕 畫面震動用的獨立亂數，渲染不影響遊戲邏輯的亂數序列
+        
+        # 🆕 髒矩形追蹤
+        self.last_screen_rect = pygame.Rect(0, 0, 1024, 768)
+        self.last_dirty_signature = None
+        self.was_shaking = False
         
         # 修復：使用 font_manager 而不是直接使用 pygame.font
         # 這樣可以確保中文字體正常顯示
@@ -22,8 +43,7 @@ class CombatSystem:
         # self.font_small = pygame.font.Font(None, 18)   # 刪除這行
 
     def start_combat(self, enemy):
-        print(f"🔥 開始戰鬥初始化...")
-        print(f"  敵人: {enemy['name']}")
+        game_logger.info("combat", "🔥 開始戰鬥: %s", enemy['name'])
         
         self.in_combat = True
         self.current_enemy = enemy.copy()
@@ -33,59 +53,54 @@ class CombatSystem:
         self.animation_timer = 0
         self.combat_result = None
         
-        print(f"✅ 戰鬥初始化完成:")
-        print(f"  in_combat: {self.in_combat}")
-        print(f"  player_turn: {self.player_turn}")
-        print(f"  敵人血量: {self.current_enemy['hp']}/{self.current_enemy['max_hp']}")
-        print(f"  戰鬥日誌: {len(self.combat_log)} 條")
+        game_logger.debug("combat", "✅ 戰鬥初始化完成: in_combat=%s player_turn=%s 敵人血量 %s/%s",
+                          self.in_combat, self.player_turn, self.current_enemy['hp'], self.current_enemy['max_hp'])
 
     def player_action(self, action):
         """玩家行動 - 修復版"""
-        print(f"🎮 玩家行動: {action}")
-        print(f"  戰鬥中: {self.in_combat}")
-        print(f"  玩家回合: {self.player_turn}")
-        print(f"  當前戰鬥結果: {self.combat_result}")
+        game_logger.debug("combat", "🎮 玩家行動: %s (戰鬥中=%s 玩家回合=%s 戰鬥結果=%s)",
+                          action, self.in_combat, self.player_turn, self.combat_result)
         
         if not self.in_combat or not self.player_turn or self.combat_result:
-            print(f"❌ 行動被拒絕！")
+            game_logger.debug("combat", "❌ 行動被拒絕！")
             return
 
-        print(f"✅ 執行行動: {action}")
+        game_logger.debug("combat", "✅ 執行行動: %s", action)
         
         if action == "attack":
             self.player_attack()
         elif action == "defend":
             self.player_defend()
         elif action == "escape":
-            print("🏃 嘗試逃跑...")
+            game_logger.debug("combat", "🏃 嘗試逃跑...")
             self.player_escape()
             # 如果逃跑成功，直接返回，不進入敵人回合
             if self.combat_result == "escape":
-                print("🏃 逃跑成功，跳過敵人回合")
+                game_logger.debug("combat", "🏃 逃跑成功，跳過敵人回合")
                 return
 
         # 檢查敵人是否死亡
         if self.current_enemy and self.current_enemy["hp"] <= 0:
-            print("💀 敵人被擊敗")
+            game_logger.debug("combat", "💀 敵人被擊敗")
             self.combat_result = "win"
             self.end_combat()
             return
 
         # 只有在沒有戰鬥結果時才進入敵人回合
         if self.in_combat and not self.combat_result:
-            print("👹 準備敵人回合")
+            game_logger.debug("combat", "👹 準備敵人回合")
             self.player_turn = False
             self.animation_timer = 60  # 1秒延遲
 
     def player_attack(self):
         # 計算傷害
-        base_damage = random.randint(8, 15)
+        base_damage = self.rng.randint(*PLAYER_DAMAGE_RANGE)
         damage = max(1, base_damage - self.current_enemy["defense"])
         
         # 暴擊機率
-        is_critical = random.random() < 0.15  # 15%暴擊率
+        is_critical = self.rng.random() < CRITICAL_CHANCE
         if is_critical:
-            damage = int(damage * 1.5)
+            damage = int(damage * CRITICAL_MULTIPLIER)
             self.combat_log.append(f"暴擊！造成 {damage} 點傷害！")
         else:
             self.combat_log.append(f"造成 {damage} 點傷害！")
@@ -96,32 +111,27 @@ class CombatSystem:
 
     def player_defend(self):
         # 防禦回復少量血量
-        heal_amount = random.randint(5, 10)
+        heal_amount = self.rng.randint(5, 10)
         self.combat_log.append(f"防禦姿態，回復 {heal_amount} 點血量！")
         # 這裡需要game_state來回復血量，暫時記錄
         self.combat_log.append("下回合受到傷害減半！")
 
     def player_escape(self):
         """玩家逃跑 - 修復版"""
-        import time
-        import random
-        
-        # 添加時間種子確保真正的隨機
-        random.seed(int(time.time() * 1000000) % 2147483647)
-        
-        escape_chance = 0.6  # 60%逃跑成功率
-        random_value = random.random()
+        # 🔧 不再用時間重設全域隨機種子，否則整局遊戲無法重現
+        escape_chance = ESCAPE_CHANCE
+        random_value = self.rng.random()
         
-        print(f"🎲 逃跑隨機值: {random_value:.3f} (需要 < {escape_chance})")
+        game_logger.debug("combat", "🎲 逃跑隨機值: %.3f (需要 < %s)", random_value, escape_chance)
         
         if random_value < escape_chance:
-            print("✅ 逃跑成功！")
+            game_logger.debug("combat", "✅ 逃跑成功！")
             self.combat_log.append("成功逃跑了！")
             self.combat_result = "escape"
             # 🔥 立即結束，不呼叫 end_combat()🔥
-            print("🏃 逃跑成功，準備立即結束戰鬥")
+            game_logger.debug("combat", "🏃 逃跑成功，準備立即結束戰鬥")
         else:
-            print("❌ 逃跑失敗！")
+            game_logger.debug("combat", "❌ 逃跑失敗！")
             self.combat_log.append("逃跑失敗！")
 
     def enemy_turn(self, game_state):
@@ -129,9 +139,9 @@ class CombatSystem:
             return
 
         # 敵人攻擊
-        enemy_damage = random.randint(
-            self.current_enemy["attack"] - 2,
-            self.current_enemy["attack"] + 2
+        enemy_damage = self.rng.randint(
+            self.current_enemy["attack"] - ENEMY_DAMAGE_SPREAD,
+            self.current_enemy["attack"] + ENEMY_DAMAGE_SPREAD
         )
         actual_damage = game_state.damage_player(enemy_damage)
         self.combat_log.append(f"{self.current_enemy['name']} 攻擊你，造成 {actual_damage} 點傷害！")
@@ -148,51 +158,87 @@ class CombatSystem:
 
     def end_combat(self):
         """戰鬥結束處理 - 無延遲版"""
-        print(f"🏁 戰鬥結束處理，結果: {self.combat_result}")
+        game_logger.info("combat", "🏁 戰鬥結束處理，結果: %s", self.combat_result)
         
         if self.combat_result == "win":
             exp_reward = self.current_enemy.get("exp_reward", 10)
             self.combat_log.append(f"獲得 {exp_reward} 經驗值！")
-            print(f"🎯 戰鬥勝利")
+            game_logger.debug("combat", "🎯 戰鬥勝利")
         elif self.combat_result == "escape":
             self.combat_log.append("成功逃離戰鬥！")
-            print(f"🏃 逃跑成功")
+            game_logger.debug("combat", "🏃 逃跑成功")
         elif self.combat_result == "lose":
             self.combat_log.append("戰鬥失敗...")
-            print(f"💀 戰鬥失敗")
+            game_logger.debug("combat", "💀 戰鬥失敗")
         
         # 🔥 關鍵修復：不設定延遲！🔥
         self.animation_timer = 0  # 設為0，不延遲
-        print(f"⚡ 無延遲結束")
-        print(f"⏰ 顯示結果延遲: {self.animation_timer} 幀")
+        game_logger.debug("combat", "⚡ 無延遲結束")
 
     def update(self, game_state):
         """更新戰鬥狀態 - 完全修復版"""
         if not self.in_combat:
             return
 
-        # 更新動畫計時器
-        if self.animation_timer > 0:
-            self.animation_timer -= 1
+        # 🆕 推進所有戰鬥計時器（動畫延遲、震動）
+        self.timers.tick()
 
         # 敵人回合延遲
         if not self.player_turn and self.animation_timer == 0 and not self.combat_result:
-            print("👹 敵人回合開始")
+            game_logger.debug("combat", "👹 敵人回合開始")
             self.enemy_turn(game_state)
 
-        # 更新震動效果
-        if self.shake_timer > 0:
-            self.shake_timer -= 1
-
         # 限制戰鬥日誌長度
         if len(self.combat_log) > 8:
             self.combat_log.pop(0)
 
+    @property
+    def animation_timer(self):
+        """🆕 動畫延遲剩餘 tick 數（由計時器倒數）"""
+        return self.animation_countdown.remaining if self.animation_countdown else 0
+
+    @animation_timer.setter
+    def animation_timer(self, ticks):
+        if self.animation_countdown:
+            self.animation_countdown.cancel()
+        self.animation_countdown = self.timers.call_later(ticks) if ticks > 0 else None
+
+    @property
+    def shake_timer(self):
+        """🆕 震動剩餘 tick 數（由計時器倒數）"""
+        return self.shake_countdown.remaining if self.shake_countdown else 0
+
+    @shake_timer.setter
+    def shake_timer(self, ticks):
+        if self.shake_countdown:
+            self.shake_countdown.cancel()
+        self.shake_countdown = self.timers.call_later(ticks) if ticks > 0 else None
+
+    def is_animating(self):
+        """🆕 閒置節能：延遲、震動或敵人回合進行中"""
+        return self.animation_timer > 0 or self.shake_timer > 0 or not self.player_turn
+
+    def get_dirty_rects(self, game_state):
+        """🆕 回報本幀有變化的區域（髒矩形模式使用）"""
+        signature = (
+            self.in_combat, self.player_turn, self.combat_result,
+            self.current_enemy["hp"] if self.current_enemy else None,
+            game_state.player_stats["hp"], tuple(self.combat_log)
+        )
+        shaking = self.shake_timer > 0 or self.was_shaking
+        self.was_shaking = self.shake_timer > 0
+        if signature == self.last_dirty_signature and not shaking:
+            return []
+
+        self.last_dirty_signature = signature
+        return [self.last_screen_rect.copy()]
+
     def render(self, screen, game_state):
         if not self.in_combat:
             return
 
         screen_width, screen_height = screen.get_size()
+        self.last_screen_rect = screen.get_rect()
 
         # 戰鬥背景
         combat_bg = pygame.Rect(0, 0, screen_width, screen_height)
@@ -202,8 +248,8 @@ class CombatSystem:
         shake_x = 0
         shake_y = 0
         if self.shake_timer > 0:
-            shake_x = random.randint(-self.shake_intensity, self.shake_intensity)
-            shake_y = random.randint(-self.shake_intensity, self.shake_intensity)
+            shake_x = self.effect_rng.randint(-self.shake_intensity, self.shake_intensity)
+            shake_y = self.effect_rng.randint(-self.shake_intensity, self.shake_intensity)
 
         # 敵人顯示
         enemy_x = screen_width // 2 + shake_x
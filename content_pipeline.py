@@ -0,0 +1,332 @@
+# content_pipeline.py - assets/data 的遊戲內容：驗證、編譯索引、二進位快取
+#
+# 來源 JSON 依 SCHEMAS 驗證，編譯成查詢用的索引（敵人依 id、道具依名稱、對話節點依 id、
+# 樓層的地圖／互動物件／戰鬥區域／地上物品依樓層、劇情事件依 id），結果用 marshal 存到 .cache/content/compiled.bin。
+# 快取以所有來源檔的 SHA-256 為鍵，內容沒變時啟動直接讀快取，不再驗證和編譯。
+import copy
+import hashlib
+import json
+import marshal
+import os
+import struct
+
+from game_logger import game_logger
+
+DEFAULT_DATA_DIR = "assets/data"
+DEFAULT_CACHE_PATH = ".cache/content/compiled.bin"
+
+CACHE_MAGIC = b"CNTC"
+CACHE_VERSION = 3
+CACHE_HEADER = struct.Struct("<4sH32s")  # magic, 版本, 來源雜湊
+
+# 欄位規格：型別，或 [型別 / 子規格] 表示串列；"?" 開頭的欄位可省略，
+# {"*": 子規格} 表示鍵可以任意命名的物件
+SCHEMAS = {
+    "enemy_stats.json": {
+        "name": str,
+        "hp": int,
+        "attack": int,
+        "defense": int,
+        "exp_reward": int,
+        "?description": str,
+    },
+    "item_database.json": {
+        "type": str,
+        "value": int,
+        "description": str,
+    },
+    # 商店資料目前只驗證，遊戲中的商店互動由 dialogues.json 的 shop:<id> 對話處理
+    "shop_data.json": {
+        "name": str,
+        "chinese_name": str,
+        "items": [{"name": str, "price": int, "stock": int}],
+    },
+    # 對話：entry 依序檢查條件決定起始節點；動作和條件的內容由 dialogue_graph.py 編譯時檢查
+    "dialogues.json": {
+        "name": str,
+        "?entry": [{"?when": dict, "node": str}],
+        "nodes": {"*": {
+            "text": str,
+            "options": [{"id": str, "text": str, "?actions": [dict], "?next": str}],
+        }},
+    },
+    # 樓層：鍵是樓層號碼（"1"、"2"…）；互動物件依 type 使用 id/name（商店、NPC）或 direction/target_floor（樓梯）
+    "floors.json": {
+        "name": str,
+        "background_color": [int],
+        "walls": [{"x": int, "y": int, "width": int, "height": int}],
+        "interactions": [{
+            "type": str, "x": int, "y": int, "width": int, "height": int,
+            "?id": str, "?name": str, "?direction": str, "?target_floor": int,
+        }],
+    },
+    # 戰鬥區域：enemies 是 enemy_stats.json 的 id
+    "combat_zones.json": {
+        "floor": int,
+        "name": str,
+        "x": int, "y": int, "width": int, "height": int,
+        "enemies": [str],
+    },
+    # 地上的物品：item 是 item_database.json 的名稱，type/value/description 可覆寫資料庫的值
+    "map_items.json": {
+        "floor": int,
+        "item": str,
+        "x": int, "y": int,
+        "?type": str, "?value": int, "?description": str,
+    },
+    # 劇情事件：location 是 [x, y]；requires 列出觸發前必須成立的劇情旗標
+    "story_events.json": {
+        "type": str,
+        "?title": str,
+        "?text": str,
+        "?location": [int],
+        "?tile_type": int,
+        "?requires": [str],
+        "?auto_trigger": bool,
+        "?choices": [{"text": str, "?next": str, "?flag": str, "?action": str, "?type": str, "?enemy_type": str}],
+        "?encounters": [{"text": str, "?action": str, "?type": str, "?enemy_type": str}],
+    },
+}
+
+
+def type_matches(value, expected):
+    if expected is int:
+        return isinstance(value, int) and not isinstance(value, bool)
+    return isinstance(value, expected)
+
+
+def validate_value(value, spec, path, errors):
+    if isinstance(spec, dict):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: 應該是物件")
+            return
+        if "*" in spec:
+            for key, element in value.items():
+                validate_value(element, spec["*"], f"{path}.{key}", errors)
+            return
+        for field, field_spec in spec.items():
+            optional = field.startswith("?")
+            name = field[1:] if optional else field
+            if name not in value:
+                if not optional:
+                    errors.append(f"{path}.{name}: 缺少欄位")
+                continue
+            validate_value(value[name], field_spec, f"{path}.{name}", errors)
+    elif isinstance(spec, list):
+        if not isinstance(value, list):
+            errors.append(f"{path}: 應該是串列")
+            return
+        for index, element in enumerate(value):
+            validate_value(element, spec[0], f"{path}[{index}]", errors)
+    elif not type_matches(value, spec):
+        errors.append(f"{path}: 應該是 {spec.__name__}，實際是 {type(value).__name__}")
+
+
+def validate_source(filename, data):
+    """驗證一個來源檔，回傳 (有效項目 dict, 錯誤訊息串列)；無效的項目會被剔除"""
+    errors = []
+    if not isinstance(data, dict):
+        return {}, [f"{filename}: 最外層應該是以 id 為鍵的物件"]
+    schema = SCHEMAS[filename]
+    valid = {}
+    for entry_id, entry in data.items():
+        entry_errors = []
+        validate_value(entry, schema, f"{filename}:{entry_id}", entry_errors)
+        if entry_errors:
+            errors.extend(entry_errors)
+        else:
+            valid[entry_id] = entry
+    return valid, errors
+
+
+def compile_floors(sources, enemies, items, errors):
+    """樓層索引：樓層號碼 -> 地圖、互動物件、戰鬥區域、物品；參照不存在的項目會被略過並記錄錯誤"""
+    floors = {}
+    for floor_id, floor in sources.get("floors.json", {}).items():
+        if not floor_id.isdigit():
+            errors.append(f"floors.json:{floor_id}: 樓層 id 應該是數字")
+            continue
+        floors[int(floor_id)] = dict(floor, combat_zones=[], items=[])
+
+    for zone_id, zone in sources.get("combat_zones.json", {}).items():
+        missing = [enemy_id for enemy_id in zone["enemies"] if enemy_id not in enemies]
+        if zone["floor"] not in floors:
+            errors.append(f"combat_zones.json:{zone_id}: 找不到樓層 {zone['floor']}")
+        elif missing:
+            errors.append(f"combat_zones.json:{zone_id}: 找不到敵人 {', '.join(missing)}")
+        else:
+            compiled_zone = dict(zone, id=zone_id)
+            del compiled_zone["floor"]
+            floors[zone["floor"]]["combat_zones"].append(compiled_zone)
+
+    for placement_id, placement in sources.get("map_items.json", {}).items():
+        if placement["floor"] not in floors:
+            errors.append(f"map_items.json:{placement_id}: 找不到樓層 {placement['floor']}")
+        elif placement["item"] not in items:
+            errors.append(f"map_items.json:{placement_id}: 找不到道具 {placement['item']}")
+        else:
+            item = dict(items[placement["item"]], name=placement["item"], x=placement["x"], y=placement["y"])
+            for field in ("type", "value", "description"):
+                if field in placement:
+                    item[field] = placement[field]
+            floors[placement["floor"]]["items"].append(item)
+    return floors
+
+
+def compile_content(sources, errors=None):
+    """把驗證過的來源編譯成索引（只含 dict/list/str/int，可以直接 marshal）；跨檔案的參照錯誤加到 errors"""
+    if errors is None:
+        errors = []
+    enemies = sources.get("enemy_stats.json", {})
+    items = sources.get("item_database.json", {})
+    dialogues = sources.get("dialogues.json", {})
+
+    compiled = {
+        "enemy_order": list(enemies),
+        "enemies": {enemy_id: dict(enemy, id=enemy_id) for enemy_id, enemy in enemies.items()},
+        "enemies_by_name": {enemy["name"]: enemy_id for enemy_id, enemy in enemies.items()},
+        "items": {name: dict(item, name=name) for name, item in items.items()},
+        "dialogues": {},
+        "dialogue_nodes": {},
+        "floors": compile_floors(sources, enemies, items, errors),
+        "story_events": {event_id: dict(event, id=event_id)
+                         for event_id, event in sources.get("story_events.json", {}).items()},
+    }
+
+    # 對話節點以「對話 id/節點 id」為鍵（例如 npc:npc4/ready）
+    for dialogue_id, dialogue in dialogues.items():
+        compiled["dialogues"][dialogue_id] = dict(dialogue, id=dialogue_id)
+        for node_id, node in dialogue["nodes"].items():
+            node_key = f"{dialogue_id}/{node_id}"
+            compiled["dialogue_nodes"][node_key] = dict(node, id=node_key, dialogue=dialogue_id)
+    return compiled
+
+
+class ContentPipeline:
+    """遊戲內容：第一次查詢時載入（有效快取就直接讀），之後都查記憶體裡的索引"""
+
+    def __init__(self, data_dir=DEFAULT_DATA_DIR, cache_path=DEFAULT_CACHE_PATH):
+        self.data_dir = data_dir
+        self.cache_path = cache_path
+        self.content = None
+        self.errors = []
+        self.from_cache = False
+
+    # ======= 載入 =======
+    def read_sources(self):
+        """讀取所有來源檔的原始內容（不存在的檔案略過）"""
+        raw = {}
+        for filename in SCHEMAS:
+            path = os.path.join(self.data_dir, filename)
+            try:
+                with open(path, "rb") as f:
+                    raw[filename] = f.read()
+            except OSError:
+                game_logger.warning("content", "⚠️ 找不到內容檔案: %s", path)
+        return raw
+
+    def source_key(self, raw):
+        """所有來源內容的雜湊（快取鍵）"""
+        digest = hashlib.sha256()
+        for filename in sorted(raw):
+            digest.update(filename.encode("utf-8") + b"\0")
+            digest.update(hashlib.sha256(raw[filename]).digest())
+        return digest.digest()
+
+    def load_cache(self, key):
+        try:
+            with open(self.cache_path, "rb") as f:
+                data = f.read()
+            magic, version, cached_key = CACHE_HEADER.unpack_from(data, 0)
+            if magic == CACHE_MAGIC and version == CACHE_VERSION and cached_key == key:
+                return marshal.loads(data[CACHE_HEADER.size:])
+        except (OSError, struct.error, EOFError, ValueError, TypeError):
+            pass
+        return None
+
+    def save_cache(self, key, content):
+        """寫入快取（先寫暫存檔再取代）"""
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = self.cache_path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, key))
+                f.write(marshal.dumps(content))
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            game_logger.warning("content", "⚠️ 內容快取寫入失敗 %s: %s", self.cache_path, e)
+
+    def build(self, raw):
+        """解析、驗證、編譯；回傳 (編譯結果, 錯誤訊息串列)"""
+        sources = {}
+        errors = []
+        for filename, data in raw.items():
+            try:
+                parsed = json.loads(data.decode("utf-8"))
+            except (UnicodeDecodeError, ValueError) as e:
+                errors.append(f"{filename}: JSON 格式錯誤: {e}")
+                continue
+            valid, source_errors = validate_source(filename, parsed)
+            sources[filename] = valid
+            errors.extend(source_errors)
+        return compile_content(sources, errors), errors
+
+    def load(self, force=False):
+        """載入內容；來源沒變時讀快取。有驗證錯誤時不寫快取，下次啟動會再回報"""
+        if self.content is not None and not force:
+            return self.content
+
+        raw = self.read_sources()
+        key = self.source_key(raw)
+        content = None if force else self.load_cache(key)
+        self.from_cache = content is not None
+        if content is None:
+            content, self.errors = self.build(raw)
+            for error in self.errors:
+                game_logger.error("content", "❌ 內容驗證失敗: %s", error)
+            if not self.errors:
+                self.save_cache(key, content)
+        else:
+            self.errors = []
+
+        self.content = content
+        game_logger.info("content", "📚 遊戲內容%s: %s 個敵人, %s 個道具, %s 個對話節點, %s 個樓層",
+                         "（快取）" if self.from_cache else "", len(content["enemies"]), len(content["items"]),
+                         len(content["dialogue_nodes"]), len(content["floors"]))
+        return content
+
+    # ======= 查詢 =======
+    def get_enemies(self):
+        """依檔案順序的敵人串列（每個都是複本）"""
+        content = self.load()
+        return [dict(content["enemies"][enemy_id]) for enemy_id in content["enemy_order"]]
+
+    def get_enemy(self, enemy_id):
+        enemy = self.load()["enemies"].get(enemy_id)
+        return dict(enemy) if enemy else None
+
+    def get_item(self, name):
+        return self.load()["items"].get(name)
+
+    def get_dialogues(self):
+        return self.load()["dialogues"]
+
+    def get_dialogue(self, dialogue_id):
+        return self.load()["dialogues"].get(dialogue_id)
+
+    def get_dialogue_node(self, node_key):
+        return self.load()["dialogue_nodes"].get(node_key)
+
+    def get_floors(self):
+        """樓層號碼 -> 樓層資料（深複本：地圖會移除打贏的戰鬥區域和撿走的物品）"""
+        return copy.deepcopy(self.load()["floors"])
+
+    def get_story_events(self):
+        """事件 id -> 劇情事件（深複本）"""
+        return copy.deepcopy(self.load()["story_events"])
+
+
+# 全域內容管線
+content_pipeline = ContentPipeline()
@@ -0,0 +1,317 @@
+# dialogue_graph.py - 編譯後的對話狀態機
+#
+# assets/data/dialogues.json 的每個對話是一組節點，選項帶有型別化的動作
+# （heal、add_exp、give_item、set_flag、teleport、close…）和條件。
+# 載入時把條件編譯成判斷函式、動作編譯成 (處理函式, 參數)，並建立
+# (節點, 選項 id) -> 動作 的分派表，選擇選項時只做一次字典查詢。
+from content_pipeline import content_pipeline
+from game_logger import game_logger
+from rng_service import rng_service
+
+
+class DialogueContext:
+    """執行條件和動作時的環境：UI、遊戲狀態、背包和訊息格式化欄位"""
+
+    __slots__ = ("ui", "game_state", "inventory", "name", "option", "closed")
+
+    def __init__(self, ui, game_state, inventory, name="", option=""):
+        self.ui = ui
+        self.game_state = game_state
+        self.inventory = inventory
+        self.name = name
+        self.option = option
+        self.closed = False
+
+    def fields(self):
+        """訊息文字可用的欄位：{name}、{option} 和玩家數值（{level}、{hp}…）"""
+        return dict(self.game_state.player_stats, name=self.name, option=self.option)
+
+
+def find_item(inventory, keywords):
+    """背包中名稱含有任一關鍵字、且數量大於 0 的第一個道具"""
+    if inventory is None or not hasattr(inventory, "get_items"):
+        return None
+    for item in inventory.get_items():
+        name = item.get("name", "")
+        if item.get("quantity", 0) > 0 and any(keyword in name for keyword in keywords):
+            return item
+    return None
+
+
+def compile_text(text):
+    """含 {欄位} 的文字在執行時格式化，其餘直接回傳原字串"""
+    if "{" not in text:
+        return lambda context: text
+    return lambda context: text.format_map(context.fields())
+
+
+# ======= 條件 =======
+# 每種條件編譯成 predicate(context)；同一個 when 物件裡的條件全部成立才算成立
+
+def condition_flag(value):
+    return lambda context: bool(context.ui.get_dialogue_flag(value))
+
+
+def condition_not_flag(value):
+    return lambda context: not context.ui.get_dialogue_flag(value)
+
+
+def condition_min_level(value):
+    return lambda context: context.game_state.player_stats["level"] >= value
+
+
+def condition_injured(value):
+    def predicate(context):
+        stats = context.game_state.player_stats
+        return (stats["hp"] < stats["max_hp"]) == bool(value)
+    return predicate
+
+
+def condition_has_item(value):
+    keywords = tuple(value)
+    return lambda context: find_item(context.inventory, keywords) is not None
+
+
+def condition_chance(value):
+    stream = rng_service.stream("loot")
+    return lambda context: stream.random() < value
+
+
+CONDITIONS = {
+    "flag": condition_flag,
+    "not_flag": condition_not_flag,
+    "min_level": condition_min_level,
+    "injured": condition_injured,
+    "has_item": condition_has_item,
+    "chance": condition_chance,
+}
+
+
+# ======= 動作 =======
+# 每個處理函式接收 (context, 編譯後的參數)
+
+def action_heal(context, amount):
+    stats = context.game_state.player_stats
+    stats["hp"] = min(stats["max_hp"], stats["hp"] + amount)
+
+
+def action_add_exp(context, amount):
+    context.game_state.add_exp(amount)
+
+
+def action_damage(context, amount):
+    context.game_state.damage_player(amount)
+
+
+def action_level_up(context, _):
+    context.game_state.level_up()
+
+
+def action_message(context, text):
+    context.ui.show_message(text(context))
+
+
+def action_set_flag(context, args):
+    name, value = args
+    context.ui.set_dialogue_flag(name, value)
+
+
+def action_give_item(context, args):
+    name, quantity = args
+    if context.inventory is None:
+        return
+    item = dict(content_pipeline.get_item(name) or {"name": name, "type": "tool"})
+    item["quantity"] = quantity
+    context.inventory.add_item(item)
+
+
+def action_take_item(context, keywords):
+    item = find_item(context.inventory, keywords)
+    if item:
+        context.inventory.remove_item(item["name"], 1)
+
+
+def action_teleport(context, args):
+    x, y, message = args
+    player = context.ui.player_reference
+    if player:
+        player.set_position(x, y)
+        if message:
+            context.ui.show_message(message)
+
+
+def action_check_victory(context, _):
+    context.ui.check_victory_condition(context.game_state)
+
+
+def action_check_game_over(context, _):
+    context.ui.check_game_over(context.game_state)
+
+
+def action_close(context, _):
+    context.closed = True
+
+
+def action_if(context, args):
+    predicate, then_actions, else_actions = args
+    run_actions(context, then_actions if predicate(context) else else_actions)
+
+
+# 動作型別 -> (處理函式, 參數編譯函式)
+ACTIONS = {
+    "heal": (action_heal, lambda action, graph: int(action["amount"])),
+    "add_exp": (action_add_exp, lambda action, graph: int(action["amount"])),
+    "damage": (action_damage, lambda action, graph: int(action["amount"])),
+    "level_up": (action_level_up, lambda action, graph: None),
+    "message": (action_message, lambda action, graph: compile_text(action["text"])),
+    "set_flag": (action_set_flag, lambda action, graph: (action["flag"], action.get("value", True))),
+    "give_item": (action_give_item, lambda action, graph: (action["item"], int(action.get("quantity", 1)))),
+    "take_item": (action_take_item, lambda action, graph: tuple(action["match"])),
+    "teleport": (action_teleport, lambda action, graph: (action["x"], action["y"], action.get("message"))),
+    "check_victory": (action_check_victory, lambda action, graph: None),
+    "check_game_over": (action_check_game_over, lambda action, graph: None),
+    "close": (action_close, lambda action, graph: None),
+    "if": (action_if, lambda action, graph: (graph.compile_condition(action["when"]),
+                                             graph.compile_actions(action["then"]),
+                                             graph.compile_actions(action.get("else", [])))),
+}
+
+
+def run_actions(context, actions):
+    for handler, args in actions:
+        handler(context, args)
+
+
+class DialogueNode:
+    """編譯後的節點：文字、選項 (id, 文字) 串列"""
+
+    __slots__ = ("key", "dialogue_id", "text", "options")
+
+    def __init__(self, key, dialogue_id, text, options):
+        self.key = key
+        self.dialogue_id = dialogue_id
+        self.text = text
+        self.options = options
+
+
+class DialogueGraph:
+    """所有對話的節點、起始條件和 (節點, 選項) 分派表"""
+
+    def __init__(self, pipeline=content_pipeline):
+        self.pipeline = pipeline
+        self.loaded = False
+        self.nodes = {}
+        self.entries = {}
+        self.names = {}
+        self.table = {}
+        self.errors = []
+
+    # ======= 編譯 =======
+    def compile_condition(self, when):
+        predicates = []
+        for name, value in when.items():
+            factory = CONDITIONS.get(name)
+            if factory is None:
+                raise ValueError(f"未知的條件: {name}")
+            predicates.append(factory(value))
+        if len(predicates) == 1:
+            return predicates[0]
+        return lambda context: all(predicate(context) for predicate in predicates)
+
+    def compile_actions(self, actions):
+        compiled = []
+        for action in actions:
+            entry = ACTIONS.get(action.get("type"))
+            if entry is None:
+                raise ValueError(f"未知的動作: {action.get('type')}")
+            handler, compile_args = entry
+            try:
+                compiled.append((handler, compile_args(action, self)))
+            except KeyError as e:
+                raise ValueError(f"動作 {action['type']} 缺少參數 {e}")
+        return tuple(compiled)
+
+    def compile(self, dialogues):
+        """編譯所有對話；有錯誤的選項或起始條件會被略過並記錄在 self.errors"""
+        self.nodes = {}
+        self.entries = {}
+        self.names = {}
+        self.table = {}
+        self.errors = []
+
+        for dialogue_id, dialogue in dialogues.items():
+            self.names[dialogue_id] = dialogue["name"]
+            for node_id, node in dialogue["nodes"].items():
+                key = f"{dialogue_id}/{node_id}"
+                options = []
+                for option in node["options"]:
+                    try:
+                        actions = self.compile_actions(option.get("actions", []))
+                    except ValueError as e:
+                        self.errors.append(f"{key}:{option['id']}: {e}")
+                        continue
+                    next_key = None
+                    if option.get("next"):
+                        if option["next"] in dialogue["nodes"]:
+                            next_key = f"{dialogue_id}/{option['next']}"
+                        else:
+                            self.errors.append(f"{key}:{option['id']}: 找不到下一個節點 {option['next']}")
+                    self.table[(key, option["id"])] = (actions, next_key)
+                    options.append((option["id"], option["text"]))
+                self.nodes[key] = DialogueNode(key, dialogue_id, compile_text(node["text"]), options)
+
+            entry = []
+            for rule in dialogue.get("entry") or [{"node": next(iter(dialogue["nodes"]), "start")}]:
+                if rule["node"] not in dialogue["nodes"]:
+                    self.errors.append(f"{dialogue_id}: 起始節點 {rule['node']} 不存在")
+                    continue
+                try:
+                    predicate = self.compile_condition(rule["when"]) if rule.get("when") else None
+                except ValueError as e:
+                    self.errors.append(f"{dialogue_id}: {e}")
+                    continue
+                entry.append((predicate, f"{dialogue_id}/{rule['node']}"))
+            self.entries[dialogue_id] = entry
+
+        for error in self.errors:
+            game_logger.error("dialogue", "❌ 對話編譯失敗: %s", error)
+        self.loaded = True
+        game_logger.info("dialogue", "💬 對話圖已編譯: %s 個對話, %s 個節點, %s 個選項",
+                         len(self.entries), len(self.nodes), len(self.table))
+
+    def load(self):
+        if not self.loaded:
+            self.compile(self.pipeline.get_dialogues())
+        return self
+
+    # ======= 執行 =======
+    def has_dialogue(self, dialogue_id):
+        return dialogue_id in self.load().entries
+
+    def get_name(self, dialogue_id):
+        return self.load().names.get(dialogue_id, "")
+
+    def get_node(self, node_key):
+        return self.load().nodes.get(node_key)
+
+    def enter(self, dialogue_id, context):
+        """依起始條件選出第一個成立的節點，回傳節點 key（沒有時回傳 None）"""
+        for predicate, node_key in self.load().entries.get(dialogue_id, ()):
+            if predicate is None or predicate(context):
+                return node_key
+        return None
+
+    def choose(self, node_key, option_id, context):
+        """執行選項的動作，回傳下一個節點 key；對話結束時回傳 None"""
+        entry = self.load().table.get((node_key, option_id))
+        if entry is None:
+            game_logger.warning("dialogue", "⚠️ 沒有這個選項: %s:%s", node_key, option_id)
+            return None
+        actions, next_key = entry
+        game_logger.debug("dialogue", "💬 %s:%s -> %s", node_key, option_id, next_key or "結束")
+        run_actions(context, actions)
+        return None if context.closed else next_key
+
+
+# 全域對話圖（第一次使用時從內容管線編譯）
+dialogue_graph = DialogueGraph()
@@ -2,12 +2,208 @@ import pygame
 import os
 import sys
 import platform
+import json
+from collections import OrderedDict
+from text_layout import text_layout
+
+# 🆕 文字快取預設容量（位元組）
+DEFAULT_TEXT_CACHE_BUDGET = 8 * 1024 * 1024
+
+# 🆕 字體探測結果快取（依字體檔的 mtime 和大小判斷是否需要重新探測）
+DEFAULT_FONT_PROBE_CACHE = ".cache/font_probe.json"
+FONT_PROBE_VERSION = 1
+FONT_PROBE_TEXT = "測試中文"
+
+# 🆕 字形圖集設定
+GLYPH_ATLAS_SIZE = (1024, 1024)
+GLYPH_KERNING_LIMIT = 50000  # 字距快取的最大組合數，超過就清空
+
+
+class GlyphAtlas:
+    """字形圖集：每個 (字元, 大小, 粗體) 只光柵化一次，字串用 Surface.blits 組合
+
+    字形以白色存放在共用的圖集 Surface 上，組合後再用 BLEND_RGBA_MULT 上色。
+    字元位置 = 前面字元的寬度總和 + 相鄰兩字的字距修正
+    （font.size(a + b) - font.size(a) - font.size(b)）。
+    圖集滿了就清空重來（generation 加一），長時間遊玩不會永久退回整串 font.render；
+    關閉 reset_on_full 時，滿了之後直接回傳 None，不再逐字光柵化。
+    字元比整個圖集大或字串含控制字元時回傳 None，由呼叫端改用 font.render。
+    """
+
+    WHITE = (255, 255, 255)
+
+    def __init__(self, size=GLYPH_ATLAS_SIZE, padding=1, reset_on_full=True):
+        self.width, self.height = size
+        self.padding = padding
+        self.reset_on_full = reset_on_full
+        self.generation = 0  # 圖集被清空重來的次數
+        self.surface = None
+        self.glyphs = {}   # (字元, 大小, 粗體) -> (圖集區域或 None, 前進寬度)
+        self.kerning = {}  # (前一字元, 字元, 大小, 粗體) -> 修正像素
+
+        # 貨架式配置：由左到右、由上到下擺放
+        self.shelf_x = 0
+        self.shelf_y = 0
+        self.shelf_height = 0
+        self.full = False
+
+        self.glyph_hits = 0
+        self.glyph_misses = 0
+        self.fallbacks = 0
+
+    def clear(self):
+        """清空圖集"""
+        self.surface = None
+        self.glyphs.clear()
+        self.kerning.clear()
+        self.shelf_x = self.shelf_y = self.shelf_height = 0
+        self.full = False
+
+    def reset(self):
+        """圖集滿了：清空重來"""
+        self.clear()
+        self.generation += 1
+
+    def allocate(self, width, height):
+        """在圖集中找一塊空間，放不下時回傳 None"""
+        width += self.padding
+        height += self.padding
+        if width > self.width or height > self.height:
+            return None
+        if self.shelf_x + width > self.width:
+            self.shelf_x = 0
+            self.shelf_y += self.shelf_height
+            self.shelf_height = 0
+        if self.shelf_y + height > self.height:
+            self.full = True
+            return None
+
+        rect = pygame.Rect(self.shelf_x, self.shelf_y, width - self.padding, height - self.padding)
+        self.shelf_x += width
+        self.shelf_height = max(self.shelf_height, height)
+        return rect
+
+    def get_glyph(self, font, char, size, bold):
+        """取得字形，第一次使用時光柵化到圖集"""
+        key = (char, size, bold)
+        entry = self.glyphs.get(key)
+        if entry is not None:
+            self.glyph_hits += 1
+            return entry
+
+        self.glyph_misses += 1
+        if self.full:
+            if not self.reset_on_full:
+                # 滿了就不再光柵化：否則每個新字都白畫一次，呼叫端還要整串重新 render
+                return None
+            self.reset()
+
+        advance = font.size(char)[0]
+        area = None
+        if not char.isspace():
+            glyph = font.render(char, True, self.WHITE)
+            if glyph.get_width() > 0:
+                area = self.allocate(*glyph.get_size())
+                if area is None and self.full and self.reset_on_full:
+                    # 這個字剛好放不下：清空後放進新的圖集（已經組合中的字串仍引用舊的 Surface）
+                    self.reset()
+                    area = self.allocate(*glyph.get_size())
+                if area is None:
+                    return None
+                if self.surface is None:
+                    self.surface = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+                # 圖集是透明的，用 MAX 混合才能原封不動複製 alpha
+                self.surface.blit(glyph, area, special_flags=pygame.BLEND_RGBA_MAX)
+
+        entry = (area, advance)
+        self.glyphs[key] = entry
+        return entry
+
+    def get_kerning(self, font, previous, char, size, bold):
+        """相鄰兩字的字距修正"""
+        key = (previous, char, size, bold)
+        kerning = self.kerning.get(key)
+        if kerning is None:
+            if len(self.kerning) >= GLYPH_KERNING_LIMIT:
+                self.kerning.clear()
+            kerning = font.size(previous + char)[0] - font.size(previous)[0] - font.size(char)[0]
+            self.kerning[key] = kerning
+        return kerning
+
+    def render(self, font, text, size, color, bold=False):
+        """組合字串，無法處理時回傳 None"""
+        if not text or any(char in "\n\r\t" for char in text):
+            return None
+
+        blits = []
+        x = 0
+        right = 0
+        height = font.get_height()
+        previous = None
+        for char in text:
+            entry = self.get_glyph(font, char, size, bold)
+            if entry is None:
+                self.fallbacks += 1
+                return None
+
+            if previous is not None:
+                x += self.get_kerning(font, previous, char, size, bold)
+            area, advance = entry
+            if area is not None:
+                blits.append((self.surface, (x, 0), area, pygame.BLEND_RGBA_MAX))
+                right = max(right, x + area.width)
+                height = max(height, area.height)
+            x += advance
+            previous = char
+
+        surface = pygame.Surface((max(x, right, 1), height), pygame.SRCALPHA)
+        surface.blits(blits, doreturn=False)
+        surface.fill((color[0], color[1], color[2], 255), special_flags=pygame.BLEND_RGBA_MULT)
+        return surface
+
+    def get_stats(self):
+        """圖集統計資料"""
+        lookups = self.glyph_hits + self.glyph_misses
+        return {
+            "glyphs": len(self.glyphs),
+            "kerning_pairs": len(self.kerning),
+            "used_height": self.shelf_y + self.shelf_height,
+            "full": self.full,
+            "generation": self.generation,
+            "hits": self.glyph_hits,
+            "misses": self.glyph_misses,
+            "hit_rate": self.glyph_hits / lookups if lookups else 0.0,
+            "fallbacks": self.fallbacks
+        }
+
 
 class FontManager:
-    def __init__(self):
+    def __init__(self, text_cache_budget=DEFAULT_TEXT_CACHE_BUDGET, probe_cache_path=DEFAULT_FONT_PROBE_CACHE):
         self.fonts = {}
         self.system_fonts = []
         self.default_font = None
+        
+        # 🆕 字體探測快取：字體路徑 -> {mtime_ns, size, renders, cjk}
+        self.probe_cache_path = probe_cache_path
+        self.font_probes = self.load_font_probe_cache()
+        self.font_probe_hits = 0
+        self.font_probe_misses = 0
+        
+        # 🆕 文字Surface的LRU快取：相同字串不必每幀重新光柵化
+        self.text_cache = OrderedDict()  # key -> (結果, 位元組數)
+        self.text_cache_budget = text_cache_budget
+        self.text_cache_bytes = 0
+        self.text_cache_hits = 0
+        self.text_cache_misses = 0
+        self.text_cache_evictions = 0
+        
+        # 🆕 字形圖集：快取沒命中時逐字組合，動態字串（例如 HP: 73/120）不必整串重新排版
+        self.use_glyph_atlas = True
+        self.glyph_atlas = GlyphAtlas()
+        
+        # 🆕 無頭模式：不點陣化文字（壓力測試只跑遊戲邏輯）
+        self.headless_surface = None
+        
         self.load_system_fonts()
     
     def load_system_fonts(self):
@@ -49,20 +245,18 @@ class FontManager:
                 if font_file.lower().endswith(('.ttf', '.ttc', '.otf')):
                     font_paths.insert(0, os.path.join(custom_font_dir, font_file))
         
-        # 尋找可用的字體
+        # 尋找可用的字體（🆕 探測結果會快取到磁碟，字體檔沒變就不必重新探測）
         for font_path in font_paths:
             if os.path.exists(font_path):
-                try:
-                    # 測試字體是否支援中文
-                    test_font = pygame.font.Font(font_path, 16)
-                    test_surface = test_font.render("測試中文", True, (255, 255, 255))
-                    if test_surface.get_width() > 0:
-                        self.system_fonts.append(font_path)
-                        if self.default_font is None:
-                            self.default_font = font_path
-                        print(f"找到中文字體: {font_path}")
-                except:
-                    continue
+                probe = self.probe_font(font_path)
+                if probe and probe["renders"]:
+                    self.system_fonts.append(font_path)
+                    if self.default_font is None:
+                        self.default_font = font_path
+                    print(f"找到中文字體: {font_path}")
+        
+        if self.font_probe_misses:
+            self.save_font_probe_cache()
         
         # 如果沒找到任何字體，使用pygame預設字體
         if not self.system_fonts:
@@ -77,6 +271,85 @@ class FontManager:
             except:
                 pass
     
+    def load_font_probe_cache(self):
+        """🆕 讀取字體探測快取，檔案不存在或格式不符時從空白開始"""
+        if not self.probe_cache_path:
+            return {}
+        try:
+            with open(self.probe_cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == FONT_PROBE_VERSION and data.get("text") == FONT_PROBE_TEXT:
+                return data.get("fonts", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+    
+    def save_font_probe_cache(self):
+        """🆕 寫入字體探測快取"""
+        if not self.probe_cache_path:
+            return
+        try:
+            cache_dir = os.path.dirname(self.probe_cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            temp_path = self.probe_cache_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": FONT_PROBE_VERSION, "text": FONT_PROBE_TEXT, "fonts": self.font_probes},
+                          f, indent=1, ensure_ascii=False)
+            os.replace(temp_path, self.probe_cache_path)
+        except OSError as e:
+            print(f"❌ 寫入字體探測快取失敗: {e}")
+    
+    def probe_font(self, font_path):
+        """🆕 探測字體能否渲染測試字串以及是否真的包含中文字形（結果會快取）"""
+        try:
+            stat = os.stat(font_path)
+        except OSError:
+            return None
+        
+        cached = self.font_probes.get(font_path)
+        if cached and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            self.font_probe_hits += 1
+            return cached
+        
+        self.font_probe_misses += 1
+        probe = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "renders": False, "cjk": False}
+        try:
+            test_font = pygame.font.Font(font_path, 16)
+            test_surface = test_font.render(FONT_PROBE_TEXT, True, (255, 255, 255))
+            probe["renders"] = test_surface.get_width() > 0
+            probe["cjk"] = self.font_has_glyphs(test_font, FONT_PROBE_TEXT)
+        except Exception:
+            pass
+        self.font_probes[font_path] = probe
+        return probe
+    
+    def font_has_glyphs(self, font, text):
+        """🆕 字體缺字時會畫出 .notdef 方框，和一定不存在的字元比較即可判斷"""
+        white = (255, 255, 255)
+        missing = font.render("\U000FFFFD", False, white)
+        missing_bytes = pygame.image.tobytes(missing, "RGBA")
+        for char in text:
+            if font.size(char) != missing.get_size():
+                continue
+            if pygame.image.tobytes(font.render(char, False, white), "RGBA") == missing_bytes:
+                return False
+        return True
+    
+    def list_cjk_fonts(self):
+        """🆕 列出快取中確認含有中文字形的字體"""
+        return [path for path, probe in self.font_probes.items()
+                if probe["cjk"] and os.path.exists(path)]
+    
+    def get_font_probe_stats(self):
+        """🆕 字體探測快取統計"""
+        return {
+            "cached_fonts": len(self.font_probes),
+            "cjk_fonts": len(self.list_cjk_fonts()),
+            "hits": self.font_probe_hits,
+            "misses": self.font_probe_misses
+        }
+    
     def get_font(self, size, bold=False):
         """獲取指定大小的字體"""
         font_key = (size, bold)
@@ -112,9 +385,32 @@ class FontManager:
         return self.fonts[font_key]
     
     def render_text(self, text, size, color, bold=False, antialias=True):
-        """渲染文字，支援中文"""
+        """渲染文字，支援中文 - 🆕 結果會放入LRU快取，呼叫端不可修改回傳的Surface"""
+        if self.headless_surface is not None:
+            return self.headless_surface
+        cache_key = (text, size, tuple(color), bold, antialias)
+        cached = self.get_cached_text(cache_key)
+        if cached is not None:
+            return cached
+        
+        surface = self.render_text_uncached(text, size, color, bold, antialias)
+        self.store_cached_text(cache_key, surface, self.get_surface_bytes(surface))
+        return surface
+    
+    def render_text_uncached(self, text, size, color, bold=False, antialias=True):
+        """實際渲染文字（不經過快取）"""
         font = self.get_font(size, bold)
         
+        # 🆕 優先用字形圖集組合（只支援反鋸齒文字）
+        if self.use_glyph_atlas and antialias:
+            try:
+                surface = self.glyph_atlas.render(font, text, size, color, bold)
+                if surface is not None:
+                    return surface
+            except Exception as e:
+                print(f"❌ 字形圖集渲染失敗，改用一般渲染: {e}")
+                self.use_glyph_atlas = False
+        
         try:
             # 嘗試渲染文字
             surface = font.render(text, antialias, color)
@@ -130,6 +426,70 @@ class FontManager:
             print(f"文字渲染失敗: {text}, 錯誤: {e}")
             return self.fallback_render(text, size, color, bold, antialias)
     
+    # 🆕 文字快取
+    def get_cached_text(self, cache_key):
+        """從快取取出結果，命中時移到最近使用的位置"""
+        entry = self.text_cache.get(cache_key)
+        if entry is None:
+            self.text_cache_misses += 1
+            return None
+        
+        self.text_cache.move_to_end(cache_key)
+        self.text_cache_hits += 1
+        return entry[0]
+    
+    def store_cached_text(self, cache_key, value, size_bytes):
+        """放入快取，超過容量時淘汰最久未使用的項目"""
+        if size_bytes > self.text_cache_budget:
+            return
+        
+        old_entry = self.text_cache.pop(cache_key, None)
+        if old_entry is not None:
+            self.text_cache_bytes -= old_entry[1]
+        
+        self.text_cache[cache_key] = (value, size_bytes)
+        self.text_cache_bytes += size_bytes
+        self.trim_text_cache()
+    
+    def trim_text_cache(self):
+        """淘汰項目直到總大小回到預算內"""
+        while self.text_cache_bytes > self.text_cache_budget and self.text_cache:
+            _, (_, size_bytes) = self.text_cache.popitem(last=False)
+            self.text_cache_bytes -= size_bytes
+            self.text_cache_evictions += 1
+    
+    def get_surface_bytes(self, surface):
+        """估算Surface佔用的記憶體"""
+        return surface.get_pitch() * surface.get_height()
+    
+    def set_text_cache_budget(self, budget_bytes):
+        """設定文字快取容量（位元組）"""
+        self.text_cache_budget = budget_bytes
+        self.trim_text_cache()
+    
+    def set_headless(self, enabled=True):
+        """🆕 無頭模式：render_text 一律回傳共用的 1x1 透明 Surface（尺寸量測照常）"""
+        self.headless_surface = pygame.Surface((1, 1), pygame.SRCALPHA) if enabled else None
+        self.clear_text_cache()
+    
+    def clear_text_cache(self):
+        """清空文字快取"""
+        self.text_cache.clear()
+        self.text_cache_bytes = 0
+    
+    def get_text_cache_stats(self):
+        """取得文字快取統計"""
+        total = self.text_cache_hits + self.text_cache_misses
+        return {
+            "entries": len(self.text_cache),
+            "bytes": self.text_cache_bytes,
+            "budget": self.text_cache_budget,
+            "hits": self.text_cache_hits,
+            "misses": self.text_cache_misses,
+            "evictions": self.text_cache_evictions,
+            "hit_rate": self.text_cache_hits / total if total else 0.0
+        }
+    
     def fallback_render(self, text, size, color, bold=False, antialias=True):
         """備用渲染方法"""
         try:
@@ -153,35 +513,36 @@ class FontManager:
             return surface
     
     def render_multiline_text(self, text, size, color, max_width, bold=False):
-        """渲染多行文字"""
-        font = self.get_font(size, bold)
-        words = text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + word + " "
-            test_surface = self.render_text(test_line, size, color, bold)
-            
-            if test_surface.get_width() <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line.strip())
-                current_line = word + " "
+        """渲染多行文字 - 🆕 整組結果同樣放入LRU快取"""
+        if self.headless_surface is not None:
+            return [self.headless_surface]
+        cache_key = ("multiline", text, size, tuple(color), max_width, bold)
+        cached = self.get_cached_text(cache_key)
+        if cached is not None:
+            return list(cached)
         
-        if current_line:
-            lines.append(current_line.strip())
+        lines = self.wrap_text(text, size, max_width, bold)
         
         # 渲染每一行
         surfaces = []
         for line in lines:
             if line.strip():
-                surface = self.render_text(line, size, color, bold)
+                surface = self.render_text_uncached(line, size, color, bold)
                 surfaces.append(surface)
         
+        size_bytes = sum(self.get_surface_bytes(surface) for surface in surfaces)
+        self.store_cached_text(cache_key, tuple(surfaces), size_bytes)
         return surfaces
     
+    def wrap_text(self, text, size, max_width, bold=False):
+        """🆕 斷行（支援中文逐字斷行和標點禁則），結果會快取，回傳 tuple"""
+        font = self.get_font(size, bold)
+        return text_layout.wrap(text, font, max_width, (self.default_font, size, bold))
+    
+    def get_kerning(self, previous, char, size, bold=False):
+        """🆕 相鄰兩字的字距修正（快取在字形圖集中），供逐字排版使用"""
+        return self.glyph_atlas.get_kerning(self.get_font(size, bold), previous, char, size, bold)
+    
     def get_text_size(self, text, size, bold=False):
         """獲取文字尺寸"""
         font = self.get_font(size, bold)
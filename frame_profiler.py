@@ -0,0 +1,149 @@
+# frame_profiler.py - 每幀分階段效能分析
+import time
+
+
+class PhaseTimer:
+    """with profiler.phase("map_render"): 量測區塊耗時並累加到該階段（每個階段重複使用同一個物件）"""
+
+    __slots__ = ("current", "phase", "start")
+
+    def __init__(self, current, phase):
+        self.current = current
+        self.phase = phase
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.current[self.phase] += time.perf_counter() - self.start
+        return False
+
+
+class NullPhase:
+    """分析器關閉時的空區塊：不量測"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+class NullProfiler:
+    """分析器關閉時代替 FrameProfiler，phase() 回傳不做事的區塊"""
+
+    NULL_PHASE = NullPhase()
+
+    def phase(self, phase):
+        return self.NULL_PHASE
+
+
+null_profiler = NullProfiler()
+
+
+class FrameProfiler:
+    """以 perf_counter 量測遊戲迴圈各階段耗時，結果保存在固定大小的環狀緩衝區"""
+
+    PHASES = [
+        "events",
+        "player_update",
+        "map_update",
+        "combat_update",
+        "scene_render",
+        "map_render",
+        "player_render",
+        "ui_render",
+        "flip",
+    ]
+
+    PHASE_NAMES = {
+        "events": "事件處理",
+        "player_update": "玩家更新",
+        "map_update": "地圖更新",
+        "combat_update": "戰鬥更新",
+        "scene_render": "場景渲染",
+        "map_render": "地圖渲染",
+        "player_render": "玩家渲染",
+        "ui_render": "UI渲染",
+        "flip": "畫面輸出",
+    }
+
+    PHASE_COLORS = {
+        "events": (255, 120, 120),
+        "player_update": (255, 200, 80),
+        "map_update": (200, 255, 80),
+        "combat_update": (255, 80, 200),
+        "scene_render": (120, 120, 255),
+        "map_render": (80, 200, 255),
+        "player_render": (80, 255, 160),
+        "ui_render": (200, 140, 255),
+        "flip": (180, 180, 180),
+    }
+
+    def __init__(self, history=120):
+        self.enabled = False
+        self.history = history
+
+        # 環狀緩衝區（秒）
+        self.frame_times = [0.0] * history
+        self.phase_times = {phase: [0.0] * history for phase in self.PHASES}
+        self.index = 0   # 下一筆要寫入的位置
+        self.count = 0   # 目前有效的筆數
+
+        # 目前這一幀的累計
+        self.current = dict.fromkeys(self.PHASES, 0.0)
+        self.frame_start = 0.0
+        self.phase_timers = {phase: PhaseTimer(self.current, phase) for phase in self.PHASES}
+
+    def toggle(self):
+        """切換分析器，重新開啟時清除舊資料"""
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.reset()
+        return self.enabled
+
+    def reset(self):
+        """清除所有記錄"""
+        self.frame_times = [0.0] * self.history
+        self.phase_times = {phase: [0.0] * self.history for phase in self.PHASES}
+        self.index = 0
+        self.count = 0
+
+    def begin_frame(self):
+        """一幀開始"""
+        for phase in self.current:
+            self.current[phase] = 0.0
+        self.frame_start = time.perf_counter()
+
+    def phase(self, phase):
+        """量測一個區塊的 context manager"""
+        return self.phase_timers[phase]
+
+    def end_frame(self):
+        """一幀結束，寫入環狀緩衝區"""
+        self.frame_times[self.index] = time.perf_counter() - self.frame_start
+        for phase, seconds in self.current.items():
+            self.phase_times[phase][self.index] = seconds
+        self.index = (self.index + 1) % self.history
+        self.count = min(self.count + 1, self.history)
+
+    def get_recent(self, buffer):
+        """依時間順序（舊到新）取出環狀緩衝區中的有效資料"""
+        if self.count < self.history:
+            return buffer[:self.count]
+        return buffer[self.index:] + buffer[:self.index]
+
+    def get_frame_times_ms(self):
+        """最近的整幀耗時（毫秒）"""
+        return [seconds * 1000 for seconds in self.get_recent(self.frame_times)]
+
+    def get_phase_averages_ms(self):
+        """各階段的平均耗時（毫秒）"""
+        if not self.count:
+            return dict.fromkeys(self.PHASES, 0.0)
+        return {phase: sum(self.get_recent(buffer)) * 1000 / self.count
+                for phase, buffer in self.phase_times.items()}
@@ -0,0 +1,127 @@
+# game_logger.py - 分級日誌
+#
+# 每個子系統（sound、combat、map、player、game…）有自己的等級。低於等級的呼叫只做一次
+# 字典查詢就返回；記錄只存參數，要輸出時才格式化（%-style），平常寫進記憶體環狀緩衝區，
+# 只有達到 echo 等級（預設 WARNING）的記錄才會立刻印到 stdout。
+#
+# 用環境變數 GAME_LOG 調整，例如 GAME_LOG="combat=DEBUG,sound=INFO,*=WARNING,echo=INFO"
+import os
+import time
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+LEVEL_VALUES = {name: level for level, name in LEVEL_NAMES.items()}
+
+DEFAULT_LOG_PATH = ".cache/logs/game.log"
+
+
+def parse_level(value):
+    """'DEBUG' / 'debug' / '10' -> 10"""
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return LEVEL_VALUES[value.upper()]
+
+
+def format_record(record):
+    """把一筆記錄格式化成一行文字（真的要輸出時才呼叫）"""
+    timestamp, subsystem, level, message, args = record
+    if args:
+        try:
+            message = message % args
+        except (TypeError, ValueError):
+            message = f"{message} {args!r}"
+    return f"{timestamp:10.3f} {LEVEL_NAMES.get(level, level):<7} [{subsystem}] {message}"
+
+
+class GameLogger:
+    """專案共用的分級日誌：per-subsystem 等級、延遲格式化、環狀緩衝區"""
+
+    def __init__(self, default_level=INFO, echo_level=WARNING, capacity=2000):
+        self.default_level = default_level
+        self.echo_level = echo_level
+        self.levels = {}
+        self.records = deque(maxlen=capacity)
+        self.start_time = time.perf_counter()
+
+    def set_level(self, subsystem, level):
+        self.levels[subsystem] = level
+
+    def get_level(self, subsystem):
+        return self.levels.get(subsystem, self.default_level)
+
+    def is_enabled(self, subsystem, level):
+        """參數本身很貴時先用這個判斷，再呼叫 log"""
+        return level >= self.levels.get(subsystem, self.default_level)
+
+    def configure(self, spec):
+        """解析 'combat=DEBUG,sound=INFO,*=WARNING,echo=ERROR'；格式錯誤的項目略過"""
+        for entry in spec.split(","):
+            name, _, value = entry.partition("=")
+            name = name.strip()
+            if not name or not value:
+                continue
+            try:
+                level = parse_level(value)
+            except KeyError:
+                print(f"⚠️ 無法解析日誌等級: {entry.strip()}")
+                continue
+            if name == "*":
+                self.default_level = level
+            elif name == "echo":
+                self.echo_level = level
+            else:
+                self.levels[name] = level
+
+    def log(self, subsystem, level, message, *args):
+        if level < self.levels.get(subsystem, self.default_level):
+            return
+        record = (time.perf_counter() - self.start_time, subsystem, level, message, args)
+        self.records.append(record)
+        if level >= self.echo_level:
+            print(format_record(record))
+
+    def debug(self, subsystem, message, *args):
+        self.log(subsystem, DEBUG, message, *args)
+
+    def info(self, subsystem, message, *args):
+        self.log(subsystem, INFO, message, *args)
+
+    def warning(self, subsystem, message, *args):
+        self.log(subsystem, WARNING, message, *args)
+
+    def error(self, subsystem, message, *args):
+        self.log(subsystem, ERROR, message, *args)
+
+    def get_lines(self, subsystem=None, min_level=DEBUG):
+        """緩衝區內容（格式化後），可依子系統和等級過濾"""
+        return [format_record(record) for record in self.records
+                if record[2] >= min_level and (subsystem is None or record[1] == subsystem)]
+
+    def dump(self, path=DEFAULT_LOG_PATH):
+        """把緩衝區寫到檔案，回傳寫入的行數（失敗回傳 None）"""
+        lines = self.get_lines()
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + ("\n" if lines else ""))
+            print(f"📝 日誌已寫入: {path} ({len(lines)} 行)")
+            return len(lines)
+        except OSError as e:
+            print(f"❌ 日誌寫入失敗 {path}: {e}")
+            return None
+
+    def clear(self):
+        self.records.clear()
+
+
+# 全域日誌
+game_logger = GameLogger()
+game_logger.configure(os.environ.get("GAME_LOG", ""))
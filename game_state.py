@@ -1,5 +1,26 @@
-import random
 import time
+from scheduler import scheduler
+from rng_service import rng_service
+from content_pipeline import content_pipeline
+
+# 🆕 升級公式參數（平衡模擬工具 tools/combat_balance.py 使用同一組數值）
+EXP_PER_LEVEL = 100  # 升級所需經驗 = 等級 × 100
+LEVEL_UP_GAINS = {
+    "max_hp": (8, 15),
+    "attack": (2, 5),
+    "defense": (1, 3),
+}
+
+# 內容檔案讀不到時的備用敵人
+FALLBACK_ENEMY = {
+    "id": "zombie_student",
+    "name": "殭屍學生",
+    "hp": 30,
+    "attack": 8,
+    "defense": 2,
+    "exp_reward": 15,
+    "description": "一個被感染的學生，眼神空洞地遊蕩著..."
+}
 
 class GameState:
     def __init__(self):
@@ -27,41 +48,8 @@ class GameState:
             "game_completed": False
         }
         
-        # 敵人資料
-        self.enemies = [
-            {
-                "name": "殭屍學生",
-                "hp": 30,
-                "attack": 8,
-                "defense": 2,
-                "exp_reward": 15,
-                "description": "一個被感染的學生，眼神空洞地遊蕩著..."
-            },
-            {
-                "name": "感染職員",
-                "hp": 45,
-                "attack": 12,
-                "defense": 4,
-                "exp_reward": 25,
-                "description": "餐廳的工作人員，現在只剩下進食的本能..."
-            },
-            {
-                "name": "變異殭屍",
-                "hp": 60,
-                "attack": 15,
-                "defense": 6,
-                "exp_reward": 40,
-                "description": "病毒變異後的產物，比普通殭屍更加危險..."
-            },
-            {
-                "name": "神秘外星人",
-                "hp": 80,
-                "attack": 20,
-                "defense": 8,
-                "exp_reward": 60,
-                "description": "身穿銀色制服的外星生物，似乎在尋找什麼..."
-            }
-        ]
+        # 敵人資料（🆕 由 assets/data/enemy_stats.json 載入，順序決定各等級會遇到哪些敵人）
+        self.enemies = content_pipeline.get_enemies() or [dict(FALLBACK_ENEMY)]
         
         # 隨機遭遇機率
         self.encounter_chance = 0  # 5%機率
@@ -70,7 +58,7 @@ class GameState:
         
         # 遊戲訊息
         self.messages = []
-        self.message_timer = 0
+        self.message_timer = None
     
     def set_state(self, new_state):
         self.current_state = new_state
@@ -86,7 +74,7 @@ class GameState:
         self.player_stats["exp"] += exp_amount
         
         # 檢查升級
-        exp_needed = self.player_stats["level"] * 100
+        exp_needed = self.player_stats["level"] * EXP_PER_LEVEL
         if self.player_stats["exp"] >= exp_needed:
             self.level_up()
     
@@ -95,9 +83,10 @@ class GameState:
         self.player_stats["exp"] = 0
         
         # 提升能力值
-        hp_increase = random.randint(8, 15)
-        attack_increase = random.randint(2, 5)
-        defense_increase = random.randint(1, 3)
+        rng = rng_service.stream("progression")
+        hp_increase = rng.randint(*LEVEL_UP_GAINS["max_hp"])
+        attack_increase = rng.randint(*LEVEL_UP_GAINS["attack"])
+        defense_increase = rng.randint(*LEVEL_UP_GAINS["defense"])
         
         self.player_stats["max_hp"] += hp_increase
         self.player_stats["hp"] = self.player_stats["max_hp"]  # 升級時回滿血
@@ -127,7 +116,7 @@ class GameState:
         
         # 檢查時間間隔和機率
         time_check = current_time - self.last_encounter_time > self.min_encounter_interval
-        random_check = random.random() < self.encounter_chance
+        random_check = rng_service.stream("encounter").random() < self.encounter_chance
         
         if time_check and random_check:
             self.last_encounter_time = current_time
@@ -137,32 +126,44 @@ class GameState:
     def get_random_enemy(self):
         # 根據玩家等級調整敵人出現機率
         level = self.player_stats["level"]
+        rng = rng_service.stream("encounter")
         
         if level == 1:
             # 只會遇到殭屍學生
             return self.enemies[0].copy()
         elif level <= 3:
             # 殭屍學生和感染職員
-            return random.choice(self.enemies[:2]).copy()
+            return rng.choice(self.enemies[:2]).copy()
         elif level <= 5:
             # 前三種敵人
-            return random.choice(self.enemies[:3]).copy()
+            return rng.choice(self.enemies[:3]).copy()
         else:
             # 所有敵人
-            return random.choice(self.enemies).copy()
+            return rng.choice(self.enemies).copy()
+    
+    def get_enemy(self, enemy_id):
+        """🆕 依 id（戰鬥區域使用的 zombie_student 等）取得敵人複本，找不到時回傳 None"""
+        for enemy in self.enemies:
+            if enemy.get("id") == enemy_id:
+                return enemy.copy()
+        return None
     
     def add_message(self, message):
         self.messages.append(message)
-        self.message_timer = 180  # 3秒顯示時間 (60fps * 3)
-    
-    def update_messages(self):
-        if self.message_timer > 0:
-            self.message_timer -= 1
-        else:
+        self.restart_message_timer()
+    
+    def restart_message_timer(self):
+        """🆕 3秒後移除最舊的訊息（由全域排程器觸發）"""
+        if self.message_timer:
+            self.message_timer.cancel()
+        self.message_timer = scheduler.call_later(180, self.expire_message)  # 3秒顯示時間 (60fps * 3)
+    
+    def expire_message(self):
+        self.message_timer = None
+        if self.messages:
+            self.messages.pop(0)
             if self.messages:
-                self.messages.pop(0)
-                if self.messages:
-                    self.message_timer = 180
+                self.restart_message_timer()
     
     def get_current_messages(self):
         return self.messages[:3]  # 最多顯示3條訊息
@@ -0,0 +1,102 @@
+# hud_widgets.py - 保留模式 HUD 元件
+import pygame
+from font_manager import font_manager
+
+# 尚未組合過的標記（綁定值可能是 None）
+_UNSET = object()
+
+
+class HudWidget:
+    """HUD 元件：綁定的值沒變就直接 blit 上次組合好的 Surface
+
+    binding(*args) 回傳可比較的值，compose(value) 依值產生 Surface（None 表示不顯示）。
+    """
+
+    def __init__(self, position, binding, compose=None):
+        self.position = position
+        self.binding = binding
+        self.compose_function = compose
+        self.value = _UNSET
+        self.surface = None
+        self.compose_count = 0
+
+    def compose(self, value):
+        return self.compose_function(value)
+
+    def update(self, *args):
+        """讀取綁定的值，有變化時才重新組合"""
+        value = self.binding(*args)
+        if value != self.value:
+            self.value = value
+            self.surface = self.compose(value)
+            self.compose_count += 1
+
+    def draw(self, screen, *args):
+        self.update(*args)
+        if self.surface is not None:
+            screen.blit(self.surface, self.position)
+
+    def invalidate(self):
+        """強制下一次繪製時重新組合"""
+        self.value = _UNSET
+
+
+class TextWidget(HudWidget):
+    """文字元件：綁定值為 (文字, 顏色)，或 None 表示隱藏"""
+
+    def __init__(self, position, binding, size):
+        super().__init__(position, binding)
+        self.size = size
+
+    def compose(self, value):
+        if value is None:
+            return None
+        text, color = value
+        return font_manager.render_text(text, self.size, color)
+
+
+class BarWidget(HudWidget):
+    """進度條元件：綁定值為 (目前值, 最大值)"""
+
+    def __init__(self, rect, binding, background, color):
+        super().__init__(rect.topleft, binding)
+        self.width = rect.width
+        self.height = rect.height
+        self.background = background
+        self.color = color  # 固定顏色，或 color(比例) 依比例決定顏色
+
+    def compose(self, value):
+        current, maximum = value
+        ratio = current / maximum if maximum else 0
+        color = self.color(ratio) if callable(self.color) else self.color
+
+        surface = pygame.Surface((self.width, self.height))
+        surface.fill(self.background)
+        pygame.draw.rect(surface, color, pygame.Rect(0, 0, self.width * ratio, self.height))
+        return surface
+
+
+class HudLayer:
+    """一組 HUD 元件，依加入順序繪製"""
+
+    def __init__(self):
+        self.widgets = []
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def draw(self, screen, *args):
+        for widget in self.widgets:
+            widget.draw(screen, *args)
+
+    def invalidate(self):
+        for widget in self.widgets:
+            widget.invalidate()
+
+    def get_stats(self):
+        """各元件重新組合的次數"""
+        return {
+            "widgets": len(self.widgets),
+            "composes": sum(widget.compose_count for widget in self.widgets)
+        }
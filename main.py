@@ -2,7 +2,6 @@
 import pygame
 import sys
 import time
-import random
 from game_state import GameState
 from map_manager import MapManager
 from player import Player
@@ -12,11 +11,25 @@ from inventory import Inventory
 from font_manager import font_manager
 from character_selector import CharacterSelector
 from sound_manager import sound_manager 
+from frame_profiler import FrameProfiler, null_profiler
+from asset_loader import asset_loader
+from sprite_cache import sprite_cache
+from scheduler import scheduler
+from replay import DEFAULT_REPLAY_PATH, InputRecorder, new_session_seed, state_digest
+from rng_service import rng_service
+from game_logger import game_logger
 
 class Game:
-    def __init__(self):
+    def __init__(self, use_dirty_rects=False, seed=None, record_path=None):
         pygame.init()
         
+        # 🆕 可重現的遊戲：所有亂數串流都由遊戲種子衍生，並記錄所有輸入事件（重播用）
+        self.seed = new_session_seed() if seed is None else seed
+        rng_service.reseed(self.seed)
+        self.sim_tick = 0
+        self.record_path = record_path
+        self.recorder = InputRecorder(self.seed) if record_path else None
+        
         # 檢查中文字體
         if not font_manager.install_chinese_font():
             print("警告: 中文字體可能無法正常顯示")
@@ -25,13 +38,30 @@ class Game:
         # 遊戲設定
         self.SCREEN_WIDTH = 1024
         self.SCREEN_HEIGHT = 768
-        self.FPS = 60
+        self.FPS = 144          # 🆕 畫面更新上限，可以比模擬頻率高
+        
+        # 🆕 固定步長模擬：遊戲邏輯永遠以 SIM_HZ 前進，和畫面更新率無關
+        self.SIM_HZ = 60
+        self.sim_dt = 1.0 / self.SIM_HZ
+        self.max_frame_time = 0.25   # 卡頓時最多補 0.25 秒，避免越補越慢
+        self.max_sim_steps = 8       # 每幀最多跑幾個模擬 tick
+        self.sim_accumulator = 0.0
+        self.render_alpha = 1.0      # 渲染時在兩個 tick 之間內插的比例
+        
+        # 🆕 閒置節能：畫面靜止時不重畫，阻塞等待事件
+        self.idle_pacing = True
+        self.idle_wait_ms = 500      # 最長等待時間，逾時後重新檢查一次
+        self.idle_frame_drawn = False
+        self.idle_wait_count = 0
         
         # 初始化畫面
         self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
         pygame.display.set_caption("末世第二餐廳")
         self.clock = pygame.time.Clock()
         
+        # 🆕 背景解碼所有圖片，同時顯示載入畫面
+        self.preload_assets()
+        
         # 🆕 遊戲流程控制
         self.show_intro = True
         self.show_character_select = False
@@ -51,12 +81,25 @@ class Game:
         self.running = True
         
         # 互動冷卻機制
-        self.last_interaction_time = 0
         self.interaction_cooldown = 0.5  # 0.5秒冷卻時間
+        self.interaction_cooldown_timer = None
         
         # 除錯模式
         self.debug_mode = False
         
+        # 🆕 髒矩形呈現模式：只把有變化的區域送到螢幕
+        self.use_dirty_rects = use_dirty_rects
+        self.show_dirty_rects = False       # 除錯覆蓋層：標示更新區域
+        self.force_full_present = True      # 下一幀強制整個畫面更新
+        self.last_present_signature = None
+        self.last_overlay_rects = []
+        self.dirty_rect_stats = {"rects": 0, "coverage": 1.0}
+        
+        # 🆕 效能分析器（Shift+F3 或 F1 除錯模式開啟）
+        self.profiler = FrameProfiler()
+        self.active_profiler = None  # 只有在本幀開始時已開啟才會量測
+        self.profiler_rect = pygame.Rect(10, 300, 400, 300)
+        
         # 🎵 音樂系統相關
         self.current_game_mode = "intro"  # 追蹤當前遊戲模式
         self.last_game_mode = None        # 追蹤上一個模式，避免重複播放
@@ -64,6 +107,51 @@ class Game:
         # 🎵 啟動介紹音樂
         sound_manager.play_music("intro", loop=True)
 
+    def preload_assets(self):
+        """🆕 在執行緒池解碼圖片和音效，主執行緒只負責畫載入進度"""
+        start_time = time.time()
+        # 已烘焙的圖片只讀取縮放後的資料，其餘圖片解碼原圖
+        baked_sources = sprite_cache.prefetch("assets/images")
+        asset_loader.prefetch_directory("assets/images", skip=baked_sources)
+        
+        while not asset_loader.is_idle():
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    asset_loader.shutdown()
+                    pygame.quit()
+                    sys.exit()
+            
+            done, total = asset_loader.get_progress()
+            self.render_loading_screen(done, total)
+            self.clock.tick(self.FPS)
+        
+        # 主執行緒轉換像素格式，之後各模組載入圖片時直接取用
+        asset_loader.finish_pending_images()
+        sound_manager.resolve_sound_effects()
+        
+        done, total = asset_loader.get_progress()
+        self.render_loading_screen(done, total)
+        print(f"📦 素材預載完成: {total} 個檔案，耗時 {time.time() - start_time:.2f} 秒")
+
+    def render_loading_screen(self, done, total):
+        """🆕 渲染載入進度畫面"""
+        self.screen.fill((0, 0, 0))
+        
+        progress = done / total if total else 1.0
+        bar_rect = pygame.Rect(self.SCREEN_WIDTH // 2 - 200, self.SCREEN_HEIGHT // 2, 400, 24)
+        pygame.draw.rect(self.screen, (60, 60, 60), bar_rect)
+        fill_rect = pygame.Rect(bar_rect.x, bar_rect.y, int(bar_rect.width * progress), bar_rect.height)
+        pygame.draw.rect(self.screen, (0, 200, 100), fill_rect)
+        pygame.draw.rect(self.screen, (255, 255, 255), bar_rect, 2)
+        
+        title = font_manager.render_text("末世第二餐廳", 32, (255, 255, 0))
+        self.screen.blit(title, title.get_rect(center=(self.SCREEN_WIDTH // 2, bar_rect.y - 50)))
+        
+        status = font_manager.render_text(f"載入素材中... {done}/{total}", 18, (200, 200, 200))
+        self.screen.blit(status, status.get_rect(center=(self.SCREEN_WIDTH // 2, bar_rect.bottom + 25)))
+        
+        pygame.display.flip()
+
     def initialize_game_components(self):
         """🆕 在角色選擇完成後初始化遊戲組件"""
         print("🎮 初始化遊戲組件...")
@@ -78,6 +166,12 @@ class Game:
             self.game_state.player_stats["max_hp"] = initial_hp
             print(f"🎭 角色初始血量設定為: {initial_hp}")
         
+        # 🆕 重新開始時先釋放舊元件的圖片
+        if self.map_manager:
+            self.map_manager.release_sprites()
+        if self.player:
+            self.player.release_sprites()
+        
         # 初始化遊戲組件
         self.map_manager = MapManager()
         self.player = Player(x=400, y=300, character_data=self.selected_character)
@@ -122,11 +216,18 @@ class Game:
             elif mode == "game_over":
                 sound_manager.play_music("game_over", loop=False)
             
-            print(f"🎵 遊戲模式切換: {self.last_game_mode} → {mode}")
+            game_logger.info("game", "🎵 遊戲模式切換: %s → %s", self.last_game_mode, mode)
+
+    def handle_events(self, events=None):
+        """修復版事件處理 - 整合角色選擇 + 音樂控制
 
-    def handle_events(self):
-        """修復版事件處理 - 整合角色選擇 + 音樂控制"""
-        for event in pygame.event.get():
+        🆕 events 預設從 pygame 取得；重播時直接傳入記錄的事件
+        """
+        if events is None:
+            events = pygame.event.get()
+            if self.recorder:
+                self.recorder.record(self.sim_tick, events)
+        for event in events:
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
@@ -160,6 +261,24 @@ class Game:
                     # M鍵: 地圖切換
                     self.handle_map_toggle()
                     continue
+                # 🆕 Shift+F1: 髒矩形模式 / Shift+F2: 髒矩形覆蓋層（任何狀態下可用）
+                elif event.key == pygame.K_F1 and event.mod & pygame.KMOD_SHIFT:
+                    self.toggle_dirty_rects()
+                    continue
+                elif event.key == pygame.K_F2 and event.mod & pygame.KMOD_SHIFT:
+                    self.show_dirty_rects = not self.show_dirty_rects
+                    self.force_full_present = True
+                    print(f"🔧 髒矩形覆蓋層: {'開啟' if self.show_dirty_rects else '關閉'}")
+                    continue
+                # 🆕 Shift+F3: 效能分析HUD（任何狀態下可用）
+                elif event.key == pygame.K_F3 and event.mod & pygame.KMOD_SHIFT:
+                    profiler_status = self.profiler.toggle()
+                    print(f"📊 效能分析: {'開啟' if profiler_status else '關閉'}")
+                    continue
+                # 🆕 Shift+F4: 把日誌緩衝區寫到 .cache/logs/game.log
+                elif event.key == pygame.K_F4 and event.mod & pygame.KMOD_SHIFT:
+                    game_logger.dump()
+                    continue
                 # 🎵 音樂控制快捷鍵
                 elif event.key == pygame.K_F6:
                     # F6: 切換背景音樂
@@ -230,6 +349,8 @@ class Game:
                     self.character_selector.handle_event(event)
                     if self.character_selector.is_selection_complete():
                         self.selected_character = self.character_selector.get_selected_character()
+                        # 🆕 預覽圖片不再需要，交回共用登錄表
+                        self.character_selector.release_sprites()
                         self.show_character_select = False
                         self.game_started = True
                         self.initialize_game_components()
@@ -352,6 +473,10 @@ class Game:
         if self.player:
             self.player.debug_movement = self.debug_mode
         
+        # 📊 除錯模式同時顯示效能分析HUD
+        if self.profiler.enabled != self.debug_mode:
+            self.profiler.toggle()
+        
         print(f"🔧 除錯模式: {'開啟' if self.debug_mode else '關閉'}")
         if self.debug_mode:
             self.print_debug_info()
@@ -425,52 +550,52 @@ class Game:
     def handle_combat_input(self, event):
         """處理戰鬥輸入 - 修復音效版"""
         key_name = pygame.key.name(event.key)
-        print(f"⚔️ 戰鬥按鍵: {key_name}")
+        game_logger.debug("combat", "⚔️ 戰鬥按鍵: %s", key_name)
         
         # 如果戰鬥已經有結果，立即結束
         if self.combat_system.combat_result:
-            print(f"⚠️ 戰鬥已有結果: {self.combat_system.combat_result}")
+            game_logger.debug("combat", "⚠️ 戰鬥已有結果: %s", self.combat_system.combat_result)
             self.handle_combat_end()
             return
         
         # 🔧 修復：確保音效系統正常
-        print(f"🔊 音效系統狀態: 音效開啟={sound_manager.is_sfx_enabled}, 音量={sound_manager.sfx_volume}")
+        game_logger.debug("combat", "🔊 音效系統狀態: 音效開啟=%s, 音量=%s", sound_manager.is_sfx_enabled, sound_manager.sfx_volume)
         
         # 檢查是否是正確的數字鍵並執行行動
         if event.key == pygame.K_1:
-            print("🗡️ 選擇攻擊")
+            game_logger.debug("combat", "🗡️ 選擇攻擊")
             # 🎵 戰鬥音效：確保播放
-            print("🔊 嘗試播放 combat_hit 音效...")
+            game_logger.debug("combat", "🔊 嘗試播放 combat_hit 音效...")
             try:
                 sound_manager.play_sfx("combat_hit")
-                print("✅ combat_hit 音效播放指令已發送")
+                game_logger.debug("combat", "✅ combat_hit 音效播放指令已發送")
             except Exception as e:
-                print(f"❌ combat_hit 音效播放失敗: {e}")
+                game_logger.error("combat", "❌ combat_hit 音效播放失敗: %s", e)
             
             # 執行戰鬥行動
             self.combat_system.player_action("attack")
             
         elif event.key == pygame.K_2:
-            print("🛡️ 選擇防禦")
+            game_logger.debug("combat", "🛡️ 選擇防禦")
             # 🎵 防禦音效
-            print("🔊 嘗試播放 combat_defend 音效...")
+            game_logger.debug("combat", "🔊 嘗試播放 combat_defend 音效...")
             try:
                 sound_manager.play_sfx("combat_defend")
-                print("✅ combat_defend 音效播放指令已發送")
+                game_logger.debug("combat", "✅ combat_defend 音效播放指令已發送")
             except Exception as e:
-                print(f"❌ combat_defend 音效播放失敗: {e}")
+                game_logger.error("combat", "❌ combat_defend 音效播放失敗: %s", e)
             
             self.combat_system.player_action("defend")
             
         elif event.key == pygame.K_3:
-            print("🏃 選擇逃跑")
+            game_logger.debug("combat", "🏃 選擇逃跑")
             # 🎵 移動音效
-            print("🔊 嘗試播放 move 音效...")
+            game_logger.debug("combat", "🔊 嘗試播放 move 音效...")
             try:
                 sound_manager.play_sfx("move")
-                print("✅ move 音效播放指令已發送")
+                game_logger.debug("combat", "✅ move 音效播放指令已發送")
             except Exception as e:
-                print(f"❌ move 音效播放失敗: {e}")
+                game_logger.error("combat", "❌ move 音效播放失敗: %s", e)
             
             self.combat_system.player_action("escape")
         else:
@@ -478,7 +603,7 @@ class Game:
         
         # 行動後立即檢查結果
         if self.combat_system.combat_result:
-            print(f"🎯 行動後立即檢測到結果: {self.combat_system.combat_result}")
+            game_logger.debug("combat", "🎯 行動後立即檢測到結果: %s", self.combat_system.combat_result)
             self.handle_combat_end()
 
     def handle_combat_end(self):
@@ -487,11 +612,11 @@ class Game:
             return
         
         result = self.combat_system.combat_result
-        print(f"🏁 處理戰鬥結束: {result}")
+        game_logger.debug("combat", "🏁 處理戰鬥結束: %s", result)
         
         try:
             if result == "win":
-                print("✅ 處理戰鬥勝利")
+                game_logger.debug("combat", "✅ 處理戰鬥勝利")
                 sound_manager.play_sfx("success")  # 🎵 勝利音效
                 self.ui.show_message("戰鬥勝利！獲得經驗值！")
                 
@@ -503,16 +628,16 @@ class Game:
                     # 移除戰鬥區域
                     if hasattr(self.map_manager, 'remove_combat_zone'):
                         self.map_manager.remove_combat_zone(zone, floor)
-                        print(f"🗑️ 勝利！移除戰鬥區域: {zone['name']}")
+                        game_logger.debug("combat", "🗑️ 勝利！移除戰鬥區域: %s", zone['name'])
                     
                     # 給予經驗值
                     if hasattr(self.game_state, 'player_stats') and self.combat_system.current_enemy:
                         exp_gain = self.combat_system.current_enemy.get("exp_reward", 10)
                         self.game_state.player_stats["exp"] += exp_gain
-                        print(f"🎯 獲得 {exp_gain} 經驗值")
+                        game_logger.debug("combat", "🎯 獲得 %s 經驗值", exp_gain)
                 
             elif result == "escape":
-                print("🏃 處理逃跑成功")
+                game_logger.debug("combat", "🏃 處理逃跑成功")
                 sound_manager.play_sfx("success")  # 🎵 成功音效
                 self.ui.show_message("成功逃離了危險區域！")
                 
@@ -524,20 +649,20 @@ class Game:
                     # 移除戰鬥區域
                     if hasattr(self.map_manager, 'remove_combat_zone'):
                         self.map_manager.remove_combat_zone(zone, floor)
-                        print(f"🗑️ 逃跑成功！移除戰鬥區域: {zone['name']}")
+                        game_logger.debug("combat", "🗑️ 逃跑成功！移除戰鬥區域: %s", zone['name'])
                     else:
-                        print("⚠️ map_manager 沒有 remove_combat_zone 方法")
+                        game_logger.warning("combat", "⚠️ map_manager 沒有 remove_combat_zone 方法")
                 
             elif result == "lose":
-                print("💀 處理戰鬥失敗")
+                game_logger.debug("combat", "💀 處理戰鬥失敗")
                 sound_manager.play_sfx("error")  # 🎵 失敗音效
                 self.ui.show_message("你被擊敗了...")
         
         except Exception as e:
-            print(f"❌ 處理戰鬥結果錯誤: {e}")
+            game_logger.error("combat", "❌ 處理戰鬥結果錯誤: %s", e)
         
         # 🔥 關鍵：立即重置所有戰鬥狀態 🔥
-        print("🔄 立即重置戰鬥狀態")
+        game_logger.debug("combat", "🔄 立即重置戰鬥狀態")
         self.combat_system.in_combat = False
         self.combat_system.combat_result = None
         self.combat_system.current_enemy = None
@@ -556,7 +681,7 @@ class Game:
         if hasattr(self, 'current_combat_zone'):
             self.current_combat_zone = None
         
-        print("✅ 戰鬥完全結束，立即回到探索狀態")
+        game_logger.debug("combat", "✅ 戰鬥完全結束，立即回到探索狀態")
 
     def force_end_combat(self):
         """強制結束戰鬥 - 緊急版"""
@@ -611,8 +736,12 @@ class Game:
             self.ui.select_dialogue_option(2)
             self.check_dialogue_end()
         elif event.key == pygame.K_SPACE:
-            self.ui.continue_dialogue()
-            self.check_dialogue_end()
+            # 🆕 文字還在逐字顯示時，空白鍵先顯示全部
+            if self.ui.is_dialogue_revealing():
+                self.ui.skip_dialogue_reveal()
+            else:
+                self.ui.continue_dialogue()
+                self.check_dialogue_end()
 
     def check_dialogue_end(self):
         """檢查對話是否結束，恢復exploration狀態 + 音樂"""
@@ -623,13 +752,16 @@ class Game:
             if self.debug_mode:
                 print("💬 對話結束，回到exploration狀態")
 
+    def start_interaction_cooldown(self):
+        """🆕 互動冷卻改由排程器倒數（以模擬 tick 計時）"""
+        self.interaction_cooldown_timer = scheduler.call_later(scheduler.ticks(self.interaction_cooldown))
+
     def interact(self):
         """互動處理 + 音效"""
         # 檢查互動冷卻
-        current_time = time.time()
-        if current_time - self.last_interaction_time < self.interaction_cooldown:
+        if self.interaction_cooldown_timer and self.interaction_cooldown_timer.pending:
             if self.debug_mode:
-                print(f"⏰ 互動冷卻中，還需等待 {self.interaction_cooldown - (current_time - self.last_interaction_time):.1f} 秒")
+                print(f"⏰ 互動冷卻中，還需等待 {self.interaction_cooldown_timer.remaining / scheduler.tick_rate:.1f} 秒")
             return
         
         # 檢查玩家附近是否有可互動物件
@@ -642,7 +774,7 @@ class Game:
         
         if item_pickup:
             self.collect_item_new(item_pickup)
-            self.last_interaction_time = current_time
+            self.start_interaction_cooldown()
             return
         
         # 然後檢查其他互動物件
@@ -656,7 +788,7 @@ class Game:
         if interaction:
             if self.debug_mode:
                 print(f"✅ 找到互動物件: {interaction}")
-            self.last_interaction_time = current_time
+            self.start_interaction_cooldown()
             
             # 🎵 播放互動音效
             sound_manager.play_sfx("interact")
@@ -870,24 +1002,20 @@ class Game:
 
     def start_combat_in_zone(self, combat_zone):
         """在戰鬥區域開始戰鬥 + 音樂"""
-        print(f"🔄 準備切換到戰鬥狀態")
-        print(f"   當前遊戲狀態: {self.game_state.current_state}")
+        game_logger.debug("combat", "🔄 準備切換到戰鬥狀態")
+        game_logger.debug("combat", "   當前遊戲狀態: %s", self.game_state.current_state)
         
         self.game_state.current_state = "combat"
         # 🎵 切換到戰鬥音樂
         self.set_game_mode("combat")
-        print(f"   設定後遊戲狀態: {self.game_state.current_state}")
+        game_logger.debug("combat", "   設定後遊戲狀態: %s", self.game_state.current_state)
         
         # 從戰鬥區域選擇敵人
         enemy_types = combat_zone.get("enemies", ["zombie_student"])
-        enemy_type = random.choice(enemy_types)
+        enemy_type = rng_service.stream("encounter").choice(enemy_types)
         
         # 根據敵人類型獲取敵人數據
-        enemy = None
-        for e in self.game_state.enemies:
-            if enemy_type in e["name"].lower().replace(" ", "_"):
-                enemy = e.copy()
-                break
+        enemy = self.game_state.get_enemy(enemy_type)
         
         if not enemy:
             enemy = self.game_state.enemies[0].copy()  # 備用敵人
@@ -895,13 +1023,13 @@ class Game:
         # 記錄當前戰鬥區域
         self.current_combat_zone = combat_zone
         
-        print(f"⚔️ 開始戰鬥: {enemy['name']} in {combat_zone['name']}")
-        print(f"   戰鬥前 combat_system.in_combat: {self.combat_system.in_combat}")
+        game_logger.debug("combat", "⚔️ 開始戰鬥: %s in %s", enemy['name'], combat_zone['name'])
+        game_logger.debug("combat", "   戰鬥前 combat_system.in_combat: %s", self.combat_system.in_combat)
         
         self.combat_system.start_combat(enemy)
         
-        print(f"   戰鬥後 combat_system.in_combat: {self.combat_system.in_combat}")
-        print(f"   戰鬥後 player_turn: {self.combat_system.player_turn}")
+        game_logger.debug("combat", "   戰鬥後 combat_system.in_combat: %s", self.combat_system.in_combat)
+        game_logger.debug("combat", "   戰鬥後 player_turn: %s", self.combat_system.player_turn)
 
     def check_victory_condition(self):
         """檢查勝利條件 + 音樂"""
@@ -916,13 +1044,20 @@ class Game:
             self.ui.show_message("你有解藥了！但還需要更強的實力才能完成任務...")
 
     def update(self):
+        """🆕 前進一個固定模擬 tick（1/SIM_HZ 秒），所有以幀計算的計時器都在這裡倒數"""
+        prof = self.active_profiler or null_profiler
+        # 🆕 推進世界計時器（訊息、互動冷卻），顯示時間不受畫面更新率影響
+        self.sim_tick += 1
+        scheduler.tick()
         if self.show_character_select:
             # 🆕 更新角色選擇器
             self.character_selector.update()
         elif self.game_started:
             if self.game_state.current_state == "combat":
                 # 戰鬥狀態更新
-                self.combat_system.update(self.game_state)
+                self.player.hold()
+                with prof.phase("combat_update"):
+                    self.combat_system.update(self.game_state)
                 
                 # 檢查戰鬥是否結束（通過戰鬥結果）
                 if self.combat_system.combat_result:
@@ -931,8 +1066,11 @@ class Game:
             elif self.game_state.current_state == "exploration":
                 # 只有在沒有UI開啟時才更新遊戲邏輯
                 if not self.ui.is_any_ui_open():
-                    self.player.update()
-                    self.map_manager.update()
+                    with prof.phase("player_update"):
+                        self.player.update()
+                    
+                    with prof.phase("map_update"):
+                        self.map_manager.update()
                     
                     # 戰鬥區域檢查
                     combat_zone = self.map_manager.check_combat_zone(
@@ -942,105 +1080,204 @@ class Game:
                         if self.debug_mode:
                             print(f"⚔️ 進入戰鬥區域: {combat_zone['name']}")
                         self.start_combat_in_zone(combat_zone)
+                else:
+                    # 🔧 模擬暫停時玩家停在原地，否則 render_alpha 每幀不同會讓角色抖動
+                    self.player.hold()
+            
+            elif self.game_state.current_state == "dialogue":
+                self.player.hold()
+                # 🆕 推進對話打字機效果
+                self.ui.update_dialogue()
+            else:
+                self.player.hold()
+            
             
     def render(self):
+        prof = self.active_profiler or null_profiler
         self.screen.fill((0, 0, 0))
         
         if self.show_intro:
-            self.render_intro()
+            with prof.phase("scene_render"):
+                self.render_intro()
         elif self.show_character_select:
             # 🆕 渲染角色選擇畫面
-            self.character_selector.render()
+            with prof.phase("scene_render"):
+                self.character_selector.render()
         elif self.game_started:
             # 根據遊戲狀態渲染不同畫面
             if self.game_state.current_state == "combat":
                 # 戰鬥畫面
-                self.combat_system.render(self.screen, self.game_state)
+                with prof.phase("scene_render"):
+                    self.combat_system.render(self.screen, self.game_state)
             else:
                 # 探索畫面
                 # 渲染地圖
-                self.map_manager.render(self.screen)
-                # 渲染玩家
-                self.player.render(self.screen)
+                with prof.phase("map_render"):
+                    self.map_manager.render(self.screen)
+                
+                # 渲染玩家（🆕 位置依 render_alpha 內插）
+                with prof.phase("player_render"):
+                    self.player.render(self.screen, self.render_alpha)
             
             # UI總是在最上層渲染
-            self.ui.render(self.game_state, self.player, self.inventory)
-            
-            # 渲染除錯資訊
-            if self.debug_mode:
-                self.render_debug_info()
+            with prof.phase("ui_render"):
+                self.ui.render(self.game_state, self.player, self.inventory)
         
-        pygame.display.flip()
+        # 📊 效能分析HUD
+        if self.profiler.enabled:
+            self.render_debug_info()
+        
+        with prof.phase("flip"):
+            if self.use_dirty_rects:
+                self.present_dirty_rects()
+            else:
+                pygame.display.flip()
 
-    def render_debug_info(self):
-        """渲染除錯資訊 + 音效狀態"""
-        debug_rect = pygame.Rect(10, 300, 400, 300)  # 🆕 增加寬度和高度以容納音效資訊
-        pygame.draw.rect(self.screen, (0, 0, 0, 180), debug_rect)
-        pygame.draw.rect(self.screen, (0, 255, 255), debug_rect, 1)
-        
-        debug_lines = [
-            "主程式除錯 (F1關閉)",
-            f"遊戲狀態: {self.game_state.current_state}",
-            f"玩家位置: ({self.player.x}, {self.player.y})",
-            f"玩家移動: {self.player.is_moving}",
-            f"當前樓層: {self.map_manager.current_floor}",
-            f"任何UI開啟: {self.ui.is_any_ui_open()}",
-            f"背包: {self.ui.show_inventory}",
-            f"地圖: {self.ui.show_map}",
-            f"對話: {self.ui.dialogue_active}",
-            f"樓梯圖片: {self.map_manager.use_sprites}",
-            f"地板圖片: {self.map_manager.use_floor_sprites}",
-            f"商店圖片: {self.map_manager.use_shop_sprites}",
-            f"戰鬥區域除錯: {self.map_manager.debug_show_combat_zones}",
-            f"已收集物品: {len(self.map_manager.collected_items)}",
-            f"🎭 角色: {self.player.get_character_name()}",
-            f"角色屬性: {self.player.get_character_stats()}",
-            f"🎵 當前音樂模式: {self.current_game_mode}",
-            f"🎵 音樂開啟: {sound_manager.is_music_enabled}",
-            f"🔊 音效開啟: {sound_manager.is_sfx_enabled}",
-            f"🎵 音樂音量: {int(sound_manager.music_volume * 100)}%",
-            f"🔊 音效音量: {int(sound_manager.sfx_volume * 100)}%",
-            f"🎵 正在播放: {pygame.mixer.music.get_busy()}",
-            f"🔊 已載入音效: {len(sound_manager.loaded_sfx)}"
-        ]
+    def toggle_dirty_rects(self):
+        """🆕 切換髒矩形呈現模式"""
+        self.use_dirty_rects = not self.use_dirty_rects
+        self.force_full_present = True
+        self.last_overlay_rects = []
+        print(f"🔧 髒矩形模式: {'開啟' if self.use_dirty_rects else '關閉'}")
+
+    def collect_dirty_rects(self):
+        """🆕 收集各子系統回報的變化區域"""
+        screen_rect = self.screen.get_rect()
+        rects = []
         
-        y_offset = 305
-        for line in debug_lines:
-            if "True" in line and ("移動" in line or "開啟" in line):
-                color = (255, 100, 100)
-            elif "樓梯圖片: True" in line or "地板圖片: True" in line:
-                color = (0, 255, 0)
-            elif "樓梯圖片: False" in line or "地板圖片: False" in line:
-                color = (255, 255, 0)
-            elif "商店圖片: True" in line:
-                color = (0, 255, 0)
-            elif "商店圖片: False" in line:
-                color = (255, 255, 0)
-            elif "戰鬥區域除錯: True" in line:
-                color = (255, 100, 100)
-            elif "戰鬥區域除錯: False" in line:
-                color = (100, 255, 100)
-            elif "已收集物品:" in line:
-                color = (255, 200, 100)
-            elif "🎭 角色:" in line:
-                color = (255, 150, 255)
-            elif "角色屬性:" in line:
-                color = (150, 255, 150)
-            elif "🎵" in line or "🔊" in line:  # 🆕 音效相關資訊顏色
-                if "True" in line or "開啟" in line:
-                    color = (100, 255, 255)  # 青色表示開啟
-                elif "False" in line or "關閉" in line:
-                    color = (255, 100, 255)  # 紫色表示關閉
-                else:
-                    color = (255, 255, 100)  # 黃色表示數值
-            elif self.ui.is_any_ui_open() and "UI開啟: True" in line:
-                color = (255, 255, 100)
+        # 每個子系統每幀都要詢問，讓它們記錄最新狀態
+        if self.show_character_select:
+            rects.extend(self.character_selector.get_dirty_rects())
+        elif self.game_started:
+            if self.game_state.current_state == "combat":
+                rects.extend(self.combat_system.get_dirty_rects(self.game_state))
             else:
-                color = (0, 255, 255)
-            
-            text_surface = font_manager.render_text(line, 12, color)
-            self.screen.blit(text_surface, (15, y_offset))
-            y_offset += 13
+                rects.extend(self.map_manager.get_dirty_rects())
+                rects.extend(self.player.get_dirty_rects())
+            rects.extend(self.ui.get_dirty_rects(self.game_state, self.player, self.inventory))
+        if self.profiler.enabled:
+            rects.append(self.profiler_rect.copy())
+        
+        # 畫面切換時整個畫面都要更新
+        signature = (
+            self.show_intro, self.show_character_select, self.game_started,
+            self.game_state.current_state if self.game_state else None,
+            self.debug_mode, self.show_dirty_rects, self.profiler.enabled
+        )
+        if self.force_full_present or signature != self.last_present_signature:
+            self.force_full_present = False
+            self.last_present_signature = signature
+            return [screen_rect]
+        
+        rects = [rect.clip(screen_rect) for rect in rects]
+        rects = [rect for rect in rects if rect.width > 0 and rect.height > 0]
+        
+        # 矩形太多時合併成一個，避免 display.update 的額外負擔
+        if len(rects) > 16:
+            rects = [rects[0].unionall(rects[1:])]
+        return rects
+
+    def present_dirty_rects(self):
+        """🆕 只更新有變化的區域"""
+        rects = self.collect_dirty_rects()
+        screen_area = self.SCREEN_WIDTH * self.SCREEN_HEIGHT
+        self.dirty_rect_stats = {
+            "rects": len(rects),
+            "coverage": min(1.0, sum(rect.width * rect.height for rect in rects) / screen_area)
+        }
+        
+        # 上一幀畫過覆蓋層的區域也要更新，才能擦掉舊的框線
+        previous_overlay_rects = self.last_overlay_rects
+        if self.show_dirty_rects:
+            self.render_dirty_rect_overlay(rects)
+            self.last_overlay_rects = list(rects)
+        else:
+            self.last_overlay_rects = []
+        present_rects = rects + previous_overlay_rects
+        
+        if present_rects:
+            pygame.display.update(present_rects)
+
+    def render_dirty_rect_overlay(self, rects):
+        """🆕 除錯覆蓋層：標示本幀更新的區域"""
+        for rect in rects:
+            pygame.draw.rect(self.screen, (255, 0, 255), rect, 1)
+        
+        stats_text = f"髒矩形: {self.dirty_rect_stats['rects']} 個, {self.dirty_rect_stats['coverage'] * 100:.1f}% 畫面"
+        stats_surface = font_manager.render_text(stats_text, 14, (255, 0, 255))
+        stats_rect = stats_surface.get_rect(bottomright=(self.SCREEN_WIDTH - 10, self.SCREEN_HEIGHT - 10))
+        self.screen.blit(stats_surface, stats_rect)
+        rects.append(stats_rect)
+
+    def render_debug_info(self):
+        """📊 效能分析HUD：幀時間走勢圖 + 各階段堆疊長條"""
+        panel = self.profiler_rect
+        pygame.draw.rect(self.screen, (0, 0, 0), panel)
+        pygame.draw.rect(self.screen, (0, 255, 255), panel, 1)
+        
+        frame_times = self.profiler.get_frame_times_ms()
+        averages = self.profiler.get_phase_averages_ms()
+        budget_ms = 1000.0 / self.FPS
+        average_ms = sum(frame_times) / len(frame_times) if frame_times else 0.0
+        worst_ms = max(frame_times) if frame_times else 0.0
+        
+        title_surface = font_manager.render_text("效能分析 (Shift+F3 / F1 關閉)", 14, (0, 255, 255))
+        self.screen.blit(title_surface, (panel.x + 8, panel.y + 5))
+        
+        summary = f"FPS: {self.clock.get_fps():.0f}   平均: {average_ms:.2f}ms   最差: {worst_ms:.2f}ms"
+        summary_color = (255, 100, 100) if worst_ms > budget_ms else (200, 255, 200)
+        summary_surface = font_manager.render_text(summary, 12, summary_color)
+        self.screen.blit(summary_surface, (panel.x + 8, panel.y + 25))
+        
+        # 幀時間走勢圖（最新的在右邊）
+        graph = pygame.Rect(panel.x + 10, panel.y + 45, panel.width - 20, 60)
+        pygame.draw.rect(self.screen, (30, 30, 30), graph)
+        scale_ms = max(budget_ms * 1.5, worst_ms)
+        budget_y = graph.bottom - int(graph.height * budget_ms / scale_ms)
+        pygame.draw.line(self.screen, (120, 60, 60), (graph.x, budget_y), (graph.right - 1, budget_y))
+        if len(frame_times) >= 2:
+            step = graph.width / (self.profiler.history - 1)
+            offset = self.profiler.history - len(frame_times)
+            points = [(graph.x + (offset + i) * step, graph.bottom - 1 - (graph.height - 2) * min(ms / scale_ms, 1.0))
+                      for i, ms in enumerate(frame_times)]
+            pygame.draw.lines(self.screen, (0, 255, 120), False, points)
+        
+        # 各階段平均耗時的堆疊長條（以一幀預算為刻度）
+        bar = pygame.Rect(panel.x + 10, panel.y + 115, panel.width - 20, 16)
+        pygame.draw.rect(self.screen, (30, 30, 30), bar)
+        total_scale = max(budget_ms, sum(averages.values()))
+        bar_x = float(bar.x)
+        for phase in self.profiler.PHASES:
+            width = bar.width * averages[phase] / total_scale
+            if width >= 1:
+                pygame.draw.rect(self.screen, self.profiler.PHASE_COLORS[phase],
+                                 (int(bar_x), bar.y, max(1, int(width)), bar.height))
+            bar_x += width
+        budget_x = bar.x + int(bar.width * budget_ms / total_scale) - 1
+        pygame.draw.line(self.screen, (255, 255, 255), (budget_x, bar.y - 2), (budget_x, bar.bottom + 1))
+        
+        # 圖例：兩欄顯示各階段平均耗時
+        legend_y = bar.bottom + 8
+        for i, phase in enumerate(self.profiler.PHASES):
+            x = panel.x + 10 + (i % 2) * 190
+            y = legend_y + (i // 2) * 16
+            pygame.draw.rect(self.screen, self.profiler.PHASE_COLORS[phase], (x, y + 3, 8, 8))
+            legend_text = f"{self.profiler.PHASE_NAMES[phase]}: {averages[phase]:.3f}ms"
+            legend_surface = font_manager.render_text(legend_text, 12, (220, 220, 220))
+            self.screen.blit(legend_surface, (x + 12, y))
+        
+        # 關鍵狀態
+        if self.game_started:
+            state_lines = [
+                f"遊戲狀態: {self.game_state.current_state}   樓層: {self.map_manager.current_floor}F",
+                f"玩家位置: ({self.player.x}, {self.player.y})   移動中: {self.player.is_moving}",
+                f"任何UI開啟: {self.ui.is_any_ui_open()}   已收集物品: {len(self.map_manager.collected_items)}"
+            ]
+            y_offset = panel.bottom - 18 * len(state_lines) - 5
+            for line in state_lines:
+                line_surface = font_manager.render_text(line, 12, (0, 255, 255))
+                self.screen.blit(line_surface, (panel.x + 8, y_offset))
+                y_offset += 18
 
     def render_intro(self):
         intro_text = [
@@ -1106,15 +1343,79 @@ class Game:
                 # 空行增加間距
                 y_offset += 15
 
+    def advance_simulation(self, frame_time):
+        """🆕 累積實際經過的時間，用固定的 1/SIM_HZ 秒一步步消化，回傳這幀跑了幾個 tick"""
+        self.sim_accumulator += min(frame_time, self.max_frame_time)
+        steps = 0
+        while self.sim_accumulator >= self.sim_dt and steps < self.max_sim_steps:
+            self.update()
+            self.sim_accumulator -= self.sim_dt
+            steps += 1
+        if steps == self.max_sim_steps:
+            # 追不上時丟掉多餘的時間，遊戲變慢但不會卡死
+            self.sim_accumulator = min(self.sim_accumulator, self.sim_dt)
+        self.render_alpha = self.sim_accumulator / self.sim_dt
+        return steps
+
+    def is_scene_quiescent(self):
+        """🆕 畫面是否靜止：沒有動畫計時器、呼吸燈或待顯示的訊息"""
+        if not self.idle_pacing or self.profiler.enabled or self.show_dirty_rects:
+            return False
+        if scheduler.active:
+            return False  # 還有計時器在倒數
+        if self.show_intro:
+            return True
+        if self.show_character_select:
+            return False  # 卡片有發光和縮放動畫
+        if not self.game_started:
+            return True
+        if self.ui.game_over or self.ui.game_completed:
+            return True  # 結束畫面蓋住整個地圖
+        if self.ui.is_animating():
+            return False
+        if self.game_state.current_state == "combat":
+            return not self.combat_system.is_animating()
+        return not (self.player.is_animating() or self.map_manager.is_animating())
+
+    def wait_for_activity(self):
+        """🆕 阻塞等待下一個事件（最多 idle_wait_ms），取到的事件放回佇列給 handle_events"""
+        self.idle_wait_count += 1
+        event = pygame.event.wait(self.idle_wait_ms)
+        if event.type != pygame.NOEVENT:
+            pygame.event.post(event)
+            self.idle_frame_drawn = False
+
     def run(self):
+        frame_time = 0.0
         while self.running:
-            self.handle_events()
-            self.update()
+            # 📊 分析器在幀開始時決定是否量測，關閉時各階段用不量測的空區塊
+            self.active_profiler = self.profiler if self.profiler.enabled else None
+            if self.active_profiler:
+                self.active_profiler.begin_frame()
+            with (self.active_profiler or null_profiler).phase("events"):
+                self.handle_events()
+            
+            self.advance_simulation(frame_time)
+            if self.idle_frame_drawn and self.is_scene_quiescent():
+                # 🆕 靜止畫面已經畫過：不重畫，等到有事件才繼續
+                self.wait_for_activity()
+                self.clock.tick()
+                frame_time = 0.0
+                continue
             self.render()
-            self.clock.tick(self.FPS)
+            self.idle_frame_drawn = self.is_scene_quiescent()
+            
+            if self.active_profiler:
+                self.active_profiler.end_frame()
+            frame_time = self.clock.tick(self.FPS) / 1000.0
+        
+        # 🎬 儲存這次遊玩的輸入記錄
+        if self.recorder:
+            self.recorder.save(self.record_path, self.sim_tick, state_digest(self))
         
         # 🎵 遊戲結束時清理音效系統
         sound_manager.cleanup()
+        asset_loader.shutdown()
         pygame.quit()
         sys.exit()
 
@@ -1135,6 +1436,7 @@ class Game:
         
         # 清理角色選擇器
         if self.character_selector:
+            self.character_selector.release_sprites()
             self.character_selector = None
         
         # 重置遊戲組件（如果已初始化）
@@ -1165,6 +1467,7 @@ class Game:
             self.map_manager.current_floor = 1
             self.map_manager.reset_items()
             self.map_manager.debug_show_combat_zones = False
+            self.map_manager.invalidate_static_layer()
             self.inventory = Inventory()
             
             # 重置UI狀態
@@ -1248,6 +1551,9 @@ def main():
         print("   F10 - 重新載入商店圖片")
         print("   F11 - 顯示商店圖片除錯資訊")
         print("   F12 - 切換戰鬥區域除錯顯示")
+        print("   Shift+F1 - 切換髒矩形呈現模式")
+        print("   Shift+F2 - 顯示髒矩形更新區域")
+        print("   Shift+F3 - 效能分析HUD (各階段耗時)")
         print("   ESC - 強制關閉所有UI / 退出")
         print("   I - 背包, M - 地圖, R - 重新開始(遊戲結束時)")
         print("")
@@ -1294,7 +1600,8 @@ def main():
         print("🚀 準備啟動遊戲...")
         print("=" * 80)
         
-        game = Game()
+        # 🎬 每次遊玩都記錄輸入，回報問題時附上重播檔（tools/play_replay.py 重播）
+        game = Game(record_path=DEFAULT_REPLAY_PATH)
         game.run()
         
     except KeyboardInterrupt:
@@ -1,13 +1,88 @@
+import copy
 import pygame
 import os
 import random
 from font_manager import font_manager
+from asset_loader import asset_loader
+from content_pipeline import content_pipeline
+from sprite_registry import sprite_registry
+from spatial_index import SpatialHash
+from game_logger import game_logger
+
+# 🆕 內建的備用樓層資料：正常情況從 assets/data 的 floors.json、combat_zones.json、map_items.json 載入，
+# 資料缺少或全部驗證失敗時才使用
+
+# 互動區域（商店、NPC等）
+FALLBACK_INTERACTIONS = {
+    1: [  # 1樓
+        {"type": "shop", "id": "A", "name": "7-11", "x": 50, "y": 350, "width": 80, "height": 60},
+        {"type": "shop", "id": "B", "name": "Subway", "x": 200, "y": 250, "width": 80, "height": 60},
+        {"type": "shop", "id": "C", "name": "茶壜", "x": 350, "y": 300, "width": 80, "height": 60},
+        {"type": "npc", "id": "npc1", "name": "驚慌學生", "x": 500, "y": 400, "width": 30, "height": 30},
+        {"type": "stairs", "direction": "up", "x": 450, "y": 100, "width": 96, "height": 48, "target_floor": 2}  # 🆕 加大樓梯尺寸
+    ],
+    2: [  # 2樓
+        {"type": "shop", "id": "D", "name": "和食軒", "x": 100, "y": 200, "width": 80, "height": 60},
+        {"type": "shop", "id": "E", "name": "素怡沅", "x": 300, "y": 150, "width": 80, "height": 60},
+        {"type": "npc", "id": "npc2", "name": "受傷職員", "x": 200, "y": 300, "width": 30, "height": 30},
+        {"type": "stairs", "direction": "up", "x": 450, "y": 90, "width": 96, "height": 48, "target_floor": 3},    # 🆕 加大樓梯尺寸
+        {"type": "stairs", "direction": "down", "x": 450, "y": 590, "width": 96, "height": 48, "target_floor": 1}  # 🆕 往上移10個像素：600→590
+    ],
+    3: [  # 3樓
+        {"type": "shop", "id": "L", "name": "咖啡廳", "x": 150, "y": 250, "width": 80, "height": 60},
+        {"type": "npc", "id": "npc4", "name": "神秘研究員", "x": 400, "y": 200, "width": 30, "height": 30},  # 🎯 改為npc4
+        {"type": "npc", "id": "npc5", "name": "最後的研究者", "x": 300, "y": 350, "width": 30, "height": 30},  # 🎯 改為npc5
+        {"type": "stairs", "direction": "down", "x": 450, "y": 600, "width": 96, "height": 48, "target_floor": 2}  # 🆕 加大樓梯尺寸
+    ]
+}
+
+# 戰鬥區域 - 🔧 完全隱藏，玩家無法察覺
+FALLBACK_COMBAT_ZONES = {
+    1: [
+        {"name": "走廊1", "x": 150, "y": 150, "width": 100, "height": 80, "enemies": ["zombie_student"]},
+        {"name": "角落", "x": 540, "y": 300, "width": 80, "height": 80, "enemies": ["infected_staff"]}  # 🔧 從545再往左調整5像素到540
+    ],
+    2: [
+        {"name": "走廊2", "x": 500, "y": 200, "width": 120, "height": 80, "enemies": ["zombie_student", "infected_staff"]},
+        {"name": "廚房", "x": 250, "y": 400, "width": 100, "height": 60, "enemies": ["mutant_zombie"]}
+    ],
+    3: [
+        {"name": "實驗室入口", "x": 100, "y": 100, "width": 150, "height": 100, "enemies": ["alien", "mutant_zombie"]},
+        {"name": "研究室", "x": 500, "y": 400, "width": 120, "height": 80, "enemies": ["alien"]}
+    ]
+}
+
+# 🔧 修復：物品位置分散，避免重疊
+FALLBACK_ITEMS = {
+    1: [
+        # 分散在1樓不同區域，避免重疊
+        {"name": "醫療包", "type": "healing", "value": 30, "x": 120, "y": 180, "description": "專業醫療包，恢復30血量"},
+        {"name": "能量飲料", "type": "healing", "value": 15, "x": 380, "y": 450, "description": "補充體力的能量飲料"},
+        {"name": "小型藥劑", "type": "healing", "value": 20, "x": 550, "y": 250, "description": "基礎治療藥劑"}
+    ],
+    2: [
+        # 2樓物品位置
+        {"name": "鑰匙卡", "type": "key", "x": 150, "y": 380, "description": "進入三樓實驗室的鑰匙卡"},
+        {"name": "研究筆記", "type": "clue", "x": 420, "y": 280, "description": "記錄了重要研究資料的筆記"},
+        {"name": "急救包", "type": "healing", "value": 40, "x": 80, "y": 450, "description": "大型急救包，恢復40血量"}
+    ],
+    3: [
+        # 3樓最重要的物品
+        {"name": "解藥", "type": "special", "x": 250, "y": 180, "description": "拯救世界的神秘解藥！"},
+        {"name": "實驗資料", "type": "clue", "x": 480, "y": 350, "description": "關於病毒研究的重要資料"},
+        {"name": "超級藥劑", "type": "healing", "value": 60, "x": 350, "y": 480, "description": "最強效的治療藥劑"}
+    ]
+}
+
 
 class MapManager:
     def __init__(self):
         self.current_floor = 1  # 初始樓層
         self.tile_size = 32
         
+        # 🆕 從共用登錄表取得的精靈圖鍵（類別 -> 鍵列表），重新載入時釋放
+        self.sprite_keys = {}
+        
         # 🆕 地板圖片
         self.floor_sprites = {}
         self.load_floor_images()
@@ -28,80 +103,33 @@ class MapManager:
         self.shop_sprites = {}
         self.load_shop_images()
         
-        # 樓層地圖數據
-        self.floor_maps = {
-            1: self.create_floor_1(),
-            2: self.create_floor_2(),
-            3: self.create_floor_3()
-        }
-        
-        # 互動區域（商店、NPC等）
-        self.interactions = {
-            1: [  # 1樓
-                {"type": "shop", "id": "A", "name": "7-11", "x": 50, "y": 350, "width": 80, "height": 60},
-                {"type": "shop", "id": "B", "name": "Subway", "x": 200, "y": 250, "width": 80, "height": 60},
-                {"type": "shop", "id": "C", "name": "茶壜", "x": 350, "y": 300, "width": 80, "height": 60},
-                {"type": "npc", "id": "npc1", "name": "驚慌學生", "x": 500, "y": 400, "width": 30, "height": 30},
-                {"type": "stairs", "direction": "up", "x": 450, "y": 100, "width": 96, "height": 48, "target_floor": 2}  # 🆕 加大樓梯尺寸
-            ],
-            2: [  # 2樓
-                {"type": "shop", "id": "D", "name": "和食軒", "x": 100, "y": 200, "width": 80, "height": 60},
-                {"type": "shop", "id": "E", "name": "素怡沅", "x": 300, "y": 150, "width": 80, "height": 60},
-                {"type": "npc", "id": "npc2", "name": "受傷職員", "x": 200, "y": 300, "width": 30, "height": 30},
-                {"type": "stairs", "direction": "up", "x": 450, "y": 90, "width": 96, "height": 48, "target_floor": 3},    # 🆕 加大樓梯尺寸
-                {"type": "stairs", "direction": "down", "x": 450, "y": 590, "width": 96, "height": 48, "target_floor": 1}  # 🆕 往上移10個像素：600→590
-            ],
-            3: [  # 3樓
-                {"type": "shop", "id": "L", "name": "咖啡廳", "x": 150, "y": 250, "width": 80, "height": 60},
-                {"type": "npc", "id": "npc4", "name": "神秘研究員", "x": 400, "y": 200, "width": 30, "height": 30},  # 🎯 改為npc4
-                {"type": "npc", "id": "npc5", "name": "最後的研究者", "x": 300, "y": 350, "width": 30, "height": 30},  # 🎯 改為npc5
-                {"type": "stairs", "direction": "down", "x": 450, "y": 600, "width": 96, "height": 48, "target_floor": 2}  # 🆕 加大樓梯尺寸
-            ]
-        }
-        
-        # 戰鬥區域 - 🔧 完全隱藏，玩家無法察覺
-        self.combat_zones = {
-            1: [
-                {"name": "走廊1", "x": 150, "y": 150, "width": 100, "height": 80, "enemies": ["zombie_student"]},
-                {"name": "角落", "x": 540, "y": 300, "width": 80, "height": 80, "enemies": ["infected_staff"]}  # 🔧 從545再往左調整5像素到540
-            ],
-            2: [
-                {"name": "走廊2", "x": 500, "y": 200, "width": 120, "height": 80, "enemies": ["zombie_student", "infected_staff"]},
-                {"name": "廚房", "x": 250, "y": 400, "width": 100, "height": 60, "enemies": ["mutant_zombie"]}
-            ],
-            3: [
-                {"name": "實驗室入口", "x": 100, "y": 100, "width": 150, "height": 100, "enemies": ["alien", "mutant_zombie"]},
-                {"name": "研究室", "x": 500, "y": 400, "width": 120, "height": 80, "enemies": ["alien"]}
-            ]
-        }
-        
-        # 🔧 修復：物品位置分散，避免重疊
-        self.items = {
-            1: [
-                # 分散在1樓不同區域，避免重疊
-                {"name": "醫療包", "type": "healing", "value": 30, "x": 120, "y": 180, "description": "專業醫療包，恢復30血量"},
-                {"name": "能量飲料", "type": "healing", "value": 15, "x": 380, "y": 450, "description": "補充體力的能量飲料"},
-                {"name": "小型藥劑", "type": "healing", "value": 20, "x": 550, "y": 250, "description": "基礎治療藥劑"}
-            ],
-            2: [
-                # 2樓物品位置
-                {"name": "鑰匙卡", "type": "key", "x": 150, "y": 380, "description": "進入三樓實驗室的鑰匙卡"},
-                {"name": "研究筆記", "type": "clue", "x": 420, "y": 280, "description": "記錄了重要研究資料的筆記"},
-                {"name": "急救包", "type": "healing", "value": 40, "x": 80, "y": 450, "description": "大型急救包，恢復40血量"}
-            ],
-            3: [
-                # 3樓最重要的物品
-                {"name": "解藥", "type": "special", "x": 250, "y": 180, "description": "拯救世界的神秘解藥！"},
-                {"name": "實驗資料", "type": "clue", "x": 480, "y": 350, "description": "關於病毒研究的重要資料"},
-                {"name": "超級藥劑", "type": "healing", "value": 60, "x": 350, "y": 480, "description": "最強效的治療藥劑"}
-            ]
-        }
+        # 🆕 樓層地圖、互動區域、戰鬥區域和物品從 assets/data 載入（content_pipeline），
+        # 新增樓層只需要修改資料檔
+        self.floor_maps, self.interactions, self.combat_zones, self.items = self.load_floor_data()
         
         # 🆕 新增：物品收集狀態追蹤
         self.collected_items = set()  # 已收集的物品ID
         
         # 🔧 新增：除錯模式控制戰鬥區域顯示
         self.debug_show_combat_zones = False  # 預設關閉除錯顯示
+        
+        # 🆕 靜態圖層快取：地板、牆壁、商店、NPC、樓梯和隱藏戰鬥區域只在需要時合成一次
+        self.use_static_layer = True
+        self.static_layers = {}  # 樓層 -> 預先合成的 Surface
+        self.static_layer_version = 0
+        
+        # 🆕 髒矩形追蹤
+        self.last_screen_rect = pygame.Rect(0, 0, 1024, 768)
+        self.last_dirty_signature = None
+        
+        # 🆕 空間索引：互動物件、戰鬥區域、物品的位置查詢不需線性掃描
+        self.spatial_cell_size = 64
+        self.interaction_index = {}   # 樓層 -> SpatialHash
+        self.combat_zone_index = {}   # 樓層 -> SpatialHash
+        self.item_index = {}          # 樓層 -> SpatialHash（只包含未收集的物品）
+        self.item_ids = {}            # id(物品) -> 物品ID
+        self.item_locations = {}      # 物品ID -> (樓層, id(物品))
+        self.build_spatial_indexes()
     
     def load_floor_images(self):
         """🆕 載入地板圖片"""
@@ -111,36 +139,35 @@ class MapManager:
             "tile": "assets/images/tile.png"  # 另一個備用選項
         }
         
-        print("🏢 載入地板圖片...")
+        game_logger.debug("map", "🏢 載入地板圖片...")
         
         for floor_type, path in floor_paths.items():
             if os.path.exists(path):
                 try:
                     # 載入地板圖片
-                    image = pygame.image.load(path).convert_alpha()
-                    original_size = image.get_size()
-                    print(f"   原始地板圖片尺寸: {original_size}")
+                    original_size = sprite_registry.get_source_size(path)
+                    game_logger.debug("map", "   原始地板圖片尺寸: %s", original_size)
                     
                     # 🎨 縮放到64x64像素（配合地板磚塊大小）
                     target_size = 64
-                    image = pygame.transform.scale(image, (target_size, target_size))
+                    image = self.acquire_sprite("floor", path, (target_size, target_size))
                     self.floor_sprites[floor_type] = image
-                    print(f"✅ 成功載入地板圖片: {floor_type} - {path}")
-                    print(f"   縮放後尺寸: {target_size}x{target_size}")
+                    game_logger.debug("map", "✅ 成功載入地板圖片: %s - %s", floor_type, path)
+                    game_logger.debug("map", "   縮放後尺寸: %sx%s", target_size, target_size)
                     break  # 找到第一個可用的圖片就停止
                 except Exception as e:
-                    print(f"❌ 載入地板圖片失敗: {floor_type} - {e}")
+                    game_logger.error("map", "❌ 載入地板圖片失敗: %s - %s", floor_type, e)
         
         # 檢查是否成功載入地板圖片
         self.use_floor_sprites = len(self.floor_sprites) > 0
         
         if not self.use_floor_sprites:
-            print("📦 未找到地板圖片，將使用程式繪製地板")
-            print("💡 請將地板圖片放在以下任一位置:")
+            game_logger.debug("map", "📦 未找到地板圖片，將使用程式繪製地板")
+            game_logger.debug("map", "💡 請將地板圖片放在以下任一位置:")
             for path in floor_paths.values():
-                print(f"   - {path}")
+                game_logger.debug("map", "   - %s", path)
         else:
-            print(f"🎨 成功載入地板圖片！使用圖片渲染地板")
+            game_logger.info("map", "🎨 成功載入地板圖片！使用圖片渲染地板")
     
     def load_shop_images(self):
         """🆕 載入商店圖片 - 新增茶壜、素怡沅和和食軒支援"""
@@ -153,15 +180,14 @@ class MapManager:
             "restaurant": "assets/images/restaurant_second_floor.png"  # 🆕 新增和食軒圖片
         }
         
-        print("🏪 載入商店圖片...")
+        game_logger.debug("map", "🏪 載入商店圖片...")
         
         for shop_type, path in shop_paths.items():
             if os.path.exists(path):
                 try:
                     # 載入商店圖片
-                    image = pygame.image.load(path).convert_alpha()
-                    original_size = image.get_size()
-                    print(f"   原始商店圖片尺寸: {original_size}")
+                    original_size = sprite_registry.get_source_size(path)
+                    game_logger.debug("map", "   原始商店圖片尺寸: %s", original_size)
                     
                     # 🎨 根據商店類型設定不同尺寸
                     if shop_type == "711":
@@ -193,20 +219,20 @@ class MapManager:
                         target_width = 80
                         target_height = 60
                     
-                    image = pygame.transform.scale(image, (target_width, target_height))
+                    image = self.acquire_sprite("shop", path, (target_width, target_height))
                     self.shop_sprites[shop_type] = image
-                    print(f"✅ 成功載入商店圖片: {shop_type} - {path}")
-                    print(f"   縮放後尺寸: {target_width}x{target_height}")
+                    game_logger.debug("map", "✅ 成功載入商店圖片: %s - %s", shop_type, path)
+                    game_logger.debug("map", "   縮放後尺寸: %sx%s", target_width, target_height)
                 except Exception as e:
-                    print(f"❌ 載入商店圖片失敗: {shop_type} - {e}")
+                    game_logger.error("map", "❌ 載入商店圖片失敗: %s - %s", shop_type, e)
         
         # 檢查是否成功載入商店圖片
         self.use_shop_sprites = len(self.shop_sprites) > 0
         
         if not self.use_shop_sprites:
-            print("📦 未找到商店圖片，將使用程式繪製商店")
+            game_logger.debug("map", "📦 未找到商店圖片，將使用程式繪製商店")
         else:
-            print(f"🎨 成功載入 {len(self.shop_sprites)} 個商店圖片")
+            game_logger.info("map", "🎨 成功載入 %s 個商店圖片", len(self.shop_sprites))
     
     def load_npc_images(self):
         """🆕 載入NPC圖片 - 🎯 新增一樓和三樓專用NPC圖片"""
@@ -218,54 +244,53 @@ class MapManager:
             "default_npc": "assets/images/npc.png"  # 可選的通用NPC圖片
         }
         
-        print("👤 載入NPC圖片...")
+        game_logger.debug("map", "👤 載入NPC圖片...")
         
         for npc_type, path in npc_paths.items():
             if os.path.exists(path):
                 try:
                     # 載入NPC圖片
-                    image = pygame.image.load(path).convert_alpha()
-                    original_size = image.get_size()
-                    print(f"   原始NPC圖片尺寸: {original_size}")
+                    original_size = sprite_registry.get_source_size(path)
+                    game_logger.debug("map", "   原始NPC圖片尺寸: %s", original_size)
                     
                     # 🎨 根據NPC類型設定不同尺寸
                     if npc_type in ["npc4_mystery", "npc5_last_worker"]:
                         # 🎯 三樓NPC使用縮小的尺寸：28x35像素（原本55x70的一半）
                         target_width = 28
                         target_height = 35
-                        print(f"   🎯 三樓NPC縮小尺寸: {target_width}x{target_height}")
+                        game_logger.debug("map", "   🎯 三樓NPC縮小尺寸: %sx%s", target_width, target_height)
                     elif npc_type == "npc1_1floor":
                         # 🆕 一樓驚慌學生使用自定義尺寸：60x55像素
                         target_width = 60
                         target_height = 55
-                        print(f"   🆕 一樓NPC自定義尺寸: {target_width}x{target_height}")
+                        game_logger.debug("map", "   🆕 一樓NPC自定義尺寸: %sx%s", target_width, target_height)
                     else:
                         # 其他NPC維持原尺寸：55x70像素
                         target_width = 55
                         target_height = 70
                     
-                    image = pygame.transform.scale(image, (target_width, target_height))
+                    image = self.acquire_sprite("npc", path, (target_width, target_height))
                     self.npc_sprites[npc_type] = image
-                    print(f"✅ 成功載入NPC圖片: {npc_type} - {path}")
-                    print(f"   縮放後尺寸: {target_width}x{target_height}")
+                    game_logger.debug("map", "✅ 成功載入NPC圖片: %s - %s", npc_type, path)
+                    game_logger.debug("map", "   縮放後尺寸: %sx%s", target_width, target_height)
                 except Exception as e:
-                    print(f"❌ 載入NPC圖片失敗: {npc_type} - {e}")
+                    game_logger.error("map", "❌ 載入NPC圖片失敗: %s - %s", npc_type, e)
         
         # 檢查是否成功載入NPC圖片
         self.use_npc_sprites = len(self.npc_sprites) > 0
         
         if not self.use_npc_sprites:
-            print("📦 未找到NPC圖片，將使用程式繪製NPC")
+            game_logger.debug("map", "📦 未找到NPC圖片，將使用程式繪製NPC")
         else:
-            print(f"🎨 成功載入 {len(self.npc_sprites)} 個NPC圖片")
+            game_logger.info("map", "🎨 成功載入 %s 個NPC圖片", len(self.npc_sprites))
             # 🆕 顯示一樓NPC載入狀態
             if "npc1_1floor" in self.npc_sprites:
-                print("   🆕 一樓驚慌學生圖片: 已載入 ✓ (自定義 60x55)")
+                game_logger.debug("map", "   🆕 一樓驚慌學生圖片: 已載入 ✓ (自定義 60x55)")
             # 🎯 顯示三樓NPC載入狀態
             if "npc4_mystery" in self.npc_sprites:
-                print("   🎯 神秘研究員圖片: 已載入 ✓ (縮小版 28x35)")
+                game_logger.debug("map", "   🎯 神秘研究員圖片: 已載入 ✓ (縮小版 28x35)")
             if "npc5_last_worker" in self.npc_sprites:
-                print("   🎯 最後的研究者圖片: 已載入 ✓ (縮小版 28x35)")
+                game_logger.debug("map", "   🎯 最後的研究者圖片: 已載入 ✓ (縮小版 28x35)")
     
     def load_item_images(self):
         """🆕 載入物品圖片"""
@@ -275,32 +300,31 @@ class MapManager:
             "special": "assets/images/special.png"  # 可選的特殊物品圖片
         }
         
-        print("🗝️ 載入物品圖片...")
+        game_logger.debug("map", "🗝️ 載入物品圖片...")
         
         for item_type, path in item_paths.items():
             if os.path.exists(path):
                 try:
                     # 載入物品圖片
-                    image = pygame.image.load(path).convert_alpha()
-                    original_size = image.get_size()
-                    print(f"   原始物品圖片尺寸: {original_size}")
+                    original_size = sprite_registry.get_source_size(path)
+                    game_logger.debug("map", "   原始物品圖片尺寸: %s", original_size)
                     
                     # 🎨 物品圖片統一縮放到32x32像素
                     target_size = 32
-                    image = pygame.transform.scale(image, (target_size, target_size))
+                    image = self.acquire_sprite("item", path, (target_size, target_size))
                     self.item_sprites[item_type] = image
-                    print(f"✅ 成功載入物品圖片: {item_type} - {path}")
-                    print(f"   縮放後尺寸: {target_size}x{target_size}")
+                    game_logger.debug("map", "✅ 成功載入物品圖片: %s - %s", item_type, path)
+                    game_logger.debug("map", "   縮放後尺寸: %sx%s", target_size, target_size)
                 except Exception as e:
-                    print(f"❌ 載入物品圖片失敗: {item_type} - {e}")
+                    game_logger.error("map", "❌ 載入物品圖片失敗: %s - %s", item_type, e)
         
         # 檢查是否成功載入物品圖片
         self.use_item_sprites = len(self.item_sprites) > 0
         
         if not self.use_item_sprites:
-            print("📦 未找到物品圖片，將使用程式繪製物品")
+            game_logger.debug("map", "📦 未找到物品圖片，將使用程式繪製物品")
         else:
-            print(f"🎨 成功載入 {len(self.item_sprites)} 個物品圖片")
+            game_logger.info("map", "🎨 成功載入 %s 個物品圖片", len(self.item_sprites))
     
     def load_stairs_images(self):
         """載入樓梯圖片"""
@@ -309,15 +333,14 @@ class MapManager:
             "down": "assets/images/stairs_down.png"
         }
         
-        print("🪜 載入樓梯圖片...")
+        game_logger.debug("map", "🪜 載入樓梯圖片...")
         
         for direction, path in stairs_paths.items():
             if os.path.exists(path):
                 try:
                     # 載入你自己的樓梯圖片
-                    image = pygame.image.load(path).convert_alpha()
-                    original_size = image.get_size()
-                    print(f"   原始圖片尺寸: {original_size}")
+                    original_size = sprite_registry.get_source_size(path)
+                    game_logger.debug("map", "   原始圖片尺寸: %s", original_size)
                     
                     # 🎨 保持原圖比例，縮放到合適大小
                     # 你可以調整這個目標尺寸來改變樓梯大小
@@ -325,29 +348,51 @@ class MapManager:
                     target_height = 72  # 可以調整這個數值
                     
                     # 縮放到目標尺寸
-                    image = pygame.transform.scale(image, (target_width, target_height))
+                    image = self.acquire_sprite("stairs", path, (target_width, target_height))
                     self.stairs_sprites[direction] = image
-                    print(f"✅ 成功載入樓梯圖片: {direction} - {path}")
-                    print(f"   縮放後尺寸: {target_width}x{target_height}")
+                    game_logger.debug("map", "✅ 成功載入樓梯圖片: %s - %s", direction, path)
+                    game_logger.debug("map", "   縮放後尺寸: %sx%s", target_width, target_height)
                 except Exception as e:
-                    print(f"❌ 載入樓梯圖片失敗: {direction} - {e}")
+                    game_logger.error("map", "❌ 載入樓梯圖片失敗: %s - %s", direction, e)
                     self.stairs_sprites[direction] = None
             else:
-                print(f"⚠️ 找不到樓梯圖片: {path}")
-                print(f"   請確認你的樓梯圖片已放在正確位置")
+                game_logger.warning("map", "⚠️ 找不到樓梯圖片: %s", path)
+                game_logger.debug("map", "   請確認你的樓梯圖片已放在正確位置")
                 self.stairs_sprites[direction] = None
         
         # 如果沒有載入到圖片，設定標記
         self.use_sprites = any(sprite is not None for sprite in self.stairs_sprites.values())
         
         if not self.use_sprites:
-            print("📦 未找到樓梯圖片，將使用像素繪製樓梯")
+            game_logger.debug("map", "📦 未找到樓梯圖片，將使用像素繪製樓梯")
         else:
-            print(f"🎨 成功載入 {len([s for s in self.stairs_sprites.values() if s is not None])} 個樓梯圖片")
-            print("💡 如果樓梯太小或太大，可以在 load_stairs_images() 方法中調整 target_width 和 target_height")
+            game_logger.info("map", "🎨 成功載入 %s 個樓梯圖片", len([s for s in self.stairs_sprites.values() if s is not None]))
+            game_logger.debug("map", "💡 如果樓梯太小或太大，可以在 load_stairs_images() 方法中調整 target_width 和 target_height")
+
+    def load_floor_data(self):
+        """🆕 從內容管線取得各樓層的 (地圖, 互動區域, 戰鬥區域, 物品)，沒有資料時用內建的備用資料"""
+        floors = content_pipeline.get_floors()
+        if not floors:
+            game_logger.warning("map", "⚠️ 沒有可用的樓層資料，使用內建的備用地圖")
+            floor_maps = {1: self.create_floor_1(), 2: self.create_floor_2(), 3: self.create_floor_3()}
+            return (floor_maps, copy.deepcopy(FALLBACK_INTERACTIONS),
+                    copy.deepcopy(FALLBACK_COMBAT_ZONES), copy.deepcopy(FALLBACK_ITEMS))
+
+        floor_maps, interactions, combat_zones, items = {}, {}, {}, {}
+        for floor, data in floors.items():
+            floor_maps[floor] = {
+                "name": data["name"],
+                "background_color": tuple(data["background_color"]),
+                "walls": data["walls"],
+            }
+            interactions[floor] = data["interactions"]
+            combat_zones[floor] = data["combat_zones"]
+            items[floor] = data["items"]
+        game_logger.debug("map", "🏢 載入 %s 個樓層資料", len(floor_maps))
+        return floor_maps, interactions, combat_zones, items
 
     def create_floor_1(self):
-        """創建1樓地圖"""
+        """創建1樓地圖（備用）"""
         return {
             "name": "第二餐廳 1樓",
             "background_color": (40, 40, 60),
@@ -365,7 +410,7 @@ class MapManager:
         }
 
     def create_floor_2(self):
-        """創建2樓地圖"""
+        """創建2樓地圖（備用）"""
         return {
             "name": "第二餐廳 2樓",
             "background_color": (60, 40, 40),
@@ -383,7 +428,7 @@ class MapManager:
         }
 
     def create_floor_3(self):
-        """創建3樓地圖"""
+        """創建3樓地圖（備用）"""
         return {
             "name": "第二餐廳 3樓",
             "background_color": (40, 60, 40),
@@ -405,7 +450,9 @@ class MapManager:
         if new_floor in self.floor_maps:
             old_floor = self.current_floor
             self.current_floor = new_floor
-            print(f"🏢 從 {old_floor} 樓切換到 {new_floor} 樓")
+            # 🆕 只保留目前樓層的靜態圖層，新樓層第一次顯示時重新合成
+            self.invalidate_static_layer()
+            game_logger.info("map", "🏢 從 %s 樓切換到 %s 樓", old_floor, new_floor)
             return True
         return False
 
@@ -413,70 +460,105 @@ class MapManager:
         """獲取當前樓層"""
         return self.current_floor
 
+    # 🆕 空間索引
+    def build_spatial_indexes(self):
+        """從互動、戰鬥區域和物品資料建立每個樓層的空間索引"""
+        self.interaction_index = {}
+        for floor, interactions in self.interactions.items():
+            index = SpatialHash(self.spatial_cell_size)
+            for interaction in interactions:
+                index.insert(id(interaction), interaction, interaction["x"], interaction["y"],
+                             interaction["width"], interaction["height"])
+            self.interaction_index[floor] = index
+
+        self.combat_zone_index = {}
+        for floor, zones in self.combat_zones.items():
+            index = SpatialHash(self.spatial_cell_size)
+            for zone in zones:
+                index.insert(id(zone), zone, zone["x"], zone["y"], zone["width"], zone["height"])
+            self.combat_zone_index[floor] = index
+
+        self.build_item_indexes()
+
+    def build_item_indexes(self):
+        """建立物品索引，已收集的物品不放入索引"""
+        self.item_index = {}
+        self.item_ids = {}
+        self.item_locations = {}
+        for floor, items in self.items.items():
+            index = SpatialHash(self.spatial_cell_size)
+            for item in items:
+                item_id = f"{floor}_{item['name']}_{item['x']}_{item['y']}"
+                self.item_ids[id(item)] = item_id
+                self.item_locations[item_id] = (floor, id(item))
+                if item_id not in self.collected_items:
+                    index.insert(id(item), (item, item_id), item["x"], item["y"])
+            self.item_index[floor] = index
+
+    def get_item_id(self, floor, item):
+        """取得物品ID（優先使用建立索引時算好的ID）"""
+        item_id = self.item_ids.get(id(item))
+        if item_id is None:
+            item_id = f"{floor}_{item['name']}_{item['x']}_{item['y']}"
+        return item_id
+
     def check_interaction(self, player_x, player_y, floor):
         """檢查玩家位置是否有互動物件"""
-        if floor not in self.interactions:
+        index = self.interaction_index.get(floor)
+        if index is None:
             return None
 
-        for interaction in self.interactions[floor]:
-            # 檢查碰撞
-            if (interaction["x"] <= player_x <= interaction["x"] + interaction["width"] and
-                interaction["y"] <= player_y <= interaction["y"] + interaction["height"]):
-                return interaction
-
-        return None
+        matches = index.query_point(player_x, player_y)
+        return matches[0] if matches else None
 
     def check_combat_zone(self, player_x, player_y, floor):
         """檢查是否進入戰鬥區域"""
-        if floor not in self.combat_zones:
+        index = self.combat_zone_index.get(floor)
+        if index is None:
             return None
 
-        for zone in self.combat_zones[self.current_floor]:
-            if (zone["x"] <= player_x <= zone["x"] + zone["width"] and
-                zone["y"] <= player_y <= zone["y"] + zone["height"]):
-                return zone
-
-        return None
+        matches = index.query_point(player_x, player_y)
+        return matches[0] if matches else None
 
     def remove_combat_zone(self, zone, floor):
         """移除戰鬥區域（戰鬥結束後）"""
         if floor in self.combat_zones and zone in self.combat_zones[floor]:
             self.combat_zones[floor].remove(zone)
-            print(f"🗑️ 移除戰鬥區域: {zone['name']} (樓層 {floor})")
+            self.combat_zone_index[floor].remove(id(zone))
+            self.invalidate_static_layer(floor)
+            game_logger.info("map", "🗑️ 移除戰鬥區域: %s (樓層 %s)", zone['name'], floor)
 
     def check_item_pickup(self, player_x, player_y, floor):
         """🆕 檢查是否可以拾取物品"""
-        if floor not in self.items:
+        index = self.item_index.get(floor)
+        if index is None:
             return None
 
         pickup_distance = 30  # 拾取距離
 
-        for item in self.items[floor]:
-            # 創建物品ID來追蹤是否已收集
-            item_id = f"{floor}_{item['name']}_{item['x']}_{item['y']}"
-
-            # 檢查是否已經收集過
-            if item_id in self.collected_items:
-                continue
-
-            # 計算距離
-            distance = ((player_x - item["x"])**2 + (player_y - item["y"])**2)**0.5
-
-            if distance <= pickup_distance:
-                return {"item": item, "item_id": item_id}
+        # 索引裡只有未收集的物品
+        for item, item_id in index.query_radius(player_x, player_y, pickup_distance):
+            return {"item": item, "item_id": item_id}
 
         return None
 
     def collect_item(self, item_id):
         """🆕 收集物品"""
         self.collected_items.add(item_id)
-        print(f"📦 收集物品: {item_id}")
+        location = self.item_locations.get(item_id)
+        if location:
+            floor, key = location
+            self.item_index[floor].remove(key)
+        game_logger.info("map", "📦 收集物品: %s", item_id)
 
     def remove_item(self, item):
         """移除已收集的物品（舊方法，保持兼容性）"""
-        for floor_items in self.items.values():
+        for floor, floor_items in self.items.items():
             if item in floor_items:
                 floor_items.remove(item)
+                self.item_index[floor].remove(id(item))
+                item_id = self.item_ids.pop(id(item), None)
+                self.item_locations.pop(item_id, None)
                 break
 
     def update(self):
@@ -485,7 +567,21 @@ class MapManager:
         pass
 
     def render(self, screen):
-        """渲染當前樓層"""
+        """渲染當前樓層 - 🆕 靜態內容使用預先合成的圖層，每幀只需一次blit"""
+        self.last_screen_rect = screen.get_rect()
+        if self.use_static_layer:
+            screen.blit(self.get_static_layer(screen), (0, 0))
+        else:
+            self.render_static_content(screen)
+
+        # 渲染物品（有呼吸燈動畫，每幀重畫）
+        self.render_items(screen)
+
+        # 渲染樓層資訊
+        self.render_floor_info(screen)
+
+    def render_static_content(self, screen):
+        """🆕 渲染不會每幀變化的樓層內容"""
         current_map = self.floor_maps[self.current_floor]
 
         # 清除背景
@@ -507,11 +603,43 @@ class MapManager:
             # 🆕 在戰鬥區域渲染普通地板，完全隱藏危險性
             self.render_combat_zones_hidden(screen)
 
-        # 渲染物品
-        self.render_items(screen)
-
-        # 渲染樓層資訊
-        self.render_floor_info(screen)
+    def get_static_layer(self, screen):
+        """🆕 取得目前樓層的靜態圖層，不存在或尺寸不符時重新合成"""
+        layer = self.static_layers.get(self.current_floor)
+        if layer is None or layer.get_size() != screen.get_size():
+            layer = pygame.Surface(screen.get_size()).convert(screen)
+            self.render_static_content(layer)
+            self.static_layers[self.current_floor] = layer
+        return layer
+
+    def invalidate_static_layer(self, floor=None):
+        """🆕 使靜態圖層失效（floor 為 None 時清除所有樓層）"""
+        self.static_layer_version += 1
+        if floor is None:
+            self.static_layers.clear()
+        else:
+            self.static_layers.pop(floor, None)
+
+    def is_animating(self):
+        """🆕 閒置節能：目前樓層還有未收集的物品時，呼吸燈光暈會持續變化"""
+        return any(self.get_item_id(self.current_floor, item) not in self.collected_items
+                   for item in self.items.get(self.current_floor, []))
+
+    def get_dirty_rects(self):
+        """🆕 回報本幀有變化的區域（髒矩形模式使用）"""
+        signature = (self.current_floor, self.static_layer_version,
+                     len(self.collected_items), self.use_floor_sprites)
+        if signature != self.last_dirty_signature:
+            # 樓層、靜態圖層或物品統計改變：整個畫面都要更新
+            self.last_dirty_signature = signature
+            return [self.last_screen_rect.copy()]
+
+        # 否則只有物品的呼吸燈光暈在變化（最大半徑35）
+        rects = []
+        for item in self.items.get(self.current_floor, []):
+            if self.get_item_id(self.current_floor, item) not in self.collected_items:
+                rects.append(pygame.Rect(item["x"] - 35, item["y"] - 35, 70, 70))
+        return rects
 
     def render_floor(self, screen):
         """🆕 渲染地板 - 支援圖片和程式繪製"""
@@ -1055,8 +1183,8 @@ class MapManager:
         current_time = pygame.time.get_ticks()
 
         for item in self.items[self.current_floor]:
-            # 創建物品ID檢查是否已收集
-            item_id = f"{self.current_floor}_{item['name']}_{item['x']}_{item['y']}"
+            # 檢查是否已收集
+            item_id = self.get_item_id(self.current_floor, item)
 
             # 如果已收集，跳過渲染
             if item_id in self.collected_items:
@@ -1251,7 +1379,7 @@ class MapManager:
         if self.current_floor in self.items:
             total_items = len(self.items[self.current_floor])
             collected_count = len([item for item in self.items[self.current_floor]
-                                 if f"{self.current_floor}_{item['name']}_{item['x']}_{item['y']}" in self.collected_items])
+                                 if self.get_item_id(self.current_floor, item) in self.collected_items])
 
             item_stats = f"物品: {collected_count}/{total_items}"
             stats_surface = font_manager.render_text(item_stats, 18, (200, 200, 200))
@@ -1283,41 +1411,67 @@ class MapManager:
     def toggle_combat_zone_debug(self):
         """🆕 切換戰鬥區域除錯顯示"""
         self.debug_show_combat_zones = not self.debug_show_combat_zones
+        self.invalidate_static_layer()
         status = "開啟" if self.debug_show_combat_zones else "關閉"
         print(f"🔧 戰鬥區域除錯顯示: {status}")
         return self.debug_show_combat_zones
 
+    def acquire_sprite(self, group, path, size):
+        """🆕 從共用登錄表取得縮放後的圖片，並記錄在所屬類別下"""
+        image = sprite_registry.acquire(path, size)
+        self.sprite_keys.setdefault(group, []).append(sprite_registry.make_key(path, size))
+        return image
+
+    def release_sprites(self, group=None, reload=False):
+        """🆕 釋放指定類別（預設全部）的圖片；reload=True 時下次會重新從檔案讀取"""
+        groups = [group] if group else list(self.sprite_keys)
+        for name in groups:
+            sprite_registry.release_all(self.sprite_keys.pop(name, []))
+        if reload:
+            sprite_registry.purge_unreferenced()
+            asset_loader.clear_images()
+
     def reload_stairs_images(self):
         """重新載入樓梯圖片（用於熱更新）"""
         print("🔄 重新載入樓梯圖片...")
+        self.release_sprites("stairs", reload=True)
         self.stairs_sprites.clear()
         self.load_stairs_images()
+        self.invalidate_static_layer()
 
     def reload_floor_images(self):
         """🆕 重新載入地板圖片（用於熱更新）"""
         print("🔄 重新載入地板圖片...")
+        self.release_sprites("floor", reload=True)
         self.floor_sprites.clear()
         self.load_floor_images()
+        self.invalidate_static_layer()
     
     def reload_shop_images(self):
         """🆕 重新載入商店圖片（用於熱更新）"""
         print("🔄 重新載入商店圖片...")
+        self.release_sprites("shop", reload=True)
         self.shop_sprites.clear()
         self.load_shop_images()
+        self.invalidate_static_layer()
     
     def reload_npc_images(self):
         """🆕 重新載入NPC圖片（用於熱更新）- 🎯 一樓和三樓NPC專用"""
         print("🔄 重新載入NPC圖片...")
         print("   🆕 檢查一樓NPC圖片...")
         print("   🎯 檢查三樓NPC圖片...")
+        self.release_sprites("npc", reload=True)
         self.npc_sprites.clear()
         self.load_npc_images()
+        self.invalidate_static_layer()
     
     def reload_item_images(self):
         """🆕 重新載入物品圖片（用於熱更新）"""
         print("🔄 重新載入物品圖片...")
+        self.release_sprites("item", reload=True)
         self.item_sprites.clear()
         self.load_item_images()
+        self.invalidate_static_layer()
 
     def get_stairs_info(self, floor=None):
         """獲取樓梯資訊"""
@@ -1456,8 +1610,7 @@ class MapManager:
 
         available_items = []
         for item in self.items[floor]:
-            item_id = f"{floor}_{item['name']}_{item['x']}_{item['y']}"
-            if item_id not in self.collected_items:
+            if self.get_item_id(floor, item) not in self.collected_items:
                 available_items.append(item)
 
         return available_items
@@ -1465,4 +1618,5 @@ class MapManager:
     def reset_items(self):
         """🆕 重置所有物品收集狀態"""
         self.collected_items.clear()
+        self.build_item_indexes()
         print("🔄 已重置所有物品收集狀態")
\ No newline at end of file
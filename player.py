@@ -1,5 +1,9 @@
 import pygame
 import os
+from asset_loader import asset_loader
+from sprite_registry import sprite_registry
+from scheduler import Scheduler
+from game_logger import game_logger
 
 class Player:
     def __init__(self, x, y, character_data=None):
@@ -26,8 +30,12 @@ class Player:
         # 玩家動畫
         self.direction = "down"  # up, down, left, right
         self.animation_frame = 0
-        self.animation_timer = 0
-        self.animation_speed = 10  # 動畫速度
+        self.animation_speed = 10  # 動畫速度（每幾個 tick 換一幀）
+        
+        # 🆕 玩家計時器：只在玩家更新時推進（開啟 UI 時暫停）
+        self.timers = Scheduler()
+        self.walk_timer = None
+        self.invulnerable_countdown = None
         
         # 移動狀態
         self.is_moving = False
@@ -51,11 +59,21 @@ class Player:
         }
         
         # 無敵時間（避免重複傷害）
-        self.invulnerable_time = 0
         self.max_invulnerable_time = 60  # 1秒無敵時間
         
+        # 🆕 固定步長模擬：上一個 tick 的位置，渲染時在兩個 tick 之間內插
+        self.prev_x = x
+        self.prev_y = y
+        self.render_x = x
+        self.render_y = y
+        
+        # 🆕 髒矩形追蹤
+        self.last_dirty_signature = None
+        self.last_render_bounds = None
+        
         # 🎨 圖片資源載入
         self.sprites = {}
+        self.sprite_keys = []  # 🆕 從共用登錄表取得的鍵
         self.use_sprites = True  # 是否使用圖片（如果載入失敗會自動切換為像素繪製）
         self.load_sprites()
     
@@ -83,10 +101,8 @@ class Player:
             for direction, path in sprite_paths.items():
                 if os.path.exists(path):
                     try:
-                        sprite = pygame.image.load(path).convert_alpha()
-                        # 縮放到適當大小
-                        sprite = pygame.transform.scale(sprite, (self.width, self.height))
-                        self.sprites[direction] = sprite
+                        # 縮放到適當大小（與其他元件共用同一張縮放圖）
+                        self.sprites[direction] = self.acquire_sprite(path)
                         sprites_loaded += 1
                         print(f"  ✅ 載入 {direction} 圖片: {path}")
                     except Exception as e:
@@ -95,14 +111,13 @@ class Player:
             # 如果沒有載入到方向性圖片，嘗試單一圖片
             if sprites_loaded == 0 and os.path.exists(single_sprite_path):
                 try:
-                    base_sprite = pygame.image.load(single_sprite_path).convert_alpha()
-                    base_sprite = pygame.transform.scale(base_sprite, (self.width, self.height))
+                    base_sprite = self.acquire_sprite(single_sprite_path)
                     
                     # 為所有方向使用同一張圖片（可以加上翻轉效果）
                     self.sprites["down"] = base_sprite
                     self.sprites["up"] = base_sprite
                     self.sprites["right"] = base_sprite
-                    self.sprites["left"] = pygame.transform.flip(base_sprite, True, False)  # 水平翻轉
+                    self.sprites["left"] = self.acquire_sprite(single_sprite_path, "flip_x")  # 水平翻轉
                     
                     sprites_loaded = 4
                     print(f"  ✅ 載入單一圖片: {single_sprite_path}")
@@ -121,6 +136,19 @@ class Player:
             print(f"  ❌ 圖片載入系統錯誤: {e}")
             self.use_sprites = False
     
+    def acquire_sprite(self, path, transform=None):
+        """🆕 從共用登錄表取得角色大小的圖片"""
+        size = (self.width, self.height)
+        sprite = sprite_registry.acquire(path, size, transform)
+        self.sprite_keys.append(sprite_registry.make_key(path, size, transform))
+        return sprite
+    
+    def release_sprites(self):
+        """🆕 釋放角色圖片（玩家物件不再使用時呼叫）"""
+        sprite_registry.release_all(self.sprite_keys)
+        self.sprite_keys = []
+        self.sprites.clear()
+    
     def get_character_colors(self):
         """🆕 根據角色資料獲取專屬顏色"""
         if not self.character_data:
@@ -156,7 +184,7 @@ class Player:
         # 如果玩家正在移動中，忽略新的移動指令
         if self.is_moving:
             if self.debug_movement:
-                print(f"⚠️ {self.character_name} 正在移動中，忽略新指令")
+                game_logger.debug("player", "⚠️ %s 正在移動中，忽略新指令", self.character_name)
             return False
         
         # 計算新位置
@@ -170,7 +198,7 @@ class Player:
         # 檢查是否真的移動了
         if new_x == self.x and new_y == self.y:
             if self.debug_movement:
-                print(f"❌ {self.character_name} 邊界限制，無法移動")
+                game_logger.debug("player", "❌ %s 邊界限制，無法移動", self.character_name)
             return False
         
         # 設定移動目標
@@ -189,19 +217,26 @@ class Player:
             self.direction = "up"
         
         if self.debug_movement:
-            print(f"🎯 {self.character_name} 開始移動: ({self.x}, {self.y}) -> ({new_x}, {new_y})")
-            print(f"   移動距離: {abs(dx) + abs(dy)}, 速度: {self.speed}")
+            game_logger.debug("player", "🎯 %s 開始移動: (%s, %s) -> (%s, %s)", self.character_name, self.x, self.y, new_x, new_y)
+            game_logger.debug("player", "   移動距離: %s, 速度: %s", abs(dx) + abs(dy), self.speed)
         
         return True
     
+    def hold(self):
+        """🆕 這個 tick 沒有更新玩家（暫停、開啟 UI、戰鬥中）：停在目前位置，不在兩個 tick 之間內插"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+
     def set_position(self, x, y):
         """設置玩家位置（用於傳送）"""
         self.x = x
         self.y = y
+        self.prev_x = x  # 傳送不內插
+        self.prev_y = y
         self.move_target_x = x
         self.move_target_y = y
         self.is_moving = False
-        print(f"玩家傳送到: ({x}, {y})")
+        game_logger.debug("player", "玩家傳送到: (%s, %s)", x, y)
     
     def teleport_to_floor(self, floor):
         """傳送到指定樓層"""
@@ -209,7 +244,7 @@ class Player:
             self.current_floor = floor
             pos = self.floor_positions[floor]
             self.set_position(pos["x"], pos["y"])
-            print(f"玩家傳送到 {floor} 樓")
+            game_logger.debug("player", "玩家傳送到 %s 樓", floor)
             return True
         return False
     
@@ -223,9 +258,9 @@ class Player:
         
         if floor is not None:
             self.current_floor = floor
-            print(f"玩家傳送到 {floor} 樓 ({x}, {y})")
+            game_logger.debug("player", "玩家傳送到 %s 樓 (%s, %s)", floor, x, y)
         else:
-            print(f"玩家傳送到 ({x}, {y})")
+            game_logger.debug("player", "玩家傳送到 (%s, %s)", x, y)
         
         return True
     
@@ -233,11 +268,15 @@ class Player:
         """受到傷害（有無敵時間保護）"""
         if self.invulnerable_time <= 0:
             self.invulnerable_time = self.max_invulnerable_time
-            print(f"玩家受到 {amount} 點傷害！")
+            game_logger.info("player", "玩家受到 %s 點傷害！", amount)
             return True
         return False
     
     def update(self):
+        """🆕 一個固定模擬 tick（1/60 秒）"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # 平滑移動 - 修復版
         if self.is_moving:
             # 計算移動方向
@@ -254,7 +293,7 @@ class Player:
                 self.y = self.move_target_y
                 self.is_moving = False
                 if hasattr(self, 'debug_movement') and self.debug_movement:
-                    print(f"🎯 {self.character_name} 到達目標: ({self.x}, {self.y})")
+                    game_logger.debug("player", "🎯 %s 到達目標: (%s, %s)", self.character_name, self.x, self.y)
             else:
                 # 朝目標移動 - 確保每次移動不超過剩餘距離
                 move_x = 0
@@ -269,25 +308,47 @@ class Player:
                 self.y += move_y
                 
                 if hasattr(self, 'debug_movement') and self.debug_movement:
-                    print(f"🚶 {self.character_name} 移動: ({self.x}, {self.y}) -> 目標({self.move_target_x}, {self.move_target_y}), 距離:{distance:.1f}")
+                    game_logger.debug("player", "🚶 %s 移動: (%s, %s) -> 目標(%s, %s), 距離:%.1f", self.character_name, self.x, self.y, self.move_target_x, self.move_target_y, distance)
         
-        # 更新動畫
+        # 更新動畫：移動中由重複計時器換幀
         if self.is_moving:
-            self.animation_timer += 1
-            if self.animation_timer >= self.animation_speed:
-                self.animation_timer = 0
-                self.animation_frame = (self.animation_frame + 1) % 4
+            if not self.walk_timer:
+                self.walk_timer = self.timers.call_every(self.animation_speed, self.advance_animation_frame)
         else:
-            self.animation_frame = 0
+            self.stop_walk_animation()
         
-        # 更新無敵時間
-        if self.invulnerable_time > 0:
-            self.invulnerable_time -= 1
+        # 🆕 推進玩家計時器（行走動畫、無敵時間）
+        self.timers.tick()
+    
+    def advance_animation_frame(self):
+        self.animation_frame = (self.animation_frame + 1) % 4
     
-    def render(self, screen):
-        """渲染玩家 - 支援圖片和像素繪製"""
-        player_x = int(self.x - self.width // 2)
-        player_y = int(self.y - self.height // 2)
+    def stop_walk_animation(self):
+        if self.walk_timer:
+            self.walk_timer.cancel()
+            self.walk_timer = None
+        self.animation_frame = 0
+    
+    @property
+    def invulnerable_time(self):
+        """🆕 無敵剩餘 tick 數（由計時器倒數）"""
+        return self.invulnerable_countdown.remaining if self.invulnerable_countdown else 0
+    
+    @invulnerable_time.setter
+    def invulnerable_time(self, ticks):
+        if self.invulnerable_countdown:
+            self.invulnerable_countdown.cancel()
+        self.invulnerable_countdown = self.timers.call_later(ticks) if ticks > 0 else None
+    
+    def render(self, screen, alpha=1.0):
+        """渲染玩家 - 支援圖片和像素繪製
+
+        🆕 alpha 是目前時間在上一個和這一個模擬 tick 之間的比例，用來內插位置
+        """
+        self.render_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.render_y = self.prev_y + (self.y - self.prev_y) * alpha
+        player_x = int(self.render_x - self.width // 2)
+        player_y = int(self.render_y - self.height // 2)
         
         # 🎨 優先使用圖片渲染
         if self.use_sprites and self.direction in self.sprites:
@@ -322,7 +383,7 @@ class Player:
         # 無敵時間保護光環
         if self.invulnerable_time > 0:
             pygame.draw.circle(screen, (255, 255, 0, 50), 
-                             (int(self.x), int(self.y)), 
+                             (int(self.render_x), int(self.render_y)), 
                              self.width, 2)
     
     def render_pixel_art(self, screen, x, y):
@@ -362,7 +423,7 @@ class Player:
         # 如果在無敵時間，繪製保護光環
         if self.invulnerable_time > 0:
             pygame.draw.circle(screen, (255, 255, 0, 50), 
-                             (int(self.x), int(self.y)), 
+                             (int(self.render_x), int(self.render_y)), 
                              self.width, 2)
     
     def draw_player_front(self, screen, x, y, body_color, skin_color, hair_color):
@@ -462,6 +523,29 @@ class Player:
             "character": self.character_name
         }
     
+    def is_animating(self):
+        """🆕 閒置節能：移動中或無敵閃爍時畫面會變化"""
+        return self.is_moving or self.invulnerable_time > 0
+    
+    def get_render_bounds(self):
+        """🆕 玩家繪製範圍（包含陰影和無敵光環）"""
+        margin = self.width + 2
+        return pygame.Rect(int(self.render_x) - margin, int(self.render_y) - margin, margin * 2, margin * 2)
+    
+    def get_dirty_rects(self):
+        """🆕 回報本幀有變化的區域（髒矩形模式使用）"""
+        blinking = self.invulnerable_time > 0 and self.invulnerable_time % 10 < 5
+        signature = (int(self.render_x), int(self.render_y), self.direction, self.animation_frame,
+                     self.is_moving, self.invulnerable_time > 0, blinking)
+        if signature == self.last_dirty_signature:
+            return []
+        
+        self.last_dirty_signature = signature
+        bounds = self.get_render_bounds()
+        dirty = bounds.union(self.last_render_bounds) if self.last_render_bounds else bounds
+        self.last_render_bounds = bounds
+        return [dirty]
+    
     def get_rect(self):
         """獲取玩家碰撞矩形"""
         return pygame.Rect(self.x - self.width//2, self.y - self.height//2, 
@@ -493,19 +577,22 @@ class Player:
     def reload_sprites(self):
         """重新載入圖片（用於熱更新）"""
         print(f"🔄 重新載入 {self.character_name} 圖片...")
-        self.sprites.clear()
+        self.release_sprites()
+        sprite_registry.purge_unreferenced()
+        asset_loader.clear_images()
         self.load_sprites()
     
     def reset(self):
         """重置玩家狀態（用於遊戲重新開始）"""
         self.x = 100
         self.y = 400
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.move_target_x = self.x
         self.move_target_y = self.y
         self.is_moving = False
         self.current_floor = 1
         self.direction = "down"
-        self.animation_frame = 0
-        self.animation_timer = 0
+        self.stop_walk_animation()
         self.invulnerable_time = 0
         print(f"{self.character_name} 狀態已重置")
\ No newline at end of file
@@ -0,0 +1,207 @@
+# replay.py - 輸入記錄與重播
+#
+# 記錄檔格式（little-endian）：
+#   檔頭  "RPLY" 版本(u16) 模擬頻率(u16) 隨機種子(u64)
+#   事件  tick(u32) 種類(u8) 內容（依種類而定）
+#   結尾  tick(u32) 0xFF 狀態摘要(u32)
+# tick 是事件送進 Game.handle_events 之前已經執行過的模擬 tick 數。
+import json
+import os
+import random
+import struct
+import zlib
+
+import pygame
+
+REPLAY_MAGIC = b"RPLY"
+REPLAY_VERSION = 1
+DEFAULT_REPLAY_PATH = ".cache/replays/last_session.rpl"
+
+HEADER = struct.Struct("<4sHHQ")
+RECORD = struct.Struct("<IB")
+KEY_EVENT = struct.Struct("<iHB")          # key, mod, unicode 長度（後面接 UTF-8）
+MOUSE_BUTTON_EVENT = struct.Struct("<hhB")  # x, y, button
+MOUSE_MOTION_EVENT = struct.Struct("<hhhhB")  # x, y, dx, dy, buttons 位元遮罩
+DIGEST = struct.Struct("<I")
+
+END_KIND = 0xFF
+
+# 事件種類代碼 -> pygame 事件類型；只記錄 handle_events 會用到的輸入事件
+EVENT_KINDS = {
+    0: pygame.QUIT,
+    1: pygame.KEYDOWN,
+    2: pygame.KEYUP,
+    3: pygame.MOUSEBUTTONDOWN,
+    4: pygame.MOUSEBUTTONUP,
+    5: pygame.MOUSEMOTION,
+}
+EVENT_CODES = {event_type: kind for kind, event_type in EVENT_KINDS.items()}
+
+
+def new_session_seed():
+    """每次遊戲的隨機種子（記錄在重播檔裡）"""
+    return random.SystemRandom().getrandbits(32)
+
+
+def encode_event(tick, event):
+    """把事件編碼成一筆記錄，不需要記錄的事件回傳 None"""
+    kind = EVENT_CODES.get(event.type)
+    if kind is None:
+        return None
+
+    data = RECORD.pack(tick, kind)
+    if event.type in (pygame.KEYDOWN, pygame.KEYUP):
+        text = getattr(event, "unicode", "").encode("utf-8")[:255]
+        data += KEY_EVENT.pack(event.key, event.mod & 0xFFFF, len(text)) + text
+    elif event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+        data += MOUSE_BUTTON_EVENT.pack(event.pos[0], event.pos[1], event.button)
+    elif event.type == pygame.MOUSEMOTION:
+        buttons = sum(1 << index for index, pressed in enumerate(event.buttons) if pressed)
+        data += MOUSE_MOTION_EVENT.pack(event.pos[0], event.pos[1], event.rel[0], event.rel[1], buttons)
+    return data
+
+
+def decode_events(data, offset):
+    """從 offset 開始解碼事件，回傳 (events, end_tick, digest)"""
+    events = []
+    while offset < len(data):
+        tick, kind = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+
+        if kind == END_KIND:
+            digest, = DIGEST.unpack_from(data, offset)
+            return events, tick, digest
+
+        event_type = EVENT_KINDS[kind]
+        if event_type in (pygame.KEYDOWN, pygame.KEYUP):
+            key, mod, length = KEY_EVENT.unpack_from(data, offset)
+            offset += KEY_EVENT.size
+            text = data[offset:offset + length].decode("utf-8")
+            offset += length
+            event = pygame.event.Event(event_type, key=key, mod=mod, unicode=text)
+        elif event_type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            x, y, button = MOUSE_BUTTON_EVENT.unpack_from(data, offset)
+            offset += MOUSE_BUTTON_EVENT.size
+            event = pygame.event.Event(event_type, pos=(x, y), button=button)
+        elif event_type == pygame.MOUSEMOTION:
+            x, y, dx, dy, buttons = MOUSE_MOTION_EVENT.unpack_from(data, offset)
+            offset += MOUSE_MOTION_EVENT.size
+            event = pygame.event.Event(event_type, pos=(x, y), rel=(dx, dy),
+                                       buttons=tuple(bool(buttons & (1 << index)) for index in range(3)))
+        else:
+            event = pygame.event.Event(event_type)
+        events.append((tick, event))
+
+    # 沒有結尾記錄（例如遊戲當掉）：重播到最後一個事件為止
+    return events, events[-1][0] if events else 0, None
+
+
+def snapshot_state(game):
+    """重播比對用的遊戲狀態"""
+    snapshot = {
+        "tick": game.sim_tick,
+        "intro": game.show_intro,
+        "character_select": game.show_character_select,
+        "started": game.game_started,
+    }
+    if game.game_started:
+        snapshot.update({
+            "state": game.game_state.current_state,
+            "stats": game.game_state.player_stats,
+            "flags": game.game_state.flags,
+            "floor": game.map_manager.current_floor,
+            "position": (game.player.x, game.player.y),
+            "collected": sorted(game.map_manager.collected_items),
+            "items": [(item["name"], item.get("quantity", 1)) for item in game.inventory.get_items()],
+        })
+    return snapshot
+
+
+def state_digest(game):
+    """遊戲狀態的 CRC32 摘要"""
+    text = json.dumps(snapshot_state(game), sort_keys=True, ensure_ascii=False, default=str)
+    return zlib.crc32(text.encode("utf-8"))
+
+
+class InputRecorder:
+    """記錄送進 Game.handle_events 的所有輸入事件（存在記憶體，結束時寫檔）"""
+
+    def __init__(self, seed, tick_rate=60):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.data = bytearray(HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, tick_rate, seed))
+        self.event_count = 0
+
+    def record(self, tick, events):
+        for event in events:
+            record = encode_event(tick, event)
+            if record is not None:
+                self.data += record
+                self.event_count += 1
+
+    def to_bytes(self, end_tick, digest):
+        return bytes(self.data) + RECORD.pack(end_tick, END_KIND) + DIGEST.pack(digest)
+
+    def save(self, path, end_tick, digest):
+        """寫入重播檔（先寫暫存檔再改名）"""
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            temp_path = path + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(self.to_bytes(end_tick, digest))
+            os.replace(temp_path, path)
+            print(f"🎬 重播記錄已儲存: {path} ({self.event_count} 個事件, {end_tick} tick)")
+            return True
+        except OSError as e:
+            print(f"❌ 重播記錄儲存失敗 {path}: {e}")
+            return False
+
+
+class ReplayLog:
+    """讀入的重播檔"""
+
+    def __init__(self, seed, tick_rate, events, end_tick, digest):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.events = events
+        self.end_tick = end_tick
+        self.digest = digest
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, tick_rate, seed = HEADER.unpack_from(data, 0)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"不支援的重播檔格式: {magic!r} v{version}")
+        events, end_tick, digest = decode_events(data, HEADER.size)
+        return cls(seed, tick_rate, events, end_tick, digest)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+    def get_batches(self):
+        """依 tick 分組的事件"""
+        batches = {}
+        for tick, event in self.events:
+            batches.setdefault(tick, []).append(event)
+        return batches
+
+
+def run_replay(game, log, render=False):
+    """不限速重播：每個 tick 先送入事件再更新，回傳最後的狀態摘要"""
+    batches = log.get_batches()
+    for tick in range(log.end_tick):
+        events = batches.get(tick)
+        if events:
+            game.handle_events(events)
+        game.update()
+        if render:
+            game.render()
+
+    events = batches.get(log.end_tick)
+    if events:
+        game.handle_events(events)
+    return state_digest(game)
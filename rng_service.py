@@ -0,0 +1,81 @@
+# rng_service.py - 具名的獨立亂數串流
+#
+# 每個子系統從同一個遊戲種子衍生出自己的 random.Random（combat、encounter、loot…），
+# 彼此的抽取次數不會互相影響：多打一回合不會改變之後掉落的寶物。
+# 重設種子時沿用原本的串流物件，所以各系統可以在建構時就把串流存起來。
+import hashlib
+import random
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def derive_seed(seed, name):
+    """由遊戲種子和串流名稱算出 64 位元子種子（跨行程穩定，不用 hash()）"""
+    digest = hashlib.blake2b(f"{seed}:{name}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class RNGService:
+    """亂數串流服務：stream(name) 取得 random.Random，numpy_stream(name) 取得 NumPy Generator"""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.streams = {}
+        self.numpy_streams = {}
+
+    def reseed(self, seed):
+        """換成新的遊戲種子，所有已建立的串流就地重設"""
+        self.seed = seed
+        for name, stream in self.streams.items():
+            stream.seed(derive_seed(seed, name))
+        for name, stream in self.numpy_streams.items():
+            # 🔧 換掉 bit generator 的狀態而不是建立新的 Generator，已存起來的參照才會跟著重設
+            stream.bit_generator.state = np.random.PCG64(self.numpy_seed(name)).state
+
+    def stream(self, name):
+        """具名的 random.Random 串流（第一次取用時建立）"""
+        stream = self.streams.get(name)
+        if stream is None:
+            stream = random.Random(derive_seed(self.seed, name))
+            self.streams[name] = stream
+        return stream
+
+    def numpy_seed(self, name):
+        return derive_seed(self.seed, "numpy:" + name)
+
+    def create_numpy_stream(self, name):
+        return np.random.Generator(np.random.PCG64(self.numpy_seed(name)))
+
+    def numpy_stream(self, name):
+        """具名的 NumPy Generator 串流；沒有安裝 NumPy 時丟出 RuntimeError"""
+        if np is None:
+            raise RuntimeError("沒有安裝 NumPy，無法建立 NumPy 亂數串流")
+        stream = self.numpy_streams.get(name)
+        if stream is None:
+            stream = self.create_numpy_stream(name)
+            self.numpy_streams[name] = stream
+        return stream
+
+    def snapshot(self):
+        """所有串流目前的狀態（可以 restore 回來）"""
+        return {
+            "seed": self.seed,
+            "streams": {name: stream.getstate() for name, stream in self.streams.items()},
+            "numpy_streams": {name: stream.bit_generator.state
+                              for name, stream in self.numpy_streams.items()},
+        }
+
+    def restore(self, snapshot):
+        """還原 snapshot() 的狀態；快照之後才建立的串流回到初始狀態"""
+        self.reseed(snapshot["seed"])
+        for name, state in snapshot["streams"].items():
+            self.stream(name).setstate(state)
+        for name, state in snapshot["numpy_streams"].items():
+            self.numpy_stream(name).bit_generator.state = state
+
+
+# 全域亂數服務：Game 建立時用遊戲種子重設
+rng_service = RNGService()
@@ -0,0 +1,146 @@
+# scheduler.py - 以模擬 tick 驅動的階層式時間輪
+#
+# 每一層有 64 格，第 0 層一格 1 tick，第 1 層一格 64 tick，依此類推。
+# 計時器依剩餘時間放進對應的層，上層的格子輪到時再降到下層；
+# 每個 tick 只處理第 0 層的一格，所以沒到期的計時器完全不花時間。
+
+LEVEL_BITS = 6
+LEVEL_SIZE = 1 << LEVEL_BITS
+LEVEL_MASK = LEVEL_SIZE - 1
+LEVELS = 4  # 64^4 tick，60 tick/秒 約 77 小時
+
+TICK_RATE = 60
+
+
+class Timer:
+    """排程中的計時器：remaining 是剩餘 tick 數，cancel() 取消"""
+
+    __slots__ = ("scheduler", "deadline", "interval", "callback", "args", "pending")
+
+    def __init__(self, scheduler, deadline, interval, callback, args):
+        self.scheduler = scheduler
+        self.deadline = deadline
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.pending = True
+
+    @property
+    def remaining(self):
+        if not self.pending:
+            return 0
+        return max(0, self.deadline - self.scheduler.tick_count)
+
+    def cancel(self):
+        """取消計時器；時間輪裡的項目等輪到那一格時才丟掉"""
+        if self.pending:
+            self.pending = False
+            self.scheduler.active -= 1
+
+
+class Scheduler:
+    """計時器服務：一次性、重複計時器和取消，每個 tick 呼叫一次 tick()
+
+    callback 可以是 None，這時計時器只是一個倒數（用 remaining 查詢）。
+    """
+
+    def __init__(self, tick_rate=TICK_RATE):
+        self.tick_rate = tick_rate
+        self.tick_count = 0
+        self.wheels = [[[] for _ in range(LEVEL_SIZE)] for _ in range(LEVELS)]
+        self.active = 0
+        self.fired = 0
+
+    def ticks(self, seconds):
+        """秒數換算成 tick 數（至少 1）"""
+        return max(1, int(round(seconds * self.tick_rate)))
+
+    def call_later(self, delay, callback=None, *args):
+        """delay 個 tick 後呼叫一次 callback(*args)"""
+        return self.add(max(1, int(delay)), 0, callback, args)
+
+    def call_every(self, interval, callback, *args):
+        """每 interval 個 tick 呼叫一次 callback(*args)，直到取消"""
+        interval = max(1, int(interval))
+        return self.add(interval, interval, callback, args)
+
+    def add(self, delay, interval, callback, args):
+        timer = Timer(self, self.tick_count + delay, interval, callback, args)
+        self.active += 1
+        self.insert(timer)
+        return timer
+
+    def insert(self, timer):
+        """依剩餘時間放進對應層的格子"""
+        delta = timer.deadline - self.tick_count
+        for level in range(LEVELS):
+            shift = LEVEL_BITS * level
+            if delta < 1 << (shift + LEVEL_BITS):
+                self.wheels[level][(timer.deadline >> shift) & LEVEL_MASK].append(timer)
+                return
+        # 超出時間輪範圍：放在最高層最後才會輪到的格子，降級時重新計算
+        shift = LEVEL_BITS * (LEVELS - 1)
+        self.wheels[-1][((self.tick_count >> shift) - 1) & LEVEL_MASK].append(timer)
+
+    def cascade(self, level, index):
+        """把上層一格的計時器重新分配到下層"""
+        timers = self.wheels[level][index]
+        if not timers:
+            return
+        self.wheels[level][index] = []
+        for timer in timers:
+            if timer.pending:
+                self.insert(timer)
+
+    def tick(self):
+        """前進一個 tick，觸發到期的計時器，回傳觸發數量"""
+        self.tick_count += 1
+        now = self.tick_count
+
+        for level in range(LEVELS - 1, 0, -1):
+            shift = LEVEL_BITS * level
+            if now & ((1 << shift) - 1) == 0:
+                self.cascade(level, (now >> shift) & LEVEL_MASK)
+
+        index = now & LEVEL_MASK
+        timers = self.wheels[0][index]
+        if not timers:
+            return 0
+        self.wheels[0][index] = []
+
+        fired = 0
+        for timer in timers:
+            if not timer.pending:
+                continue
+            if timer.interval:
+                timer.deadline += timer.interval
+                self.insert(timer)
+            else:
+                timer.pending = False
+                self.active -= 1
+            if timer.callback:
+                timer.callback(*timer.args)
+            fired += 1
+        self.fired += fired
+        return fired
+
+    def clear(self):
+        """取消所有計時器"""
+        for wheel in self.wheels:
+            for timers in wheel:
+                for timer in timers:
+                    timer.pending = False
+                timers.clear()
+        self.active = 0
+
+    def get_stats(self):
+        """排程器統計"""
+        return {
+            "tick": self.tick_count,
+            "active": self.active,
+            "fired": self.fired
+        }
+
+
+# 全域排程器：遊戲每個模擬 tick 推進一次（UI 訊息、互動冷卻等世界計時器）
+scheduler = Scheduler()
@@ -2,11 +2,18 @@
 import pygame
 import os
 import random
+from asset_loader import asset_loader
+from game_logger import game_logger, DEBUG
 
 class SoundManager:
     def __init__(self):
-        # 初始化音樂系統
-        pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+        # 初始化音樂系統（🆕 沒有音效裝置時停用聲音，遊戲照常執行）
+        try:
+            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+            self.mixer_ready = True
+        except pygame.error as e:
+            print(f"❌ 音效系統初始化失敗，停用聲音: {e}")
+            self.mixer_ready = False
         
         # 音樂文件路徑
         self.sounds_path = "assets/sounds"
@@ -51,6 +58,15 @@ class SoundManager:
         
         # 載入的音效緩存
         self.loaded_sfx = {}
+        # 🆕 背景解碼中的音效（名稱 -> 檔案路徑）
+        self.pending_sfx = {}
+        
+        # 🆕 音效節流：同一音效在最短間隔內重複請求時直接略過（毫秒）
+        self.sfx_min_interval = {
+            "dialogue_beep": 80,  # 打字機效果每個字都會請求
+        }
+        self.sfx_last_played = {}
+        self.sfx_throttled_count = 0
         
         # 載入音效
         self.load_sound_effects()
@@ -80,27 +96,44 @@ class SoundManager:
                 print(f"   ❌ {sfx_name}: {filename} (未找到)")
     
     def load_sound_effects(self):
-        """載入所有音效到記憶體中"""
+        """在背景執行緒解碼所有音效（實際使用前才取回結果）"""
         print("🔊 載入音效檔案...")
         
         for sfx_name, filename in self.sfx_files.items():
             filepath = os.path.join(self.sounds_path, filename)
             try:
                 if os.path.exists(filepath):
-                    sound = pygame.mixer.Sound(filepath)
-                    sound.set_volume(self.sfx_volume)
-                    self.loaded_sfx[sfx_name] = sound
-                    print(f"   ✅ 載入音效: {sfx_name}")
+                    asset_loader.request_sound(filepath)
+                    self.pending_sfx[sfx_name] = filepath
                 else:
                     print(f"   ⚠️ 音效檔案不存在: {filepath}")
             except Exception as e:
                 print(f"   ❌ 載入音效失敗 {sfx_name}: {e}")
         
-        print(f"✅ 音效載入完成，共載入 {len(self.loaded_sfx)} 個音效")
+        print(f"✅ 已排程 {len(self.pending_sfx)} 個音效在背景解碼")
+    
+    def resolve_sound_effect(self, sfx_name):
+        """🆕 取回背景解碼完成的音效"""
+        filepath = self.pending_sfx.pop(sfx_name, None)
+        if filepath is None:
+            return
+        try:
+            sound = asset_loader.load_sound(filepath)
+            sound.set_volume(self.sfx_volume)
+            self.loaded_sfx[sfx_name] = sound
+            game_logger.debug("sound", "   ✅ 載入音效: %s", sfx_name)
+        except Exception as e:
+            game_logger.error("sound", "   ❌ 載入音效失敗 %s: %s", sfx_name, e)
+    
+    def resolve_sound_effects(self):
+        """🆕 取回所有背景解碼的音效"""
+        for sfx_name in list(self.pending_sfx):
+            self.resolve_sound_effect(sfx_name)
+        return len(self.loaded_sfx)
     
     def play_music(self, mode, loop=True, fade_in_time=1000):
         """播放指定模式的背景音樂"""
-        if not self.is_music_enabled:
+        if not self.is_music_enabled or not self.mixer_ready:
             return
         
         # 如果已經在播放相同模式的音樂，就不需要重新播放
@@ -112,7 +145,7 @@ class SoundManager:
         
         # 獲取音樂文件路徑
         if mode not in self.music_files:
-            print(f"⚠️ 未知的音樂模式: {mode}")
+            game_logger.warning("sound", "⚠️ 未知的音樂模式: %s", mode)
             return
         
         music_file = self.music_files[mode]
@@ -120,7 +153,7 @@ class SoundManager:
         
         # 檢查文件是否存在
         if not os.path.exists(music_path):
-            print(f"⚠️ 音樂檔案不存在: {music_path}")
+            game_logger.warning("sound", "⚠️ 音樂檔案不存在: %s", music_path)
             return
         
         try:
@@ -135,72 +168,95 @@ class SoundManager:
             pygame.mixer.music.play(play_count, fade_ms=fade_in_time)
             
             self.current_mode = mode
-            print(f"🎵 播放音樂: {mode} ({music_file})")
+            game_logger.info("sound", "🎵 播放音樂: %s (%s)", mode, music_file)
             
         except Exception as e:
-            print(f"❌ 播放音樂失敗 {mode}: {e}")
+            game_logger.error("sound", "❌ 播放音樂失敗 %s: %s", mode, e)
     
     def stop_music(self, fade_out_time=1000):
         """停止背景音樂"""
-        if pygame.mixer.music.get_busy():
+        if self.mixer_ready and pygame.mixer.music.get_busy():
             pygame.mixer.music.fadeout(fade_out_time)
-            print(f"🔇 停止音樂 (淡出 {fade_out_time}ms)")
+            game_logger.info("sound", "🔇 停止音樂 (淡出 %sms)", fade_out_time)
         self.current_mode = None
     
     def play_sfx(self, sfx_name):
         """播放音效 - 增強除錯版"""
-        print(f"🔊 收到播放音效請求: {sfx_name}")
+        if not self.mixer_ready or self.is_sfx_throttled(sfx_name):
+            return
+        
+        game_logger.debug("sound", "🔊 收到播放音效請求: %s", sfx_name)
         
         if not self.is_sfx_enabled:
-            print(f"⚠️ 音效已關閉，跳過播放: {sfx_name}")
+            game_logger.debug("sound", "⚠️ 音效已關閉，跳過播放: %s", sfx_name)
             return
         
+        self.resolve_sound_effect(sfx_name)
         if sfx_name in self.loaded_sfx:
             try:
-                print(f"🔊 找到音效文件: {sfx_name}")
                 sound = self.loaded_sfx[sfx_name]
-                print(f"🔊 音效音量: {sound.get_volume()}")
+                if game_logger.is_enabled("sound", DEBUG):
+                    game_logger.debug("sound", "🔊 找到音效文件: %s (音量 %s)", sfx_name, sound.get_volume())
                 
                 # 播放音效
                 channel = sound.play()
                 if channel:
-                    print(f"✅ 音效播放成功: {sfx_name}")
+                    game_logger.debug("sound", "✅ 音效播放成功: %s", sfx_name)
                 else:
-                    print(f"⚠️ 音效播放失敗（可能是通道已滿）: {sfx_name}")
+                    # 通道全滿時每一步都會發生，只記在 DEBUG，不輸出到 stdout
+                    game_logger.debug("sound", "⚠️ 音效播放失敗（可能是通道已滿）: %s", sfx_name)
                     
             except Exception as e:
-                print(f"❌ 播放音效異常 {sfx_name}: {e}")
+                game_logger.error("sound", "❌ 播放音效異常 %s: %s", sfx_name, e)
         else:
-            print(f"❌ 音效不存在於已載入列表: {sfx_name}")
-            print(f"📋 可用音效: {list(self.loaded_sfx.keys())}")
+            game_logger.error("sound", "❌ 音效不存在於已載入列表: %s", sfx_name)
+            game_logger.debug("sound", "📋 可用音效: %s", list(self.loaded_sfx.keys()))
             
             # 嘗試直接載入並播放
             filepath = os.path.join(self.sounds_path, self.sfx_files.get(sfx_name, f"{sfx_name}.wav"))
             if os.path.exists(filepath):
                 try:
-                    print(f"🔄 嘗試直接載入: {filepath}")
+                    game_logger.debug("sound", "🔄 嘗試直接載入: %s", filepath)
                     temp_sound = pygame.mixer.Sound(filepath)
                     temp_sound.set_volume(self.sfx_volume)
                     temp_sound.play()
-                    print(f"✅ 直接播放成功: {sfx_name}")
+                    game_logger.debug("sound", "✅ 直接播放成功: %s", sfx_name)
                 except Exception as e:
-                    print(f"❌ 直接播放失敗 {sfx_name}: {e}")
+                    game_logger.error("sound", "❌ 直接播放失敗 %s: %s", sfx_name, e)
             else:
-                print(f"❌ 音效文件不存在: {filepath}")
+                game_logger.error("sound", "❌ 音效文件不存在: %s", filepath)
+    
+    def is_sfx_throttled(self, sfx_name):
+        """🆕 檢查音效是否還在節流間隔內，沒有的話記錄這次播放時間"""
+        interval = self.sfx_min_interval.get(sfx_name)
+        if not interval:
+            return False
+        
+        now = pygame.time.get_ticks()
+        last = self.sfx_last_played.get(sfx_name)
+        if last is not None and now - last < interval:
+            self.sfx_throttled_count += 1
+            return True
+        self.sfx_last_played[sfx_name] = now
+        return False
     
     def set_music_volume(self, volume):
         """設定背景音樂音量 (0.0-1.0)"""
         self.music_volume = max(0.0, min(1.0, volume))
-        pygame.mixer.music.set_volume(self.music_volume)
-        print(f"🎵 設定音樂音量: {self.music_volume}")
+        if self.mixer_ready:
+            pygame.mixer.music.set_volume(self.music_volume)
+        game_logger.info("sound", "🎵 設定音樂音量: %s", self.music_volume)
     
     def set_sfx_volume(self, volume):
         """設定音效音量 (0.0-1.0)"""
         self.sfx_volume = max(0.0, min(1.0, volume))
+        if not self.mixer_ready:
+            return
         # 更新所有已載入音效的音量
+        self.resolve_sound_effects()
         for sound in self.loaded_sfx.values():
             sound.set_volume(self.sfx_volume)
-        print(f"🔊 設定音效音量: {self.sfx_volume}")
+        game_logger.info("sound", "🔊 設定音效音量: %s", self.sfx_volume)
     
     def toggle_music(self):
         """切換背景音樂開關"""
@@ -224,15 +280,23 @@ class SoundManager:
             "music_volume": self.music_volume,
             "sfx_volume": self.sfx_volume,
             "current_mode": self.current_mode,
-            "music_playing": pygame.mixer.music.get_busy(),
-            "loaded_sfx_count": len(self.loaded_sfx)
+            "music_playing": self.mixer_ready and pygame.mixer.music.get_busy(),
+            "loaded_sfx_count": len(self.loaded_sfx),
+            "pending_sfx_count": len(self.pending_sfx)
         }
     
     def cleanup(self):
         """清理音效系統"""
         self.stop_music()
         pygame.mixer.quit()
+        self.mixer_ready = False
         print("🔇 音效系統已關閉")
+    
+    def set_headless(self):
+        """🆕 無頭模式（壓力測試用）：關閉混音器，之後所有播放請求直接略過"""
+        self.resolve_sound_effects()  # 等背景解碼結束再關閉混音器
+        self.loaded_sfx.clear()
+        self.cleanup()
 
 # 全域音效管理器實例
 sound_manager = SoundManager()
\ No newline at end of file
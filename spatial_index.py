@@ -0,0 +1,102 @@
+# spatial_index.py - 均勻網格空間雜湊
+import math
+
+
+class SpatialHash:
+    """均勻網格空間雜湊：以矩形或點登錄物件，支援點查詢和半徑查詢"""
+
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}    # (格子x, 格子y) -> 該格子內的 key 集合
+        self.entries = {}  # key -> (登錄順序, x, y, width, height, value)
+        self.next_order = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get_cell_range(self, x, y, width, height):
+        """計算矩形涵蓋的格子範圍"""
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size),
+                math.floor((x + width) / size), math.floor((y + height) / size))
+
+    def insert(self, key, value, x, y, width=0, height=0):
+        """登錄物件（width/height 為 0 時視為點）"""
+        if key in self.entries:
+            self.remove(key)
+
+        self.entries[key] = (self.next_order, x, y, width, height, value)
+        self.next_order += 1
+
+        min_cx, min_cy, max_cx, max_cy = self.get_cell_range(x, y, width, height)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                self.cells.setdefault((cx, cy), set()).add(key)
+
+    def remove(self, key):
+        """移除物件，回傳是否真的有移除"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+
+        _, x, y, width, height, _ = entry
+        min_cx, min_cy, max_cx, max_cy = self.get_cell_range(x, y, width, height)
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(key)
+                    if not cell:
+                        del self.cells[(cx, cy)]
+        return True
+
+    def clear(self):
+        """清空索引"""
+        self.cells.clear()
+        self.entries.clear()
+
+    def query_point(self, px, py):
+        """查詢包含該點的物件（邊界也算），依登錄順序回傳"""
+        size = self.cell_size
+        cell = self.cells.get((math.floor(px / size), math.floor(py / size)))
+        if not cell:
+            return []
+
+        matches = []
+        for key in cell:
+            order, x, y, width, height, value = self.entries[key]
+            if x <= px <= x + width and y <= py <= y + height:
+                matches.append((order, value))
+
+        matches.sort(key=lambda match: match[0])
+        return [value for _, value in matches]
+
+    def query_radius(self, px, py, radius):
+        """查詢與圓形範圍相交的物件，依登錄順序回傳"""
+        min_cx, min_cy, max_cx, max_cy = self.get_cell_range(px - radius, py - radius, radius * 2, radius * 2)
+        radius_sq = radius * radius
+
+        seen = set()
+        matches = []
+        for cx in range(min_cx, max_cx + 1):
+            for cy in range(min_cy, max_cy + 1):
+                cell = self.cells.get((cx, cy))
+                if not cell:
+                    continue
+                for key in cell:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    order, x, y, width, height, value = self.entries[key]
+                    # 矩形上離查詢點最近的點
+                    dx = max(x - px, 0, px - (x + width))
+                    dy = max(y - py, 0, py - (y + height))
+                    if dx * dx + dy * dy <= radius_sq:
+                        matches.append((order, value))
+
+        matches.sort(key=lambda match: match[0])
+        return [value for _, value in matches]
@@ -0,0 +1,207 @@
+# sprite_cache.py - 預先縮放精靈圖的磁碟快取
+import hashlib
+import json
+import os
+
+import pygame
+
+from asset_loader import asset_loader
+
+# 🆕 快取資料夾（相對於專案根目錄，已加入 .gitignore）
+DEFAULT_CACHE_DIR = ".cache/sprites"
+MANIFEST_VERSION = 1
+
+
+class BakedSpriteCache:
+    """把縮放後的圖片以原始 RGBA（或 PNG）存到磁碟，下次啟動直接讀取
+
+    項目以「原圖內容的 SHA-1 + 目標尺寸」命名，原圖內容改變時自然失效。
+    manifest.json 記錄每張原圖的 mtime/大小/雜湊/原始尺寸，
+    檔案沒有變動時不必重新計算雜湊，也不必解碼原圖就能知道原始尺寸。
+    """
+
+    FORMATS = ("raw", "png")
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, fmt="raw", loader=asset_loader):
+        if fmt not in self.FORMATS:
+            raise ValueError(f"不支援的快取格式: {fmt}")
+        self.cache_dir = cache_dir
+        self.fmt = fmt
+        self.loader = loader
+        self.enabled = True
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.sources = self.load_manifest()
+
+        # 統計
+        self.hits = 0
+        self.misses = 0
+        self.bakes = 0
+
+    # ======= manifest =======
+    def load_manifest(self):
+        """讀取 manifest，格式不符或損壞時從空白開始"""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data.get("sources", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def save_manifest(self):
+        """寫入 manifest（先寫暫存檔再取代，避免寫到一半被中斷）"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = self.manifest_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "sources": self.sources}, f, indent=1)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"❌ 寫入精靈圖快取清單失敗: {e}")
+
+    def get_source_key(self, path):
+        return os.path.relpath(os.path.abspath(path)).replace(os.sep, "/")
+
+    def get_source_info(self, path):
+        """取得原圖資訊，檔案變動時重新計算雜湊並清除舊的變體記錄"""
+        key = self.get_source_key(path)
+        stat = os.stat(path)
+        info = self.sources.get(key)
+        if info and info["mtime_ns"] == stat.st_mtime_ns and info["size"] == stat.st_size:
+            return info
+
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        if not info or info["sha1"] != digest:
+            # 內容改變（只有時間戳改變時保留原本的變體記錄）
+            info = {"sha1": digest, "width": None, "height": None, "variants": []}
+        info["mtime_ns"] = stat.st_mtime_ns
+        info["size"] = stat.st_size
+        self.sources[key] = info
+        self.save_manifest()
+        return info
+
+    def get_source_size(self, path):
+        """不解碼原圖取得原始尺寸，未知時回傳 None"""
+        if not self.enabled:
+            return None
+        info = self.get_source_info(path)
+        if info["width"] is None:
+            return None
+        return info["width"], info["height"]
+
+    # ======= 讀寫快取 =======
+    def get_entry_path(self, digest, size):
+        extension = "rgba" if self.fmt == "raw" else "png"
+        return os.path.join(self.cache_dir, f"{digest}_{size[0]}x{size[1]}.{extension}")
+
+    def load(self, path, size):
+        """讀取已烘焙的圖片，沒有快取時回傳 None"""
+        if not self.enabled:
+            return None
+
+        info = self.get_source_info(path)
+        entry_path = self.get_entry_path(info["sha1"], size)
+        if list(size) not in info["variants"] or not os.path.exists(entry_path):
+            self.misses += 1
+            return None
+
+        try:
+            data = self.loader.load_file(entry_path)
+            if self.fmt == "raw":
+                if len(data) != size[0] * size[1] * 4:
+                    raise ValueError("資料長度與尺寸不符")
+                surface = pygame.image.frombuffer(data, tuple(size), "RGBA")
+            else:
+                surface = pygame.image.load(entry_path)
+        except Exception as e:
+            print(f"❌ 精靈圖快取損壞，將重新烘焙: {entry_path} - {e}")
+            info["variants"].remove(list(size))
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self.loader.convert_image(surface)
+
+    def store(self, path, size, surface, source_size=None):
+        """把已縮放的圖片寫入快取"""
+        if not self.enabled:
+            return False
+
+        info = self.get_source_info(path)
+        entry_path = self.get_entry_path(info["sha1"], size)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if self.fmt == "raw":
+                temp_path = entry_path + ".tmp"
+                with open(temp_path, "wb") as f:
+                    f.write(pygame.image.tobytes(surface, "RGBA"))
+                os.replace(temp_path, entry_path)
+            else:
+                pygame.image.save(surface, entry_path)
+        except Exception as e:
+            print(f"❌ 寫入精靈圖快取失敗: {entry_path} - {e}")
+            return False
+
+        if source_size is not None:
+            info["width"], info["height"] = source_size
+        if list(size) not in info["variants"]:
+            info["variants"].append(list(size))
+        self.bakes += 1
+        self.save_manifest()
+        return True
+
+    # ======= 預先讀取和維護 =======
+    def prefetch(self, directory):
+        """在背景讀取資料夾內所有已烘焙的檔案，回傳已完整烘焙的原圖路徑"""
+        baked_sources = set()
+        if not self.enabled:
+            return baked_sources
+
+        for key, info in self.sources.items():
+            if not key.startswith(directory.rstrip("/") + "/") or not os.path.exists(key):
+                continue
+            if not info["variants"] or self.get_source_info(key) is not info:
+                continue
+            entry_paths = [self.get_entry_path(info["sha1"], size) for size in info["variants"]]
+            if all(os.path.exists(entry_path) for entry_path in entry_paths):
+                for entry_path in entry_paths:
+                    self.loader.request_file(entry_path)
+                baked_sources.add(os.path.normcase(os.path.abspath(key)))
+        return baked_sources
+
+    def prune(self):
+        """刪除不再對應任何原圖的快取檔案，回傳刪除的數量"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        self.sources = {key: info for key, info in self.sources.items() if os.path.exists(key)}
+        valid = set()
+        for info in self.sources.values():
+            for size in info["variants"]:
+                valid.add(os.path.basename(self.get_entry_path(info["sha1"], size)))
+
+        removed = 0
+        for filename in os.listdir(self.cache_dir):
+            if filename != "manifest.json" and filename not in valid:
+                os.remove(os.path.join(self.cache_dir, filename))
+                removed += 1
+        self.save_manifest()
+        return removed
+
+    def get_stats(self):
+        """取得快取統計資料"""
+        return {
+            "enabled": self.enabled,
+            "format": self.fmt,
+            "sources": len(self.sources),
+            "variants": sum(len(info["variants"]) for info in self.sources.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bakes": self.bakes
+        }
+
+
+# 全域精靈圖磁碟快取實例
+sprite_cache = BakedSpriteCache()
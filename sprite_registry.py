@@ -0,0 +1,161 @@
+# sprite_registry.py - 共用精靈圖登錄表
+import os
+from collections import OrderedDict
+
+import pygame
+
+from asset_loader import asset_loader
+from sprite_cache import sprite_cache
+
+# 🆕 預設記憶體預算：只有沒有被引用的項目會被淘汰，所以實際用量可能超過預算
+DEFAULT_SPRITE_BUDGET = 32 * 1024 * 1024  # 32MB
+
+
+class SpriteRegistry:
+    """以 (路徑, 尺寸, 變換) 為鍵共用 Surface，並追蹤引用數和記憶體用量
+
+    acquire() 取得共用的 Surface 並增加引用數，不再使用時呼叫 release()。
+    總用量超過預算時，依最久未使用的順序淘汰引用數為 0 的項目。
+    回傳的 Surface 是共用的，呼叫端不可直接修改。
+    """
+
+    TRANSFORMS = (None, "flip_x", "flip_y")
+
+    def __init__(self, budget_bytes=DEFAULT_SPRITE_BUDGET, loader=asset_loader, baked_cache=None):
+        self.budget_bytes = budget_bytes
+        self.loader = loader
+        self.baked_cache = baked_cache  # 🆕 磁碟上的預先縮放快取（可選）
+
+        # 鍵 -> [Surface, 位元組數, 引用數]，順序即最近使用順序
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def make_key(self, path, size=None, transform=None):
+        """正規化成登錄表的鍵"""
+        if transform not in self.TRANSFORMS:
+            raise ValueError(f"不支援的變換: {transform}")
+        path = os.path.normcase(os.path.abspath(path))
+        size = tuple(size) if size is not None else None
+        return (path, size, transform)
+
+    def get_surface_bytes(self, surface):
+        """估算 Surface 佔用的記憶體"""
+        return surface.get_pitch() * surface.get_height()
+
+    # ======= 取得和釋放 =======
+    def acquire(self, path, size=None, transform=None):
+        """取得共用的 Surface 並增加引用數"""
+        return self.get_entry(self.make_key(path, size, transform), references=1)[0]
+
+    def release(self, path, size=None, transform=None):
+        """減少引用數，引用數歸零的項目之後可能會被淘汰"""
+        self.release_key(self.make_key(path, size, transform))
+
+    def release_key(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[2] <= 0:
+            return
+        entry[2] -= 1
+        if entry[2] == 0:
+            self.trim()
+
+    def release_all(self, keys):
+        """一次釋放多個鍵（元件卸載時使用）"""
+        for key in keys:
+            self.release_key(key)
+
+    def get_source_size(self, path):
+        """原始圖片尺寸：優先查磁碟快取，否則解碼原圖（以未引用狀態留在登錄表中，供之後縮放共用）"""
+        if self.baked_cache:
+            size = self.baked_cache.get_source_size(path)
+            if size:
+                return size
+        return self.get_entry(self.make_key(path))[0].get_size()
+
+    def get_entry(self, key, references=0):
+        """查詢項目，不存在時建立（先加上引用數再淘汰，避免新項目立刻被移除）"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            entry[2] += references
+            return entry
+
+        self.misses += 1
+        surface = self.create_surface(key)
+        entry = [surface, self.get_surface_bytes(surface), references]
+        self.entries[key] = entry
+        self.total_bytes += entry[1]
+        self.trim()
+        return entry
+
+    def create_surface(self, key):
+        """依鍵產生 Surface：原圖向素材載入器取得，其他變體由原圖產生"""
+        path, size, transform = key
+
+        if size is None and transform is None:
+            # 原圖由登錄表接手，素材載入器不再保留一份
+            return self.loader.load_image(path, cache=False)
+
+        if transform is None:
+            # 🆕 已烘焙的縮放圖不必解碼原圖，也不必重新縮放
+            if self.baked_cache:
+                surface = self.baked_cache.load(path, size)
+                if surface is not None:
+                    return surface
+            source = self.get_entry((path, None, None))[0]
+            surface = pygame.transform.scale(source, size)
+            if self.baked_cache:
+                self.baked_cache.store(path, size, surface, source.get_size())
+            return surface
+
+        base = self.get_entry((path, size, None))[0]
+        if transform == "flip_x":
+            return pygame.transform.flip(base, True, False)
+        return pygame.transform.flip(base, False, True)
+
+    # ======= 記憶體管理 =======
+    def trim(self):
+        """超過預算時淘汰最久未使用且沒有引用的項目"""
+        if self.total_bytes <= self.budget_bytes:
+            return
+        for key in list(self.entries):
+            if self.total_bytes <= self.budget_bytes:
+                break
+            entry = self.entries[key]
+            if entry[2] == 0:
+                del self.entries[key]
+                self.total_bytes -= entry[1]
+                self.evictions += 1
+
+    def set_budget(self, budget_bytes):
+        """調整記憶體預算"""
+        self.budget_bytes = budget_bytes
+        self.trim()
+
+    def purge_unreferenced(self):
+        """移除所有沒有引用的項目（用於熱更新）"""
+        for key in [key for key, entry in self.entries.items() if entry[2] == 0]:
+            self.total_bytes -= self.entries.pop(key)[1]
+
+    def get_stats(self):
+        """取得登錄表統計資料"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "referenced": sum(1 for entry in self.entries.values() if entry[2] > 0),
+            "references": sum(entry[2] for entry in self.entries.values()),
+            "bytes": self.total_bytes,
+            "budget": self.budget_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+# 全域精靈圖登錄表實例
+sprite_registry = SpriteRegistry(baked_cache=sprite_cache)
@@ -1,6 +1,7 @@
 # story.py - 劇情管理系統
 import json
-import random
+from content_pipeline import content_pipeline
+from rng_service import rng_service
 
 class StoryManager:
     def __init__(self):
@@ -10,10 +11,21 @@ class StoryManager:
         self.events = self.load_story_events()
         self.triggered_events = set()  # 已觸發的事件
         self.hp = 100  # 初始生命值
+        self.build_event_index()
 
 
     def load_story_events(self):
-        """載入劇情事件"""
+        """載入劇情事件（assets/data/story_events.json），沒有資料時用內建的備用事件"""
+        events = content_pipeline.get_story_events()
+        if not events:
+            return self.create_fallback_events()
+        for event in events.values():
+            if "location" in event:
+                event["location"] = tuple(event["location"])
+        return events
+
+    def create_fallback_events(self):
+        """內建的備用劇情事件"""
         return {
             #一樓事件
             "intro": {
@@ -48,6 +60,7 @@ class StoryManager:
             "freezer_event": {
                 "id": "freezer_event",
                 "location": (16, 4),
+                "tile_type": 5,
                 "type": "story",
                 "title": "冷凍櫃中的發現",
                 "text": "你打開冷凍櫃，發現裡面除了冷凍食品外，還有一些醫療用品...",
@@ -61,6 +74,7 @@ class StoryManager:
             "storage_event": {
                 "id": "storage_event",
                 "location": (3, 10),
+                "tile_type": 6,
                 "type": "story",
                 "title": "儲藏室探索",
                 "text": "儲藏室很暗，你聽到裡面有奇怪的聲音...",
@@ -73,6 +87,7 @@ class StoryManager:
             "door_event": {
                 "id": "door_event",
                 "location": (1, 12),
+                "tile_type": 4,
                 "type": "story",
                 "title": "門外的訪客",
                 "text": "有人在敲門，但從窗戶看起來不太對勁...",
@@ -194,6 +209,8 @@ class StoryManager:
 
             "upstairs_entry": {
                 "id": "upstairs_entry",
+                "location": (0, 0),
+                "requires": ["door_locked", "has_medkit", "has_weapon"],
                 "type": "story",
                 "title": "Up the Stairs",
                 "text": "你到一個通往二樓的樓梯口，並確認身上帶有基本生存資源。你迅速衝上樓，暫時脫離了危險。",
@@ -280,6 +297,7 @@ class StoryManager:
             "third_floor_entry": {
                 "id": "third_floor_entry",
                 "location": (11, 0),
+                "requires": ["helped_npc", "has_weapon", "has_medkit"],
                 "type": "story",
                 "title": "通往三樓",
                 "text": "你抵達了通往三樓的樓梯口。看起來樓梯已部分坍塌，必須確定身上裝備齊全且擁有樓梯通行權限。",
@@ -301,54 +319,57 @@ class StoryManager:
 
         }
 
-    def get_event_by_location(self, x, y, tile_type):
-        if (x, y) == (0, 0):
-            if (
-                self.get_flag("door_locked")
-                and self.get_flag("has_medkit")
-                and self.get_flag("has_weapon")
-            ):
-                return self.events.get("upstairs_entry")
-        
-        # 二樓特定事件：走廊中的 NPC
-        if (x, y) == (5, 2):
-            return self.events.get("npc_second_floor")
-        
-        # 二樓房間事件
-        if (x, y) == (9, 1):
-            return self.events.get("room_h")
-        if (x, y) == (7, 1):
-            return self.events.get("room_i")
-        if (x, y) == (11, 4):
-            return self.events.get("room_j")
-        if (x, y) == (1, 1):
-            return self.events.get("room_k")
-
-        # 通往三樓條件判斷
-        if (x, y) == (11, 0):
-            if (
-                self.get_flag("helped_npc")
-                and self.get_flag("has_weapon")
-                and self.get_flag("has_medkit")
-            ):
-                return self.events.get("third_floor_entry")
-
+    def compile_requirements(self, flags):
+        """把事件的 requires 旗標串列編譯成判斷函式"""
+        flags = tuple(flags)
+        story_flags = self.story_flags
+        return lambda: all(story_flags.get(flag, False) for flag in flags)
+
+    def build_event_index(self):
+        """🆕 建立 位置 -> 事件 和 地圖格類型 -> 事件 的索引（依定義順序），已觸發的事件不列入"""
+        self.events_by_location = {}
+        self.events_by_tile_type = {}
+        self.event_requirements = {}
         for event_id, event in self.events.items():
-            if event.get("location") == (x, y) and event_id not in self.triggered_events:
-                return event
-
-        if tile_type == 5:
-            return self.events.get("freezer_event")
-        elif tile_type == 6:
-            return self.events.get("storage_event")
-        elif tile_type == 4:
-            return self.events.get("door_event")
+            if event_id in self.triggered_events:
+                continue
+            if "location" in event:
+                self.events_by_location.setdefault(event["location"], []).append(event_id)
+            if "tile_type" in event:
+                self.events_by_tile_type.setdefault(event["tile_type"], []).append(event_id)
+            if event.get("requires"):
+                self.event_requirements[event_id] = self.compile_requirements(event["requires"])
+
+    def remove_from_index(self, event_id):
+        """已觸發的事件從索引移除，之後不會再從位置或格子類型找到"""
+        event = self.events[event_id]
+        for index, key in ((self.events_by_location, event.get("location")),
+                           (self.events_by_tile_type, event.get("tile_type"))):
+            event_ids = index.get(key)
+            if event_ids and event_id in event_ids:
+                event_ids.remove(event_id)
+                if not event_ids:
+                    del index[key]
+
+    def find_indexed_event(self, index, key):
+        """索引中第一個條件成立的事件"""
+        for event_id in index.get(key, ()):
+            requirement = self.event_requirements.get(event_id)
+            if requirement is None or requirement():
+                return self.events[event_id]
         return None
 
+    def get_event_by_location(self, x, y, tile_type):
+        """🔧 查索引：先找這個位置的事件，沒有再依地圖格類型（冷凍櫃、儲藏室、門）"""
+        event = self.find_indexed_event(self.events_by_location, (x, y))
+        if event is None:
+            event = self.find_indexed_event(self.events_by_tile_type, tile_type)
+        return event
+
     def get_auto_event(self, x, y, tile_type):
         if x == 5 and y == 5 and "intro" not in self.triggered_events:
             return self.events.get("intro")
-        if random.random() < 0.1:
+        if rng_service.stream("encounter").random() < 0.1:
             return self.events.get("random_encounter")
         return None
 
@@ -356,6 +377,7 @@ class StoryManager:
         if event_id in self.events:
             self.current_event = self.events[event_id]
             self.triggered_events.add(event_id)
+            self.remove_from_index(event_id)
             return True
         return False
 
@@ -382,7 +404,7 @@ class StoryManager:
             return {"type": "item", "item": "food", "message": "你獲得了食物"}
         elif action == "random_item":
             items = ["medkit", "food", "weapon"]
-            item = random.choice(items)
+            item = rng_service.stream("loot").choice(items)
             if item == "medkit":
                 self.set_flag("has_medkit")
             elif item == "weapon":
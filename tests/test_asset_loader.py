@@ -0,0 +1,69 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+from asset_loader import AssetLoader
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    pygame.init()
+    surface = pygame.Surface((8, 6), pygame.SRCALPHA)
+    surface.fill((255, 0, 0, 128))
+    path = tmp_path / "sprite.png"
+    pygame.image.save(surface, str(path))
+    return str(path)
+
+
+def test_requests_for_same_path_share_one_future(image_path):
+    loader = AssetLoader(max_workers=2)
+    first = loader.request_image(image_path)
+    second = loader.request_image(os.path.join(os.path.dirname(image_path), ".", "sprite.png"))
+
+    assert first is second
+    assert loader.get_progress()[1] == 1
+    loader.shutdown()
+
+
+def test_load_image_caches_decoded_surface(image_path):
+    loader = AssetLoader(max_workers=2)
+    image = loader.load_image(image_path)
+
+    assert image.get_size() == (8, 6)
+    assert loader.load_image(image_path) is image
+    assert loader.is_idle()
+    loader.shutdown()
+
+
+def test_prefetch_directory_tracks_progress(image_path):
+    loader = AssetLoader(max_workers=2)
+    directory = os.path.dirname(image_path)
+    with open(os.path.join(directory, "notes.txt"), "w") as f:
+        f.write("not an image")
+
+    assert loader.prefetch_directory(directory) == 1
+    loader.finish_pending_images()
+    assert loader.get_progress() == (1, 1)
+    assert loader.load_scaled_image(image_path, (16, 12)).get_size() == (16, 12)
+    loader.shutdown()
+
+
+def test_clear_images_reloads_changed_file(image_path):
+    loader = AssetLoader(max_workers=2)
+    loader.load_image(image_path)
+    pygame.image.save(pygame.Surface((4, 4)), image_path)
+
+    loader.clear_images()
+    assert loader.load_image(image_path).get_size() == (4, 4)
+    loader.shutdown()
+
+
+def test_missing_file_raises_on_load(tmp_path):
+    loader = AssetLoader(max_workers=2)
+    with pytest.raises(Exception):
+        loader.load_image(str(tmp_path / "missing.png"))
+    loader.shutdown()
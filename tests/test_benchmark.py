@@ -0,0 +1,35 @@
+import sys
+import os
+# 添加 tools 資料夾到 Python 路徑
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import benchmark
+
+
+def make_report(scenes):
+    return {"scenes": {name: {"frame_ms": {"p95": value}} for name, value in scenes.items()}}
+
+
+def test_percentile_interpolates():
+    values = [1, 2, 3, 4, 5]
+    assert benchmark.percentile(values, 50) == 3
+    assert benchmark.percentile(values, 100) == 5
+    assert benchmark.percentile([10, 20], 95) == 19.5
+    assert benchmark.percentile([], 95) == 0.0
+
+
+def test_compare_detects_regression_past_threshold():
+    baseline = make_report({"intro": 1.0, "combat": 2.0})
+    report = make_report({"intro": 1.1, "combat": 3.0})
+
+    regressions = benchmark.compare_to_baseline(report, baseline, threshold=0.15)
+
+    assert [regression["scene"] for regression in regressions] == ["combat"]
+    assert regressions[0]["change"] == 0.5
+
+
+def test_compare_ignores_noise_and_new_scenes():
+    baseline = make_report({"intro": 0.01})
+    report = make_report({"intro": 0.03, "map": 5.0})
+
+    assert benchmark.compare_to_baseline(report, baseline, threshold=0.1) == []
@@ -77,7 +77,7 @@ def test_player_defend():
     assert len(cs.combat_log) > original_log_count
     assert any("防禦" in log or "回復" in log for log in cs.combat_log)
 
-@patch('random.random', return_value=0.3)  # 模擬成功逃跑
+@patch.object(combat_module.rng_service.stream("combat"), 'random', return_value=0.3)  # 模擬成功逃跑
 def test_player_escape_success(mock_random):
     cs = combat_module.CombatSystem()
     enemy = {"name": "強敵", "hp": 80, "attack": 20, "defense": 5}
@@ -88,7 +88,7 @@ def test_player_escape_success(mock_random):
     assert cs.combat_result == "escape"
     assert any("成功逃跑" in log for log in cs.combat_log)
 
-@patch('random.random', return_value=0.8)  # 模擬逃跑失敗
+@patch.object(combat_module.rng_service.stream("combat"), 'random', return_value=0.8)  # 模擬逃跑失敗
 def test_player_escape_failure(mock_random):
     cs = combat_module.CombatSystem()
     enemy = {"name": "快敵人", "hp": 25, "attack": 15, "defense": 2}
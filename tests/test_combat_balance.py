@@ -0,0 +1,63 @@
+import sys
+import os
+import random
+# 添加 tools 資料夾到 Python 路徑
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import pytest
+import combat_balance
+
+WEAK_ENEMY = {"name": "沙包", "hp": 1, "attack": 0, "defense": 0}
+STRONG_ENEMY = {"name": "魔王", "hp": 10000, "attack": 500, "defense": 0}
+CHARACTER = {"name": "測試", "stats": {"hp": 100}}
+BASE_STATS = {"max_hp": 100, "defense": 5}
+
+
+def test_weak_enemy_always_dies_on_first_turn():
+    won, turns, hp_lost = combat_balance.simulate_python(random.Random(0), 100, 5, 1, WEAK_ENEMY, 50, 100)
+    assert all(won)
+    assert set(turns) == {1}
+    assert set(hp_lost) == {0.0}
+
+
+def test_strong_enemy_always_wins():
+    won, turns, hp_lost = combat_balance.simulate_python(random.Random(0), 100, 5, 1, STRONG_ENEMY, 50, 100)
+    assert not any(won)
+    assert set(hp_lost) == {1.0}
+
+
+def test_level_gains_stay_within_level_up_ranges():
+    rng = random.Random(1)
+    for _ in range(100):
+        max_hp, defense = combat_balance.sample_level_stats(rng, 100, 5, 4)
+        assert 100 + 3 * 8 <= max_hp <= 100 + 3 * 15
+        assert 5 + 3 * 1 <= defense <= 5 + 3 * 3
+
+
+def test_summary_percentiles_and_histogram():
+    won = [True] * 10
+    turns = list(range(1, 11))
+    hp_lost = [index / 10 for index in range(10)]
+    summary = combat_balance.summarize(won, turns, hp_lost)
+    assert summary["win_rate"] == 1.0
+    assert summary["turns_p50"] == 5
+    assert summary["turns_p90"] == 9
+    assert summary["hp_loss_histogram"] == [1] * 10
+
+
+def test_sweep_is_reproducible_with_python_backend():
+    args = ([CHARACTER], [WEAK_ENEMY, STRONG_ENEMY], BASE_STATS, 2, 200)
+    first = combat_balance.run_sweep(*args, seed=3, backend="python")
+    second = combat_balance.run_sweep(*args, seed=3, backend="python")
+    assert first["cells"] == second["cells"]
+    assert [(cell["level"], cell["enemy"]) for cell in first["cells"]] == [
+        (1, "沙包"), (1, "魔王"), (2, "沙包"), (2, "魔王")]
+
+
+def test_numpy_backend_matches_python_statistics():
+    pytest.importorskip("numpy")
+    enemy = {"name": "感染職員", "hp": 45, "attack": 12, "defense": 4}
+    vector = combat_balance.run_sweep([CHARACTER], [enemy], BASE_STATS, 1, 20000, backend="numpy")
+    scalar = combat_balance.run_sweep([CHARACTER], [enemy], BASE_STATS, 1, 20000, backend="python")
+    assert abs(vector["cells"][0]["win_rate"] - scalar["cells"][0]["win_rate"]) < 0.02
+    assert abs(vector["cells"][0]["turns_mean"] - scalar["cells"][0]["turns_mean"]) < 0.2
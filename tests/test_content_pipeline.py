@@ -0,0 +1,158 @@
+import sys
+import os
+import json
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import content_pipeline as pipeline_module
+from content_pipeline import ContentPipeline, validate_source
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def write_sources(data_dir, enemies=None):
+    data_dir.mkdir(exist_ok=True)
+    sources = {
+        "enemy_stats.json": enemies or {
+            "zombie_student": {"name": "殭屍學生", "hp": 30, "attack": 8, "defense": 2, "exp_reward": 15},
+            "alien": {"name": "神秘外星人", "hp": 80, "attack": 20, "defense": 8, "exp_reward": 60},
+        },
+        "item_database.json": {
+            "醫療包": {"type": "healing", "value": 30, "description": "回復30點血量"},
+            "鑰匙卡": {"type": "key", "value": 1, "description": "開啟特殊區域的鑰匙"},
+        },
+        "shop_data.json": {
+            "A": {"name": "7-11", "chinese_name": "7-11", "items": [{"name": "醫療包", "price": 50, "stock": 3}]},
+        },
+        "dialogues.json": {
+            "npc:npc1": {"name": "驚慌學生", "nodes": {
+                "start": {"text": "救命！", "options": [{"id": "more", "text": "然後呢？", "next": "more"}]},
+                "more": {"text": "樓上有東西", "options": [{"id": "leave", "text": "離開"}]},
+            }},
+        },
+        "floors.json": {
+            "1": {"name": "1樓", "background_color": [40, 40, 60], "walls": [], "interactions": [
+                {"type": "stairs", "direction": "up", "x": 450, "y": 100, "width": 96, "height": 48, "target_floor": 2},
+            ]},
+        },
+        "combat_zones.json": {
+            "hallway": {"floor": 1, "name": "走廊", "x": 150, "y": 150, "width": 100, "height": 80,
+                        "enemies": ["zombie_student"]},
+        },
+        "map_items.json": {
+            "medkit": {"floor": 1, "item": "醫療包", "x": 120, "y": 180, "description": "專業醫療包"},
+        },
+    }
+    for filename, data in sources.items():
+        (data_dir / filename).write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    write_sources(tmp_path / "data")
+    return ContentPipeline(str(tmp_path / "data"), str(tmp_path / "cache" / "compiled.bin"))
+
+
+def test_indexes(pipeline):
+    assert [enemy["id"] for enemy in pipeline.get_enemies()] == ["zombie_student", "alien"]
+    assert pipeline.get_enemy("alien")["attack"] == 20
+    assert pipeline.get_item("醫療包")["value"] == 30
+
+    assert pipeline.get_dialogue("npc:npc1")["name"] == "驚慌學生"
+    node = pipeline.get_dialogue_node("npc:npc1/more")
+    assert node["text"] == "樓上有東西"
+    assert node["dialogue"] == "npc:npc1"
+
+
+def test_floors_are_indexed_by_floor_with_zones_and_items(pipeline):
+    floor = pipeline.get_floors()[1]
+    assert floor["interactions"][0]["target_floor"] == 2
+    assert [zone["id"] for zone in floor["combat_zones"]] == ["hallway"]
+    # 地上的物品合併道具資料庫的欄位，description 被覆寫
+    assert floor["items"] == [{"name": "醫療包", "type": "healing", "value": 30, "x": 120, "y": 180,
+                               "description": "專業醫療包"}]
+
+    # 回傳的是複本：地圖移除戰鬥區域不會影響內容管線
+    floor["combat_zones"].clear()
+    assert pipeline.get_floors()[1]["combat_zones"]
+
+
+def test_floor_references_are_checked(tmp_path):
+    write_sources(tmp_path / "data")
+    zones = {
+        "lab": {"floor": 3, "name": "實驗室", "x": 0, "y": 0, "width": 10, "height": 10, "enemies": ["alien"]},
+        "lair": {"floor": 1, "name": "巢穴", "x": 0, "y": 0, "width": 10, "height": 10, "enemies": ["dragon"]},
+    }
+    items = {"sword": {"floor": 1, "item": "神劍", "x": 10, "y": 10}}
+    (tmp_path / "data" / "combat_zones.json").write_text(json.dumps(zones, ensure_ascii=False), encoding="utf-8")
+    (tmp_path / "data" / "map_items.json").write_text(json.dumps(items, ensure_ascii=False), encoding="utf-8")
+    pipeline = ContentPipeline(str(tmp_path / "data"), str(tmp_path / "cache" / "compiled.bin"))
+
+    # 參照不存在的樓層、敵人或道具的項目被略過並回報，不寫快取
+    floor = pipeline.get_floors()[1]
+    assert floor["combat_zones"] == [] and floor["items"] == []
+    assert sorted(error.split(":")[1] for error in pipeline.errors) == ["lab", "lair", "sword"]
+    assert not os.path.exists(pipeline.cache_path)
+
+
+def test_returned_enemies_are_copies(pipeline):
+    pipeline.get_enemy("alien")["hp"] = 0
+    assert pipeline.get_enemy("alien")["hp"] == 80
+
+
+def test_cache_is_reused_until_sources_change(tmp_path, pipeline):
+    pipeline.load()
+    assert not pipeline.from_cache
+    assert os.path.exists(pipeline.cache_path)
+
+    again = ContentPipeline(pipeline.data_dir, pipeline.cache_path)
+    again.load()
+    assert again.from_cache
+    assert again.get_enemy("alien")["name"] == "神秘外星人"
+
+    write_sources(tmp_path / "data", enemies={
+        "slime": {"name": "史萊姆", "hp": 5, "attack": 1, "defense": 0, "exp_reward": 1},
+    })
+    changed = ContentPipeline(pipeline.data_dir, pipeline.cache_path)
+    changed.load()
+    assert not changed.from_cache
+    assert [enemy["id"] for enemy in changed.get_enemies()] == ["slime"]
+
+
+def test_invalid_entries_are_dropped_and_not_cached(tmp_path):
+    write_sources(tmp_path / "data", enemies={
+        "ok": {"name": "殭屍", "hp": 30, "attack": 8, "defense": 2, "exp_reward": 15},
+        "broken": {"name": "壞掉", "hp": "很多", "attack": 8, "defense": 2},
+    })
+    pipeline = ContentPipeline(str(tmp_path / "data"), str(tmp_path / "cache" / "compiled.bin"))
+    pipeline.load()
+    assert [enemy["id"] for enemy in pipeline.get_enemies()] == ["ok"]
+    assert any("broken.hp" in error for error in pipeline.errors)
+    assert any("broken.exp_reward" in error for error in pipeline.errors)
+    assert not os.path.exists(pipeline.cache_path)
+
+
+def test_schema_checks_nested_lists():
+    valid, errors = validate_source("shop_data.json", {
+        "A": {"name": "7-11", "chinese_name": "7-11", "items": [{"name": "醫療包", "price": "50", "stock": 3}]},
+    })
+    assert valid == {}
+    assert errors == ["shop_data.json:A.items[0].price: 應該是 int，實際是 str"]
+
+
+def test_schema_checks_every_dialogue_node():
+    valid, errors = validate_source("dialogues.json", {
+        "npc:x": {"name": "X", "nodes": {"start": {"text": "嗨", "options": [{"text": "離開"}]}}},
+    })
+    assert valid == {}
+    assert errors == ["dialogues.json:npc:x.nodes.start.options[0].id: 缺少欄位"]
+
+
+def test_shipped_data_is_valid():
+    pipeline = ContentPipeline(os.path.join(ROOT_DIR, pipeline_module.DEFAULT_DATA_DIR), os.devnull)
+    raw = pipeline.read_sources()
+    content, errors = pipeline.build(raw)
+    assert errors == []
+    assert set(content["enemies"]) >= {"zombie_student", "infected_staff", "mutant_zombie", "alien"}
+    assert sorted(content["floors"]) == [1, 2, 3]
@@ -0,0 +1,146 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+import pygame
+from dialogue_graph import DialogueGraph, dialogue_graph
+from font_manager import font_manager
+from game_state import GameState
+from inventory import Inventory
+from ui import UI
+
+
+@pytest.fixture
+def ui():
+    # 其他測試可能呼叫過 pygame.quit()，這裡重新建立顯示；舊的字體物件在 pygame.quit() 後失效，需要清除快取
+    pygame.init()
+    font_manager.fonts.clear()
+    ui = UI(pygame.display.set_mode((1024, 768)))
+    ui.set_game_state_reference(GameState())
+    ui.set_inventory_reference(Inventory())
+    ui.set_player_reference(MagicMock())
+    return ui
+
+
+def choose(ui, option_text):
+    ui.select_dialogue_option(ui.dialogue_options.index(option_text))
+
+
+def test_shipped_dialogues_compile_without_errors():
+    dialogue_graph.load()
+    assert dialogue_graph.errors == []
+    assert dialogue_graph.has_dialogue("npc:npc5")
+
+
+def test_entry_conditions_pick_the_starting_node(ui):
+    ui.start_dialogue({"type": "npc", "id": "npc4", "name": "神秘研究員"})
+    assert ui.dialogue_node_key == "npc:npc4/locked"
+
+    ui.has_keycard = True
+    ui.start_dialogue({"type": "npc", "id": "npc4", "name": "神秘研究員"})
+    assert ui.dialogue_node_key == "npc:npc4/weak"
+
+    ui.get_game_state().player_stats["level"] = 3
+    ui.start_dialogue({"type": "npc", "id": "npc4", "name": "神秘研究員"})
+    assert ui.dialogue_node_key == "npc:npc4/ready"
+    assert ui.dialogue_options[-1] == "離開"
+
+
+def test_unknown_ids_use_default_dialogue_with_name(ui):
+    ui.start_dialogue({"type": "shop", "id": "Z", "name": "書店"})
+    assert ui.dialogue_text == "這是書店，看起來已經荒廢了..."
+
+
+def test_option_actions_heal_and_add_exp(ui):
+    game_state = ui.get_game_state()
+    game_state.player_stats["hp"] = 50
+    ui.start_dialogue({"type": "shop", "id": "A", "name": "7-11"})
+    choose(ui, "購買醫療用品")
+    assert game_state.player_stats["hp"] == 80
+    assert game_state.player_stats["exp"] == 10
+    assert ui.current_message == "購買成功！HP +30, EXP +10"
+    assert not ui.dialogue_active
+
+    ui.start_dialogue({"type": "shop", "id": "A", "name": "7-11"})
+    game_state.player_stats["hp"] = game_state.player_stats["max_hp"]
+    choose(ui, "購買醫療用品")
+    assert ui.current_message == "你的血量已滿！"
+
+
+def test_nested_chance_and_flag_conditions(ui):
+    with patch.object(dialogue_graph_stream(), "random", return_value=0.1):
+        ui.start_dialogue({"type": "shop", "id": "L", "name": "咖啡廳"})
+        choose(ui, "仔細搜查")
+    assert ui.has_keycard
+    assert ui.get_game_state().player_stats["exp"] == 50
+
+
+def dialogue_graph_stream():
+    from rng_service import rng_service
+    return rng_service.stream("loot")
+
+
+def test_inventory_condition_and_take_item(ui):
+    inventory = ui.get_inventory()
+    ui.start_dialogue({"type": "npc", "id": "npc2", "name": "受傷職員"})
+    choose(ui, "給予醫療用品")
+    assert ui.current_message == "你沒有醫療用品可以給予！先去商店購買一些吧。"
+
+    inventory.add_item({"name": "醫療包", "type": "healing", "quantity": 1})
+    ui.start_dialogue({"type": "npc", "id": "npc2", "name": "受傷職員"})
+    choose(ui, "給予醫療用品")
+    assert not inventory.has_item("醫療包")
+    assert ui.get_game_state().player_stats["exp"] == 40
+
+
+def test_teleport_and_formatted_message(ui):
+    ui.start_dialogue({"type": "npc", "id": "npc3", "name": "神秘研究員"})
+    choose(ui, "鑰匙卡在哪？")
+    ui.player_reference.set_position.assert_called_once_with(300, 150)
+
+    ui.has_keycard = True
+    ui.get_game_state().player_stats["level"] = 4
+    ui.start_dialogue({"type": "npc", "id": "npc5", "name": "最後的研究者"})
+    ui.get_game_state().player_stats["level"] = 3
+    choose(ui, "拿取解藥")
+    assert "目前等級: 3" in ui.current_message
+    assert not ui.has_antidote
+
+
+def make_graph(dialogues):
+    graph = DialogueGraph(pipeline=None)
+    graph.compile(dialogues)
+    return graph
+
+
+def test_next_node_and_dispatch_table():
+    graph = make_graph({"npc:x": {"name": "X", "nodes": {
+        "start": {"text": "嗨", "options": [{"id": "more", "text": "還有呢？", "next": "more"}]},
+        "more": {"text": "沒了", "options": [{"id": "bye", "text": "再見", "actions": [{"type": "close"}],
+                                               "next": "start"}]},
+    }}})
+    context = MagicMock(closed=False)
+    assert graph.enter("npc:x", context) == "npc:x/start"
+    assert graph.choose("npc:x/start", "more", context) == "npc:x/more"
+
+    from dialogue_graph import DialogueContext
+    closing = DialogueContext(MagicMock(), MagicMock(), None)
+    assert graph.choose("npc:x/more", "bye", closing) is None
+    assert set(graph.table) == {("npc:x/start", "more"), ("npc:x/more", "bye")}
+
+
+def test_invalid_actions_are_reported_and_skipped():
+    graph = make_graph({"npc:x": {"name": "X", "nodes": {
+        "start": {"text": "嗨", "options": [
+            {"id": "bad", "text": "壞掉", "actions": [{"type": "explode"}]},
+            {"id": "lost", "text": "迷路", "next": "nowhere"},
+            {"id": "ok", "text": "好"},
+        ]},
+    }}})
+    assert [option_id for option_id, _ in graph.get_node("npc:x/start").options] == ["lost", "ok"]
+    assert any("explode" in error for error in graph.errors)
+    assert any("nowhere" in error for error in graph.errors)
@@ -0,0 +1,186 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+from font_manager import FontManager, GlyphAtlas
+
+
+@pytest.fixture
+def manager():
+    pygame.init()
+    return FontManager()
+
+
+def test_render_text_hits_cache(manager):
+    first = manager.render_text("生命值: 100/100", 20, (255, 255, 255))
+    second = manager.render_text("生命值: 100/100", 20, (255, 255, 255))
+
+    assert first is second
+    stats = manager.get_text_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["bytes"] == first.get_pitch() * first.get_height()
+
+
+def test_cache_key_includes_style(manager):
+    plain = manager.render_text("等級", 16, (255, 255, 255))
+    bold = manager.render_text("等級", 16, (255, 255, 255), bold=True)
+    colored = manager.render_text("等級", 16, [255, 255, 0])
+
+    assert plain is not bold
+    assert plain is not colored
+    assert manager.get_text_cache_stats()["entries"] == 3
+
+
+def test_cache_evicts_least_recently_used(manager):
+    first = manager.render_text("A", 24, (255, 255, 255))
+    entry_bytes = manager.text_cache_bytes
+    manager.set_text_cache_budget(entry_bytes * 2)
+
+    manager.render_text("B", 24, (255, 255, 255))
+    manager.render_text("A", 24, (255, 255, 255))  # A 變成最近使用
+    manager.render_text("C", 24, (255, 255, 255))
+
+    keys = [key[0] for key in manager.text_cache]
+    assert keys == ["A", "C"]
+    assert manager.text_cache_evictions == 1
+    assert manager.text_cache_bytes <= manager.text_cache_budget
+    assert manager.render_text("A", 24, (255, 255, 255)) is first
+
+
+def test_multiline_text_is_cached(manager):
+    lines = manager.render_multiline_text("one two three four five six", 20, (255, 255, 255), 80)
+    again = manager.render_multiline_text("one two three four five six", 20, (255, 255, 255), 80)
+
+    assert len(lines) > 1
+    assert lines == again
+    assert manager.text_cache_hits == 1
+
+
+def get_bundled_font_path():
+    return os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+
+
+def test_font_probe_results_are_persisted(tmp_path):
+    pygame.init()
+    cache_path = str(tmp_path / "font_probe.json")
+    font_path = get_bundled_font_path()
+
+    first = FontManager(probe_cache_path=cache_path)
+    probe = first.probe_font(font_path)
+    first.save_font_probe_cache()
+    assert probe["renders"]
+    # pygame 內建字體沒有中文字形
+    assert not probe["cjk"]
+    assert first.font_probe_misses >= 1
+
+    second = FontManager(probe_cache_path=cache_path)
+    assert second.probe_font(font_path) == probe
+    assert second.font_probe_hits == 1
+    assert font_path not in second.list_cjk_fonts()
+
+
+def test_font_probe_reruns_when_file_changes(tmp_path):
+    pygame.init()
+    font_path = str(tmp_path / "custom.ttf")
+    with open(get_bundled_font_path(), "rb") as src, open(font_path, "wb") as dst:
+        dst.write(src.read())
+
+    manager = FontManager(probe_cache_path=str(tmp_path / "font_probe.json"))
+    manager.probe_font(font_path)
+    misses = manager.font_probe_misses
+
+    os.utime(font_path, ns=(1, 1))
+    manager.probe_font(font_path)
+    assert manager.font_probe_misses == misses + 1
+
+
+def test_glyph_atlas_reuses_glyphs_for_dynamic_text():
+    pygame.init()
+    font = pygame.font.Font(None, 20)
+    atlas = GlyphAtlas()
+
+    first = atlas.render(font, "HP: 73/120", 20, (255, 0, 0))
+    misses = atlas.glyph_misses
+    second = atlas.render(font, "HP: 72/120", 20, (255, 0, 0))
+
+    assert first.get_size() == font.size("HP: 73/120")
+    assert second.get_size() == font.size("HP: 72/120")
+    # 只有新出現的 "2" 需要光柵化
+    assert atlas.glyph_misses == misses
+    assert any(second.get_at((x, y)) == (255, 0, 0, 255)
+               for x in range(second.get_width()) for y in range(second.get_height()))
+
+
+class CountingFont:
+    """記錄 render 次數的字體"""
+
+    def __init__(self, font):
+        self.font = font
+        self.renders = 0
+
+    def render(self, *args):
+        self.renders += 1
+        return self.font.render(*args)
+
+    def size(self, text):
+        return self.font.size(text)
+
+    def get_height(self):
+        return self.font.get_height()
+
+
+def test_glyph_atlas_falls_back_when_full():
+    pygame.init()
+    font = CountingFont(pygame.font.Font(None, 20))
+    atlas = GlyphAtlas(size=(24, 24), reset_on_full=False)
+
+    assert atlas.render(font, "ABCDEFGHIJ", 20, (255, 255, 255)) is None
+    assert atlas.render(font, "第一行\n第二行", 20, (255, 255, 255)) is None
+    assert atlas.get_stats()["fallbacks"] == 1
+    assert atlas.full
+
+    # 滿了之後新的字不再逐字光柵化
+    renders = font.renders
+    assert atlas.render(font, "KLMNOP", 20, (255, 255, 255)) is None
+    assert font.renders == renders
+
+
+def test_full_glyph_atlas_resets_instead_of_degrading():
+    pygame.init()
+    font = pygame.font.Font(None, 20)
+    atlas = GlyphAtlas(size=(24, 24))
+
+    small = atlas.render(font, "ABCDEFGHIJ", 20, (255, 255, 255))
+    assert small is not None
+    assert atlas.generation > 0
+    assert atlas.get_stats()["fallbacks"] == 0
+
+    # 途中清空圖集也不影響組合結果
+    expected = GlyphAtlas().render(font, "ABCDEFGHIJ", 20, (255, 255, 255))
+    assert pygame.image.tostring(small, "RGBA") == pygame.image.tostring(expected, "RGBA")
+
+
+def test_render_text_composes_with_glyph_atlas(manager):
+    surface = manager.render_text("等級 3", 18, (255, 255, 0))
+    assert manager.glyph_atlas.get_stats()["glyphs"] == 4
+    assert surface.get_size() == manager.get_text_size("等級 3", 18)
+
+    # 點陣文字不經過圖集
+    manager.render_text("等級 3", 18, (255, 255, 0), antialias=False)
+    assert manager.glyph_atlas.get_stats()["glyphs"] == 4
+
+
+def test_headless_mode_skips_rasterization(manager):
+    manager.set_headless()
+    surface = manager.render_text("HP: 100/100", 18, (255, 255, 255))
+    assert surface.get_size() == (1, 1)
+    assert manager.get_text_cache_stats()["entries"] == 0
+    assert manager.get_text_size("HP", 18)[0] > 1  # 量測照常
+
+    manager.set_headless(False)
+    assert manager.render_text("HP: 100/100", 18, (255, 255, 255)).get_width() > 1
@@ -0,0 +1,62 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from unittest.mock import patch
+
+from frame_profiler import FrameProfiler, null_profiler
+
+
+def run_frame(profiler, clock, frame_seconds, phase_seconds):
+    """用假的時鐘跑一幀：phase_seconds 花在 ui_render，其餘時間不計入階段"""
+    clock.append(0.0)
+    profiler.begin_frame()
+    clock.append(0.0)
+    with profiler.phase("ui_render"):
+        clock.append(phase_seconds)
+    clock.append(frame_seconds)
+    profiler.end_frame()
+
+
+def test_ring_buffer_keeps_latest_frames_in_order():
+    profiler = FrameProfiler(history=3)
+    clock = []
+    with patch("frame_profiler.time.perf_counter", side_effect=lambda: clock[-1]):
+        for i in range(1, 6):
+            run_frame(profiler, clock, i / 1000.0, i / 2000.0)
+
+    assert profiler.count == 3
+    assert [round(ms, 6) for ms in profiler.get_frame_times_ms()] == [3.0, 4.0, 5.0]
+    assert round(profiler.get_phase_averages_ms()["ui_render"], 6) == 2.0
+    assert profiler.get_phase_averages_ms()["flip"] == 0.0
+
+
+def test_toggle_resets_history():
+    profiler = FrameProfiler(history=4)
+    assert profiler.toggle() is True
+    profiler.begin_frame()
+    profiler.end_frame()
+    assert profiler.count == 1
+
+    assert profiler.toggle() is False
+    assert profiler.toggle() is True
+    assert profiler.count == 0
+    assert profiler.get_frame_times_ms() == []
+
+
+def test_phase_context_manager_accumulates():
+    profiler = FrameProfiler(history=2)
+    clock = [0.0]
+    with patch("frame_profiler.time.perf_counter", side_effect=lambda: clock[-1]):
+        profiler.begin_frame()
+        for start in (0.001, 0.004):
+            clock.append(start)
+            with profiler.phase("map_render"):
+                clock.append(start + 0.002)
+        profiler.end_frame()
+    assert round(profiler.get_phase_averages_ms()["map_render"], 6) == 4.0
+
+    # 關閉時的空區塊不量測
+    with null_profiler.phase("map_render"):
+        pass
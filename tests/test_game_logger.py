@@ -0,0 +1,66 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_logger import GameLogger, DEBUG, INFO, WARNING, ERROR
+
+
+class Exploding:
+    """格式化時才會被呼叫的參數"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "boom"
+
+
+def test_records_below_level_are_dropped_without_formatting():
+    logger = GameLogger(default_level=INFO)
+    arg = Exploding()
+    logger.debug("sound", "播放 %s", arg)
+    assert len(logger.records) == 0
+    assert arg.formatted == 0
+
+
+def test_formatting_is_deferred_until_read(capsys):
+    logger = GameLogger(default_level=DEBUG, echo_level=ERROR)
+    arg = Exploding()
+    logger.debug("sound", "播放 %s", arg)
+    assert arg.formatted == 0
+    assert capsys.readouterr().out == ""
+    assert logger.get_lines()[0].endswith("[sound] 播放 boom")
+    assert arg.formatted == 1
+
+
+def test_per_subsystem_levels_and_configure():
+    logger = GameLogger(default_level=WARNING)
+    logger.configure("combat=DEBUG, sound=info, *=ERROR, echo=ERROR, bogus")
+    assert logger.is_enabled("combat", DEBUG)
+    assert not logger.is_enabled("sound", DEBUG)
+    assert logger.is_enabled("sound", INFO)
+    assert not logger.is_enabled("map", WARNING)
+    assert logger.echo_level == ERROR
+
+
+def test_echo_level_prints_immediately(capsys):
+    logger = GameLogger(default_level=DEBUG, echo_level=WARNING)
+    logger.info("map", "切換樓層")
+    logger.error("map", "❌ 載入失敗: %s", "stairs.png")
+    out = capsys.readouterr().out
+    assert "切換樓層" not in out
+    assert "❌ 載入失敗: stairs.png" in out
+
+
+def test_ring_buffer_keeps_latest_records(tmp_path):
+    logger = GameLogger(default_level=DEBUG, capacity=3)
+    for index in range(5):
+        logger.info("combat", "回合 %d", index)
+    lines = logger.get_lines()
+    assert [line.split()[-1] for line in lines] == ["2", "3", "4"]
+
+    path = tmp_path / "logs" / "game.log"
+    assert logger.dump(str(path)) == 3
+    assert path.read_text(encoding="utf-8").count("\n") == 3
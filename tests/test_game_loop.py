@@ -0,0 +1,147 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from font_manager import font_manager
+from main import Game
+from player import Player
+from scheduler import scheduler
+
+
+@pytest.fixture
+def game():
+    pygame.init()
+    font_manager.fonts.clear()
+    scheduler.clear()
+    game = Game()
+    game.update_count = 0
+
+    def update():
+        game.update_count += 1
+    game.update = update
+    return game
+
+
+def test_simulation_runs_at_fixed_rate_regardless_of_frame_rate(game):
+    # 144 Hz：一秒 144 幀，模擬仍然是 60 個 tick
+    for _ in range(144):
+        game.advance_simulation(1.0 / 144)
+    assert game.update_count in (59, 60)
+
+    # 30 Hz：每幀補兩個 tick
+    game.update_count = 0
+    for _ in range(30):
+        game.advance_simulation(1.0 / 30)
+    assert game.update_count in (59, 60, 61)
+
+
+def test_long_frames_are_clamped(game):
+    steps = game.advance_simulation(5.0)
+    assert steps == game.max_sim_steps
+    assert game.sim_accumulator <= game.sim_dt
+    assert 0.0 <= game.render_alpha <= 1.0
+
+
+def test_render_alpha_is_fraction_of_tick(game):
+    game.advance_simulation(game.sim_dt * 1.5)
+    assert game.update_count == 1
+    assert game.render_alpha == pytest.approx(0.5)
+
+
+def test_player_render_interpolates_between_ticks():
+    pygame.init()
+    font_manager.fonts.clear()
+    screen = pygame.display.set_mode((1024, 768))
+    player = Player(100, 100)
+    player.speed = 8
+    player.move(32, 0)
+    player.update()
+    moved = player.x - player.prev_x
+    assert moved > 0
+
+    player.render(screen, 0.5)
+    assert player.render_x == pytest.approx(player.prev_x + moved / 2)
+    player.render(screen)
+    assert player.render_x == player.x
+
+    # 傳送不內插
+    player.set_position(400, 300)
+    player.render(screen, 0.5)
+    assert (player.render_x, player.render_y) == (400, 300)
+
+
+def test_player_holds_position_while_ui_is_open():
+    pygame.init()
+    font_manager.fonts.clear()
+    scheduler.clear()
+    game = Game()
+    press_key(game, pygame.K_SPACE)  # 介紹 -> 角色選擇
+    press_key(game, pygame.K_SPACE)  # 確認預設角色
+    game.map_manager.combat_zones = {}
+    game.player.speed = 4
+    game.player.move(32, 0)
+    game.update()
+    assert game.player.x != game.player.prev_x
+
+    # 移動途中開啟背包：之後每幀的 render_alpha 不同，畫面位置仍要固定
+    game.ui.toggle_inventory()
+    assert game.ui.is_any_ui_open()
+    game.update()
+    positions = set()
+    for alpha in (0.1, 0.5, 0.9, 0.3):
+        game.player.render(game.screen, alpha)
+        positions.add((game.player.render_x, game.player.render_y))
+    assert positions == {(game.player.x, game.player.y)}
+
+
+def press_key(game, key):
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+    game.handle_events()
+
+
+def test_intro_is_quiescent_until_overlays_are_shown(game):
+    assert game.show_intro
+    assert game.is_scene_quiescent()
+
+    game.profiler.enabled = True
+    assert not game.is_scene_quiescent()
+    game.profiler.enabled = False
+
+    game.idle_pacing = False
+    assert not game.is_scene_quiescent()
+
+
+def test_exploration_is_quiescent_only_when_nothing_animates(game):
+    press_key(game, pygame.K_SPACE)  # 介紹 -> 角色選擇
+    assert not game.is_scene_quiescent()
+    press_key(game, pygame.K_SPACE)  # 確認預設角色
+
+    # 移到沒有物品的空樓層、站著不動
+    game.map_manager.items[game.map_manager.current_floor] = []
+    game.ui.message_display_time = 0
+    assert game.is_scene_quiescent()
+
+    game.ui.show_message("測試訊息")
+    assert not game.is_scene_quiescent()
+    game.ui.message_display_time = 0
+
+    game.player.move(32, 0)
+    assert not game.is_scene_quiescent()
+
+
+def test_wait_for_activity_keeps_the_event(game):
+    pygame.event.clear()
+    game.idle_frame_drawn = True
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_i, mod=0, unicode=""))
+
+    game.wait_for_activity()
+
+    assert not game.idle_frame_drawn
+    events = pygame.event.get(pygame.KEYDOWN)
+    assert [event.key for event in events] == [pygame.K_i]
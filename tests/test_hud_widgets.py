@@ -0,0 +1,83 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from hud_widgets import BarWidget, HudLayer, TextWidget
+from font_manager import font_manager
+from game_state import GameState
+from player import Player
+from ui import UI
+
+
+@pytest.fixture
+def screen():
+    # 其他測試可能呼叫過 pygame.quit()，這裡重新建立顯示；舊的字體物件在 pygame.quit() 後失效，需要清除快取
+    pygame.init()
+    font_manager.fonts.clear()
+    return pygame.display.set_mode((1024, 768))
+
+
+def test_widget_recomposes_only_on_value_change(screen):
+    stats = {"hp": 100}
+    widget = TextWidget((0, 0), lambda: (f"HP: {stats['hp']}", (255, 255, 255)), 18)
+
+    widget.draw(screen)
+    widget.draw(screen)
+    assert widget.compose_count == 1
+
+    stats["hp"] = 90
+    widget.draw(screen)
+    assert widget.compose_count == 2
+
+
+def test_bar_widget_colors_by_ratio(screen):
+    bar = BarWidget(pygame.Rect(0, 0, 100, 10), lambda value: value, (100, 100, 100),
+                    lambda ratio: (255, 0, 0) if ratio < 0.3 else (0, 255, 0))
+
+    bar.update((20, 100))
+    assert bar.surface.get_at((10, 5))[:3] == (255, 0, 0)
+    assert bar.surface.get_at((50, 5))[:3] == (100, 100, 100)
+
+    bar.update((100, 100))
+    assert bar.surface.get_at((99, 5))[:3] == (0, 255, 0)
+
+
+def test_hidden_widget_is_not_drawn(screen):
+    layer = HudLayer()
+    layer.add(TextWidget((0, 0), lambda visible: ("提示", (255, 255, 255)) if visible else None, 18))
+
+    screen.fill((0, 0, 0))
+    blank = pygame.image.tobytes(screen, "RGB")
+    layer.draw(screen, False)
+    assert pygame.image.tobytes(screen, "RGB") == blank
+
+    layer.draw(screen, True)
+    assert pygame.image.tobytes(screen, "RGB") != blank
+
+
+def test_ui_hud_composes_only_changed_widgets(screen):
+    ui = UI(screen)
+    game_state = GameState()
+    player = Player(100, 100)
+
+    ui.render_hud(game_state, player)
+    composes = ui.hud.get_stats()["composes"]
+    for _ in range(10):
+        ui.render_hud(game_state, player)
+    assert ui.hud.get_stats()["composes"] == composes
+
+    # 扣血：血量條和血量文字
+    game_state.player_stats["hp"] -= 10
+    ui.render_hud(game_state, player)
+    assert ui.hud.get_stats()["composes"] == composes + 2
+
+    # 取得鑰匙卡：只有道具狀態
+    ui.has_keycard = True
+    ui.render_hud(game_state, player)
+    assert ui.hud.get_stats()["composes"] == composes + 3
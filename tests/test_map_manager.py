@@ -0,0 +1,116 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+import map_manager as map_manager_module
+from map_manager import MapManager
+from font_manager import font_manager
+
+
+@pytest.fixture
+def screen():
+    # 其他測試可能呼叫過 pygame.quit()，這裡重新建立顯示；舊的字體物件在 pygame.quit() 後失效，需要清除快取
+    pygame.init()
+    font_manager.fonts.clear()
+    return pygame.display.set_mode((1024, 768))
+
+
+@pytest.fixture
+def map_manager(screen):
+    return MapManager()
+
+
+def test_floors_come_from_content_pipeline(map_manager):
+    assert sorted(map_manager.floor_maps) == [1, 2, 3]
+    assert map_manager.combat_zones[1][0]["id"] == "hallway_1"
+    assert map_manager.check_combat_zone(160, 160, 1)["name"] == "走廊1"
+    assert map_manager.check_item_pickup(120, 180, 1)["item"]["name"] == "醫療包"
+
+
+def test_fallback_floors_when_no_data(screen, monkeypatch):
+    monkeypatch.setattr(map_manager_module.content_pipeline, "get_floors", lambda: {})
+    manager = MapManager()
+    assert manager.interactions == map_manager_module.FALLBACK_INTERACTIONS
+    assert manager.interactions[1] is not map_manager_module.FALLBACK_INTERACTIONS[1]
+    assert manager.check_interaction(460, 110, 1)["target_floor"] == 2
+
+
+def test_static_layer_is_composed_once(map_manager, screen):
+    map_manager.render(screen)
+    layer = map_manager.static_layers[1]
+    map_manager.render(screen)
+    assert map_manager.static_layers[1] is layer
+
+
+def test_static_layer_matches_direct_render(map_manager, screen):
+    layer = map_manager.get_static_layer(screen)
+    direct = pygame.Surface(screen.get_size()).convert(screen)
+    map_manager.render_static_content(direct)
+    assert pygame.image.tostring(layer, "RGB") == pygame.image.tostring(direct, "RGB")
+
+
+def test_change_floor_invalidates_layer(map_manager, screen):
+    map_manager.render(screen)
+    map_manager.change_floor(2)
+    assert 1 not in map_manager.static_layers
+    map_manager.render(screen)
+    assert 2 in map_manager.static_layers
+
+
+def test_remove_combat_zone_invalidates_layer(map_manager, screen):
+    map_manager.render(screen)
+    zone = map_manager.combat_zones[1][0]
+    map_manager.remove_combat_zone(zone, 1)
+    assert 1 not in map_manager.static_layers
+
+
+def test_reload_and_debug_toggle_invalidate_layer(map_manager, screen):
+    map_manager.render(screen)
+    map_manager.reload_floor_images()
+    assert not map_manager.static_layers
+
+    map_manager.render(screen)
+    map_manager.toggle_combat_zone_debug()
+    assert not map_manager.static_layers
+
+
+def test_dirty_rects_only_cover_items_when_floor_is_unchanged(map_manager, screen):
+    map_manager.render(screen)
+    assert map_manager.get_dirty_rects() == [screen.get_rect()]
+
+    rects = map_manager.get_dirty_rects()
+    assert len(rects) == len(map_manager.items[1])
+    assert all(rect.size == (70, 70) for rect in rects)
+
+    map_manager.change_floor(2)
+    assert map_manager.get_dirty_rects() == [screen.get_rect()]
+
+
+def test_item_pickup_uses_index_and_collection_removes_item(map_manager):
+    pickup = map_manager.check_item_pickup(125, 185, 1)
+    assert pickup["item"]["name"] == "醫療包"
+    assert pickup["item_id"] == "1_醫療包_120_180"
+
+    map_manager.collect_item(pickup["item_id"])
+    assert map_manager.check_item_pickup(125, 185, 1) is None
+
+    map_manager.reset_items()
+    assert map_manager.check_item_pickup(125, 185, 1) is not None
+
+
+def test_interaction_and_combat_zone_lookup(map_manager):
+    shop = map_manager.interactions[1][0]
+    found = map_manager.check_interaction(shop["x"] + 1, shop["y"] + 1, 1)
+    assert found is shop
+
+    zone = map_manager.combat_zones[1][0]
+    assert map_manager.check_combat_zone(zone["x"] + 5, zone["y"] + 5, 1) is zone
+
+    map_manager.remove_combat_zone(zone, 1)
+    assert map_manager.check_combat_zone(zone["x"] + 5, zone["y"] + 5, 1) is None
@@ -0,0 +1,78 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from font_manager import font_manager
+from main import Game
+from replay import InputRecorder, ReplayLog, run_replay, snapshot_state, state_digest
+
+
+@pytest.fixture
+def screen():
+    pygame.init()
+    font_manager.fonts.clear()
+    return pygame.display.set_mode((1024, 768))
+
+
+def test_events_round_trip():
+    recorder = InputRecorder(seed=1234)
+    recorder.record(0, [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, mod=pygame.KMOD_LSHIFT, unicode="A")])
+    recorder.record(5, [
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(10, 20), rel=(-3, 4), buttons=(True, False, True)),
+        pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(10, 20), button=1),
+        pygame.event.Event(pygame.WINDOWFOCUSLOST),  # 不需要記錄
+        pygame.event.Event(pygame.QUIT),
+    ])
+
+    log = ReplayLog.from_bytes(recorder.to_bytes(9, 0xABCDEF))
+
+    assert (log.seed, log.end_tick, log.digest) == (1234, 9, 0xABCDEF)
+    assert [(tick, event.type) for tick, event in log.events] == [
+        (0, pygame.KEYDOWN), (5, pygame.MOUSEMOTION), (5, pygame.MOUSEBUTTONDOWN), (5, pygame.QUIT)]
+    key = log.events[0][1]
+    assert (key.key, key.mod, key.unicode) == (pygame.K_a, pygame.KMOD_LSHIFT, "A")
+    motion = log.events[1][1]
+    assert (motion.pos, motion.rel, motion.buttons) == ((10, 20), (-3, 4), (True, False, True))
+
+
+def test_truncated_log_replays_to_last_event():
+    recorder = InputRecorder(seed=1)
+    recorder.record(7, [pygame.event.Event(pygame.QUIT)])
+    log = ReplayLog.from_bytes(bytes(recorder.data))
+    assert log.end_tick == 7
+    assert log.digest is None
+
+
+def test_rejects_unknown_format():
+    with pytest.raises(ValueError):
+        ReplayLog.from_bytes(b"NOPE" + bytes(12))
+
+
+def test_replay_reproduces_session(screen):
+    game = Game(seed=42, record_path="unused.rpl")
+
+    # 進入遊戲，往左上走進戰鬥區域，然後持續攻擊
+    script = {0: pygame.K_SPACE, 5: pygame.K_SPACE}
+    for step in range(40):
+        script[10 + step * 10] = pygame.K_UP if step % 2 else pygame.K_LEFT
+    for step in range(30):
+        script[420 + step * 40] = pygame.K_1
+    for tick in range(1700):
+        if tick in script:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=script[tick], mod=0, unicode=""))
+        game.handle_events()
+        game.update()
+
+    recorded = snapshot_state(game)
+    assert recorded["started"] and recorded["stats"]["exp"] > 0  # 有打過仗，用到了亂數
+    log = ReplayLog.from_bytes(game.recorder.to_bytes(game.sim_tick, state_digest(game)))
+
+    replayed = Game(seed=log.seed)
+    assert run_replay(replayed, log) == log.digest
+    assert snapshot_state(replayed) == recorded
@@ -0,0 +1,63 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from rng_service import RNGService, derive_seed
+
+
+def draws(stream, count=5):
+    return [stream.random() for _ in range(count)]
+
+
+def test_same_seed_gives_same_streams():
+    first = RNGService(42)
+    second = RNGService(42)
+    assert draws(first.stream("combat")) == draws(second.stream("combat"))
+
+
+def test_streams_are_independent():
+    service = RNGService(42)
+    reference = RNGService(42)
+    service.stream("combat").random()  # 多抽一次戰鬥亂數
+    assert draws(service.stream("loot")) == draws(reference.stream("loot"))
+    assert derive_seed(42, "combat") != derive_seed(42, "loot")
+
+
+def test_reseed_keeps_stream_objects():
+    service = RNGService(1)
+    combat = service.stream("combat")
+    service.reseed(2)
+    assert service.stream("combat") is combat
+    assert draws(combat) == draws(RNGService(2).stream("combat"))
+
+
+def test_snapshot_and_restore():
+    service = RNGService(7)
+    service.stream("combat").random()
+    snapshot = service.snapshot()
+    expected = draws(service.stream("combat"))
+
+    service.reseed(99)
+    service.restore(snapshot)
+    assert service.seed == 7
+    assert draws(service.stream("combat")) == expected
+
+
+def test_numpy_stream_is_reproducible():
+    pytest.importorskip("numpy")
+    first = RNGService(3).numpy_stream("balance")
+    second = RNGService(3).numpy_stream("balance")
+    assert first.integers(0, 100, size=8).tolist() == second.integers(0, 100, size=8).tolist()
+
+
+def test_reseed_keeps_numpy_stream_objects():
+    pytest.importorskip("numpy")
+    service = RNGService(1)
+    balance = service.numpy_stream("balance")
+    balance.integers(0, 100, size=3)
+    service.reseed(2)
+    assert service.numpy_stream("balance") is balance
+    expected = RNGService(2).numpy_stream("balance").integers(0, 100, size=8).tolist()
+    assert balance.integers(0, 100, size=8).tolist() == expected
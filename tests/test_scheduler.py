@@ -0,0 +1,84 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import LEVEL_SIZE, Scheduler
+
+
+def run(scheduler, ticks):
+    for _ in range(ticks):
+        scheduler.tick()
+
+
+def test_one_shot_fires_once_at_deadline():
+    scheduler = Scheduler()
+    fired = []
+    scheduler.call_later(3, fired.append, "a")
+
+    run(scheduler, 2)
+    assert fired == []
+    scheduler.tick()
+    assert fired == ["a"]
+    run(scheduler, 100)
+    assert fired == ["a"]
+    assert scheduler.active == 0
+
+
+def test_repeating_timer_until_cancelled():
+    scheduler = Scheduler()
+    fired = []
+    timer = scheduler.call_every(10, lambda: fired.append(scheduler.tick_count))
+
+    run(scheduler, 35)
+    assert fired == [10, 20, 30]
+    timer.cancel()
+    run(scheduler, 20)
+    assert fired == [10, 20, 30]
+    assert scheduler.active == 0
+
+
+def test_cancelled_timer_never_fires():
+    scheduler = Scheduler()
+    fired = []
+    timer = scheduler.call_later(5, fired.append, 1)
+    assert timer.remaining == 5
+    timer.cancel()
+    run(scheduler, 10)
+    assert fired == []
+    assert timer.remaining == 0
+
+
+def test_long_delays_cascade_to_exact_tick():
+    scheduler = Scheduler()
+    fired = {}
+    delays = [1, 63, 64, 65, 4095, 4096, 4097, LEVEL_SIZE ** 3 + 7]
+    for delay in delays:
+        scheduler.call_later(delay, lambda delay=delay: fired.setdefault(delay, scheduler.tick_count))
+
+    run(scheduler, delays[-1])
+    assert fired == {delay: delay for delay in delays}
+
+
+def test_countdown_without_callback():
+    scheduler = Scheduler()
+    timer = scheduler.call_later(180)
+    run(scheduler, 60)
+    assert timer.remaining == 120
+    run(scheduler, 120)
+    assert timer.remaining == 0
+    assert not timer.pending
+
+
+def test_seconds_to_ticks():
+    scheduler = Scheduler(tick_rate=60)
+    assert scheduler.ticks(0.5) == 30
+    assert scheduler.ticks(0) == 1
+
+
+def test_delay_beyond_wheel_range_is_reinserted():
+    scheduler = Scheduler()
+    timer = scheduler.call_later(LEVEL_SIZE ** 4 + 5)
+    # 超出範圍的計時器放在最高層，剩餘時間仍然正確
+    assert timer.remaining == LEVEL_SIZE ** 4 + 5
+    assert sum(len(slot) for slot in scheduler.wheels[-1]) == 1
@@ -0,0 +1,32 @@
+import sys
+import os
+# 添加 tools 資料夾到 Python 路徑
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools"))
+
+import soak_test
+
+
+def make_sample(tick, gc_objects, messages=0):
+    watches = {name: 0 for name in soak_test.WATCHES}
+    watches["game_state.messages"] = messages
+    return {"tick": tick, "gc_objects": gc_objects, "watches": watches}
+
+
+def test_growth_is_reported_for_steadily_increasing_metrics():
+    samples = [make_sample(tick, 30000, messages=tick // 10) for tick in range(0, 8000, 1000)]
+    growing = soak_test.find_growth(samples)
+    assert [growth["metric"] for growth in growing] == ["game_state.messages"]
+    assert growing[0]["to"] == 700
+
+
+def test_noise_and_plateaus_are_not_growth():
+    samples = [make_sample(tick, 30000 + (tick // 1000) % 3) for tick in range(0, 8000, 1000)]
+    assert soak_test.find_growth(samples) == []
+
+
+def test_random_policy_is_reproducible():
+    first = soak_test.RandomPolicy(seed=3, interval=2)
+    second = soak_test.RandomPolicy(seed=3, interval=2)
+    keys = [[event.key for event in first.events(None, tick) or []] for tick in range(20)]
+    assert keys == [[event.key for event in second.events(None, tick) or []] for tick in range(20)]
+    assert all(keys[tick] == [] for tick in range(1, 20, 2))
@@ -0,0 +1,52 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import random
+
+from spatial_index import SpatialHash
+
+
+def test_query_point_includes_rect_edges():
+    index = SpatialHash(cell_size=64)
+    index.insert("shop", "shop", 100, 100, 64, 64)
+
+    assert index.query_point(100, 100) == ["shop"]
+    assert index.query_point(164, 164) == ["shop"]
+    assert index.query_point(165, 164) == []
+
+
+def test_query_point_keeps_insertion_order():
+    index = SpatialHash(cell_size=32)
+    index.insert("big", "big", 0, 0, 200, 200)
+    index.insert("small", "small", 50, 50, 10, 10)
+
+    assert index.query_point(55, 55) == ["big", "small"]
+
+
+def test_query_radius_matches_linear_scan():
+    rng = random.Random(17)
+    index = SpatialHash(cell_size=64)
+    points = []
+    for i in range(300):
+        x, y = rng.randint(0, 1000), rng.randint(0, 750)
+        points.append((i, x, y))
+        index.insert(i, i, x, y)
+
+    for _ in range(100):
+        px, py = rng.randint(0, 1000), rng.randint(0, 750)
+        expected = [i for i, x, y in points if ((px - x) ** 2 + (py - y) ** 2) ** 0.5 <= 30]
+        assert index.query_radius(px, py, 30) == expected
+
+
+def test_remove_updates_queries():
+    index = SpatialHash(cell_size=16)
+    index.insert("zone", "zone", 0, 0, 100, 100)
+    assert "zone" in index
+
+    assert index.remove("zone")
+    assert "zone" not in index
+    assert index.query_point(50, 50) == []
+    assert not index.cells
+    assert not index.remove("zone")
@@ -0,0 +1,98 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+from asset_loader import AssetLoader
+from sprite_cache import BakedSpriteCache
+from sprite_registry import SpriteRegistry
+
+
+def save_image(path, color, size=(40, 20)):
+    surface = pygame.Surface(size, pygame.SRCALPHA)
+    surface.fill(color)
+    pygame.image.save(surface, str(path))
+    return str(path)
+
+
+@pytest.fixture
+def loader():
+    pygame.init()
+    loader = AssetLoader(max_workers=2)
+    yield loader
+    loader.shutdown()
+
+
+@pytest.mark.parametrize("fmt", ["raw", "png"])
+def test_store_and_load_round_trip(tmp_path, loader, fmt):
+    source = save_image(tmp_path / "shop.png", (10, 200, 30, 255))
+    cache = BakedSpriteCache(str(tmp_path / "cache"), fmt=fmt, loader=loader)
+    scaled = pygame.transform.scale(pygame.image.load(source), (8, 4))
+
+    assert cache.load(source, (8, 4)) is None
+    assert cache.store(source, (8, 4), scaled, (40, 20))
+
+    # 新的實例從 manifest 讀回資料
+    cache = BakedSpriteCache(str(tmp_path / "cache"), fmt=fmt, loader=loader)
+    baked = cache.load(source, (8, 4))
+    assert baked.get_size() == (8, 4)
+    assert tuple(baked.get_at((3, 2))) == (10, 200, 30, 255)
+    assert cache.get_source_size(source) == (40, 20)
+
+
+def test_changed_source_content_invalidates_entry(tmp_path, loader):
+    source = save_image(tmp_path / "npc.png", (255, 0, 0, 255))
+    cache = BakedSpriteCache(str(tmp_path / "cache"), loader=loader)
+    cache.store(source, (4, 4), pygame.Surface((4, 4), pygame.SRCALPHA), (40, 20))
+
+    save_image(source, (0, 0, 255, 255), size=(50, 50))
+    os.utime(source, ns=(1, 1))
+
+    assert cache.load(source, (4, 4)) is None
+    assert cache.get_source_size(source) is None
+    assert cache.prune() == 1
+
+
+def test_corrupt_entry_is_treated_as_miss(tmp_path, loader):
+    source = save_image(tmp_path / "item.png", (255, 255, 0, 255))
+    cache = BakedSpriteCache(str(tmp_path / "cache"), loader=loader)
+    cache.store(source, (4, 4), pygame.Surface((4, 4), pygame.SRCALPHA))
+
+    entry_path = cache.get_entry_path(cache.get_source_info(source)["sha1"], (4, 4))
+    with open(entry_path, "wb") as f:
+        f.write(b"broken")
+
+    assert cache.load(source, (4, 4)) is None
+
+
+def test_registry_uses_baked_sprites(tmp_path, loader):
+    source = save_image(tmp_path / "floor.png", (0, 128, 255, 255))
+    cache_dir = str(tmp_path / "cache")
+
+    first = SpriteRegistry(loader=loader, baked_cache=BakedSpriteCache(cache_dir, loader=loader))
+    first.acquire(source, (16, 8))
+    assert first.baked_cache.bakes == 1
+
+    second = SpriteRegistry(loader=loader, baked_cache=BakedSpriteCache(cache_dir, loader=loader))
+    sprite = second.acquire(source, (16, 8))
+    assert second.baked_cache.hits == 1
+    assert sprite.get_size() == (16, 8)
+    assert second.get_source_size(source) == (40, 20)
+    # 原圖沒有被解碼
+    assert second.make_key(source) not in second.entries
+
+
+def test_prefetch_reads_baked_entries_in_background(tmp_path, loader, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("images")
+    source = save_image("images/stairs.png", (90, 90, 90, 255))
+    cache = BakedSpriteCache("cache", loader=loader)
+    cache.store(source, (6, 3), pygame.Surface((6, 3), pygame.SRCALPHA))
+
+    baked = cache.prefetch("images")
+    assert baked == {os.path.normcase(os.path.abspath(source))}
+    assert loader.get_progress()[1] == 1
+    assert cache.load(source, (6, 3)).get_size() == (6, 3)
@@ -0,0 +1,85 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import pytest
+
+from asset_loader import AssetLoader
+from sprite_registry import SpriteRegistry
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    pygame.init()
+    paths = []
+    for i in range(3):
+        surface = pygame.Surface((32, 32), pygame.SRCALPHA)
+        surface.fill((i * 80, 0, 0, 255))
+        path = tmp_path / f"sprite{i}.png"
+        pygame.image.save(surface, str(path))
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def loader():
+    loader = AssetLoader(max_workers=2)
+    yield loader
+    loader.shutdown()
+
+
+def test_same_key_returns_shared_surface(image_paths, loader):
+    registry = SpriteRegistry(loader=loader)
+    first = registry.acquire(image_paths[0], (16, 16))
+    second = registry.acquire(image_paths[0], [16, 16])
+
+    assert first is second
+    assert first.get_size() == (16, 16)
+    assert registry.get_stats()["references"] == 2
+
+
+def test_variants_are_built_from_shared_base(image_paths, loader):
+    registry = SpriteRegistry(loader=loader)
+    registry.acquire(image_paths[0], (16, 16))
+    flipped = registry.acquire(image_paths[0], (16, 16), "flip_x")
+
+    assert flipped.get_size() == (16, 16)
+    # 原圖、縮放圖、翻轉圖各一份
+    assert registry.get_stats()["entries"] == 3
+    assert registry.get_source_size(image_paths[0]) == (32, 32)
+    # 原圖已由登錄表接手
+    assert not loader.images
+
+
+def test_unreferenced_entries_are_evicted_over_budget(image_paths, loader):
+    registry = SpriteRegistry(budget_bytes=32 * 32 * 4 * 2, loader=loader)
+    keep = registry.acquire(image_paths[0])
+    registry.acquire(image_paths[1])
+    registry.release(image_paths[1])
+    registry.acquire(image_paths[2])
+
+    stats = registry.get_stats()
+    assert stats["bytes"] <= registry.budget_bytes
+    assert stats["evictions"] == 1
+    assert registry.acquire(image_paths[0]) is keep
+    assert registry.make_key(image_paths[1]) not in registry.entries
+
+
+def test_referenced_entries_survive_over_budget(image_paths, loader):
+    registry = SpriteRegistry(budget_bytes=1, loader=loader)
+    surfaces = [registry.acquire(path) for path in image_paths]
+
+    assert registry.get_stats()["entries"] == 3
+    assert registry.get_stats()["evictions"] == 0
+
+    registry.release_all([registry.make_key(path) for path in image_paths])
+    assert registry.get_stats()["entries"] == 0
+    assert surfaces[0].get_size() == (32, 32)
+
+
+def test_unknown_transform_is_rejected(image_paths, loader):
+    registry = SpriteRegistry(loader=loader)
+    with pytest.raises(ValueError):
+        registry.acquire(image_paths[0], (16, 16), "rotate")
@@ -0,0 +1,58 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import story as story_module
+from story import StoryManager
+
+
+def test_location_and_tile_type_lookup():
+    story = StoryManager()
+    assert story.get_event_by_location(9, 1, 0)["id"] == "room_h"
+    assert story.get_event_by_location(16, 4, 0)["id"] == "freezer_event"
+    # 位置上沒有事件時依地圖格類型
+    assert story.get_event_by_location(30, 30, 6)["id"] == "storage_event"
+    assert story.get_event_by_location(30, 30, 0) is None
+
+
+def test_triggered_events_leave_the_index():
+    story = StoryManager()
+    assert story.trigger_event("room_k")
+    assert story.get_event_by_location(1, 1, 0) is None
+    assert (1, 1) not in story.events_by_location
+
+    story.trigger_event("freezer_event")
+    assert story.get_event_by_location(16, 4, 5) is None
+
+
+def test_gated_events_require_flags():
+    story = StoryManager()
+    assert story.get_event_by_location(0, 0, 0) is None
+    assert story.get_event_by_location(11, 0, 0) is None
+
+    for flag in ("door_locked", "has_medkit", "has_weapon"):
+        story.set_flag(flag)
+    assert story.get_event_by_location(0, 0, 0)["id"] == "upstairs_entry"
+    assert story.get_event_by_location(11, 0, 0) is None
+
+    story.set_flag("helped_npc")
+    assert story.get_event_by_location(11, 0, 0)["id"] == "third_floor_entry"
+
+
+def test_index_skips_events_already_triggered():
+    story = StoryManager()
+    story.triggered_events.add("room_h")
+    story.build_event_index()
+    assert story.get_event_by_location(9, 1, 0) is None
+
+
+def test_events_load_from_data_with_fallback(monkeypatch):
+    story = StoryManager()
+    assert story.events["intro"]["location"] == (5, 5)
+    assert story.events["upstairs_entry"]["requires"] == ["door_locked", "has_medkit", "has_weapon"]
+
+    monkeypatch.setattr(story_module.content_pipeline, "get_story_events", lambda: {})
+    fallback = StoryManager()
+    assert set(fallback.events) == set(story.events)
+    assert fallback.get_event_by_location(9, 1, 0)["id"] == "room_h"
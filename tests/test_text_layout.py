@@ -0,0 +1,68 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_layout import TextLayout, group_segments, is_wide, tokenize
+
+
+class FakeFont:
+    """等寬測試字型：半形 10px、全形 20px"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def size(self, text):
+        self.calls += 1
+        return sum(20 if is_wide(char) else 10 for char in text), 20
+
+
+def wrap(text, width):
+    return list(TextLayout().wrap(text, FakeFont(), width, "test"))
+
+
+def test_chinese_breaks_between_characters():
+    assert wrap("末世第二餐廳的倖存者", 100) == ["末世第二餐", "廳的倖存者"]
+
+
+def test_latin_words_stay_intact():
+    assert wrap("hello brave new world", 100) == ["hello", "brave new", "world"]
+
+
+def test_mixed_text_keeps_words_and_breaks_cjk():
+    assert wrap("請到7-11購買supplies吧", 110) == ["請到7-11購", "買supplies", "吧"]
+
+
+def test_closing_punctuation_never_starts_a_line():
+    # "，" 放不下時連同前一個字一起移到下一行
+    assert wrap("你好世界，朋友們", 80) == ["你好世", "界，朋友", "們"]
+
+
+def test_opening_punctuation_never_ends_a_line():
+    # "「" 和後面的字綁在一起，不會單獨留在行尾
+    assert wrap("他說「快跑」", 60) == ["他說", "「快", "跑」"]
+
+
+def test_long_word_is_hard_broken():
+    assert wrap("abcdefghijkl", 50) == ["abcde", "fghij", "kl"]
+
+
+def test_newlines_start_new_paragraphs():
+    assert wrap("第一行\n第二行", 200) == ["第一行", "第二行"]
+
+
+def test_layout_is_cached_per_text_font_and_width():
+    layout = TextLayout()
+    font = FakeFont()
+
+    first = layout.wrap("末世第二餐廳的倖存者", font, 100, "test")
+    calls = font.calls
+    assert layout.wrap("末世第二餐廳的倖存者", font, 100, "test") is first
+    assert font.calls == calls
+
+    layout.wrap("末世第二餐廳的倖存者", font, 120, "test")
+    assert layout.get_stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_segments_glue_punctuation():
+    assert group_segments(tokenize("好，「走」")) == ["好，", "「走」"]
@@ -0,0 +1,65 @@
+import sys
+import os
+# 添加項目根目錄到 Python 路徑
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import pytest
+
+from font_manager import font_manager
+from typewriter import Typewriter
+
+
+@pytest.fixture
+def screen():
+    # 其他測試可能呼叫過 pygame.quit()，這裡重新建立顯示；舊的字體物件在 pygame.quit() 後失效，需要清除快取
+    pygame.init()
+    font_manager.fonts.clear()
+    return pygame.display.set_mode((1024, 768))
+
+
+def test_reveals_at_configured_rate(screen):
+    typewriter = Typewriter(chars_per_second=30, tick_rate=60)
+    typewriter.start("hello world")
+
+    # 30 字/秒、60 tick/秒：每兩個 tick 一個字
+    assert typewriter.update() == 0
+    assert typewriter.update() == 1
+    for _ in range(8):
+        typewriter.update()
+    assert typewriter.revealed == 5
+    assert not typewriter.is_complete()
+
+
+def test_skip_reveals_everything(screen):
+    typewriter = Typewriter(max_width=100)
+    typewriter.start("末世第二餐廳的倖存者們")
+
+    assert typewriter.skip() == typewriter.total
+    assert typewriter.is_complete()
+    assert typewriter.update() == 0
+
+
+def test_zero_rate_reveals_immediately(screen):
+    typewriter = Typewriter(chars_per_second=0)
+    typewriter.start("立即顯示")
+    assert typewriter.update() == 4
+    assert typewriter.is_complete()
+
+
+def test_incremental_surface_matches_full_reveal(screen):
+    text = "hello brave new world"
+    stepped = Typewriter(max_width=80, chars_per_second=600)
+    stepped.start(text)
+    while not stepped.is_complete():
+        stepped.update()
+
+    full = Typewriter(max_width=80)
+    full.start(text)
+    full.skip()
+
+    assert stepped.get_height() == full.get_height() > 25
+    assert pygame.image.tobytes(stepped.surface, "RGBA") == pygame.image.tobytes(full.surface, "RGBA")
+    assert stepped.surface.get_bounding_rect().width > 0
@@ -0,0 +1,128 @@
+# text_layout.py - 支援中日韓禁則的斷行引擎
+import unicodedata
+from collections import OrderedDict
+
+# 不能出現在行首的字元（行頭禁則）：收尾標點
+NO_LINE_START = set("，。、；：？！）」』】》〉〕］｝’”…‥・ー～ぁぃぅぇぉっゃゅょァィゥェォッャュョ"
+                    ",.;:?!)]}%")
+# 不能出現在行尾的字元（行尾禁則）：開頭標點
+NO_LINE_END = set("（「『【《〈〔［｛‘“([{$")
+
+DEFAULT_LAYOUT_CACHE_SIZE = 256
+
+
+def is_wide(char):
+    """全形字元（中日韓文字、全形標點、emoji）可以在任意字元之間斷行"""
+    return unicodedata.east_asian_width(char) in ("W", "F")
+
+
+def tokenize(paragraph):
+    """切成斷行單位：連續的半形非空白字元（英文單字）、連續空白、單一全形字元"""
+    tokens = []
+    current = ""
+    for char in paragraph:
+        if is_wide(char):
+            if current:
+                tokens.append(current)
+                current = ""
+            tokens.append(char)
+        elif current and current[-1].isspace() != char.isspace():
+            tokens.append(current)
+            current = char
+        else:
+            current += char
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def group_segments(tokens):
+    """套用禁則，把不可分開的單位合併成段落（行首禁則字元黏到前一段，行尾禁則字元黏到下一段）"""
+    segments = []
+    glue_next = False
+    for token in tokens:
+        if token.isspace():
+            segments.append(token)
+            glue_next = False
+            continue
+
+        if segments and not segments[-1].isspace() and (glue_next or token[0] in NO_LINE_START):
+            segments[-1] += token
+        else:
+            segments.append(token)
+        glue_next = token[-1] in NO_LINE_END
+    return segments
+
+
+class TextLayout:
+    """斷行引擎：依字型寬度把文字排成多行，結果依 (文字, 字型鍵, 寬度) 快取"""
+
+    def __init__(self, cache_size=DEFAULT_LAYOUT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def wrap(self, text, font, max_width, font_key):
+        """回傳排好的行（tuple）；font_key 用來區分不同字型/大小的快取"""
+        key = (text, font_key, max_width)
+        lines = self.cache.get(key)
+        if lines is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return lines
+
+        self.misses += 1
+        lines = []
+        for paragraph in text.split("\n"):
+            lines.extend(self.wrap_paragraph(paragraph, font, max_width))
+        lines = tuple(lines)
+
+        self.cache[key] = lines
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return lines
+
+    def wrap_paragraph(self, paragraph, font, max_width):
+        """貪婪斷行：能放進目前這行就放，否則換行（行首行尾的空白會去掉）"""
+        lines = []
+        current = ""
+        for segment in group_segments(tokenize(paragraph)):
+            if segment.isspace():
+                if current:
+                    current += segment
+                continue
+
+            candidate = current + segment
+            if font.size(candidate.rstrip())[0] <= max_width:
+                current = candidate
+                continue
+
+            if current.strip():
+                lines.append(current.rstrip())
+            # 單一段落就比整行還寬（例如很長的英文單字）時逐字硬斷
+            current = ""
+            for char in segment:
+                if current and font.size(current + char)[0] > max_width:
+                    lines.append(current)
+                    current = ""
+                current += char
+
+        if current.strip() or not lines:
+            lines.append(current.rstrip())
+        return lines
+
+    def clear(self):
+        self.cache.clear()
+
+    def get_stats(self):
+        """斷行快取統計"""
+        return {
+            "entries": len(self.cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# 全域斷行引擎實例
+text_layout = TextLayout()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+末世第二餐廳 - 精靈圖預先烘焙工具
+載入地圖、角色選擇和所有角色，把遊戲實際使用的縮放圖片寫入 .cache/sprites
+（使用遊戲執行時讀取的同一個快取和格式）
+
+執行方式:
+    python tools/bake_sprites.py
+    python tools/bake_sprites.py --force --clean
+"""
+
+import os
+import sys
+
+# 必須在匯入 pygame 之前設定，才能在沒有螢幕和音效卡的環境執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import shutil
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pygame
+
+
+def bake_all(force=False, quiet=True):
+    """建立所有會用到精靈圖的元件，讓登錄表把縮放結果寫入磁碟快取"""
+    from sprite_cache import sprite_cache
+    from sprite_registry import sprite_registry
+    from map_manager import MapManager
+    from player import Player
+    from character_selector import CharacterSelector
+
+    if force and os.path.isdir(sprite_cache.cache_dir):
+        shutil.rmtree(sprite_cache.cache_dir)
+        sprite_cache.sources = {}
+
+    pygame.init()
+    screen = pygame.display.set_mode((1024, 768))
+
+    with open(os.devnull, "w") as devnull:
+        output = contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()
+        with output:
+            components = [MapManager(), Player(0, 0), CharacterSelector(screen)]
+            for character in components[-1].characters:
+                components.append(Player(0, 0, character_data=character))
+            for component in components:
+                component.release_sprites()
+
+    return sprite_cache.get_stats(), sprite_registry.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="末世第二餐廳 精靈圖預先烘焙")
+    parser.add_argument("--force", action="store_true", help="清除現有快取後重新烘焙")
+    parser.add_argument("--clean", action="store_true", help="刪除不再對應任何原圖的快取檔案")
+    parser.add_argument("--verbose", action="store_true", help="顯示遊戲本身的輸出")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)  # 素材路徑都是相對於專案根目錄
+    start_time = time.time()
+    cache_stats, registry_stats = bake_all(args.force, quiet=not args.verbose)
+
+    print(f"🎨 烘焙完成: {cache_stats['bakes']} 個新檔案，{cache_stats['hits']} 個已是最新 "
+          f"（共 {cache_stats['variants']} 個變體，{cache_stats['sources']} 張原圖）")
+    print(f"   登錄表用量: {registry_stats['bytes'] / 1024:.0f}KB，耗時 {time.time() - start_time:.2f} 秒")
+
+    if args.clean:
+        from sprite_cache import sprite_cache
+        print(f"🧹 刪除 {sprite_cache.prune()} 個過期的快取檔案")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+末世第二餐廳 - 無頭畫面效能基準測試
+使用 SDL dummy 驅動啟動 Game，逐一執行各場景並記錄每幀 update / render 耗時
+
+執行方式:
+    python tools/benchmark.py --output bench.json
+    python tools/benchmark.py --baseline bench.json --threshold 0.15
+"""
+
+import os
+import sys
+
+# 必須在匯入 pygame 之前設定，才能在沒有螢幕和音效卡的環境執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import json
+import platform
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pygame
+
+# 比較基準時使用的預設指標
+DEFAULT_METRIC = "frame_ms.p95"
+# 小於這個差距（毫秒）的變化視為雜訊
+DEFAULT_MIN_DELTA_MS = 0.05
+
+# 探索場景的安全起點（遠離所有樓層的戰鬥區域）
+SAFE_POSITION = (700, 600)
+MOVE_KEYS = [pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP]
+
+
+def percentile(values, percent):
+    """線性內插的百分位數"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * percent / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    weight = rank - lower
+    return ordered[lower] * (1 - weight) + ordered[upper] * weight
+
+
+def summarize(samples):
+    """把毫秒樣本整理成統計資料"""
+    return {
+        "p50": round(percentile(samples, 50), 4),
+        "p95": round(percentile(samples, 95), 4),
+        "p99": round(percentile(samples, 99), 4),
+        "mean": round(sum(samples) / len(samples), 4) if samples else 0.0,
+        "max": round(max(samples), 4) if samples else 0.0
+    }
+
+
+def press_key(game, key):
+    """模擬按鍵並交給遊戲的事件處理"""
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode=""))
+    game.handle_events()
+
+
+def start_game(game):
+    """從介紹畫面一路進入遊戲"""
+    press_key(game, pygame.K_SPACE)  # 介紹 -> 角色選擇
+    press_key(game, pygame.K_SPACE)  # 確認預設角色
+
+
+# ======= 場景設定 =======
+# 每個場景包含 setup(game) 和每幀呼叫的 drive(game, frame)
+
+def setup_intro(game):
+    pass
+
+
+def setup_character_select(game):
+    press_key(game, pygame.K_SPACE)
+
+
+def make_exploration_setup(floor):
+    def setup(game):
+        start_game(game)
+        game.map_manager.change_floor(floor)
+        game.player.current_floor = floor
+        game.player.set_position(*SAFE_POSITION)
+    return setup
+
+
+def drive_exploration(game, frame):
+    """讓玩家在安全區域繞小正方形走，持續產生移動和動畫"""
+    if game.game_state.current_state == "combat":
+        game.force_end_combat()
+        game.player.set_position(*SAFE_POSITION)
+    if not game.player.is_moving:
+        press_key(game, MOVE_KEYS[(frame // 8) % len(MOVE_KEYS)])
+
+
+def setup_dialogue(game):
+    start_game(game)
+    shop = next(item for item in game.map_manager.interactions[1] if item["type"] == "shop")
+    game.start_shop_interaction(shop)
+
+
+def setup_inventory(game):
+    start_game(game)
+    game.handle_inventory_toggle()
+
+
+def setup_map(game):
+    start_game(game)
+    game.handle_map_toggle()
+
+
+def setup_combat(game):
+    start_game(game)
+    zone = game.map_manager.combat_zones[1][0]
+    game.start_combat_in_zone(zone)
+    # 讓戰鬥持續整個測量期間
+    game.combat_system.current_enemy["hp"] = 10 ** 9
+    game.combat_system.current_enemy["max_hp"] = 10 ** 9
+
+
+def drive_combat(game, frame):
+    """每半秒攻擊一次，包含震動動畫和敵人回合"""
+    game.game_state.player_stats["hp"] = game.game_state.player_stats["max_hp"]
+    if frame % 30 == 0 and game.combat_system.player_turn:
+        press_key(game, pygame.K_1)
+
+
+SCENES = [
+    ("intro", setup_intro, None),
+    ("character_select", setup_character_select, None),
+    ("exploration_floor1", make_exploration_setup(1), drive_exploration),
+    ("exploration_floor2", make_exploration_setup(2), drive_exploration),
+    ("exploration_floor3", make_exploration_setup(3), drive_exploration),
+    ("dialogue", setup_dialogue, None),
+    ("inventory", setup_inventory, None),
+    ("map", setup_map, None),
+    ("combat", setup_combat, drive_combat),
+]
+
+
+def run_scene(setup, drive, frames, warmup):
+    """在全新的 Game 上執行一個場景，回傳每幀耗時（毫秒）"""
+    from main import Game
+
+    game = Game()
+    setup(game)
+
+    update_ms = []
+    render_ms = []
+    frame_ms = []
+    for frame in range(warmup + frames):
+        if drive:
+            drive(game, frame)
+
+        start = time.perf_counter()
+        game.handle_events()
+        game.update()
+        after_update = time.perf_counter()
+        game.render()
+        end = time.perf_counter()
+
+        if frame >= warmup:
+            update_ms.append((after_update - start) * 1000)
+            render_ms.append((end - after_update) * 1000)
+            frame_ms.append((end - start) * 1000)
+
+    return {
+        "frames": frames,
+        "update_ms": summarize(update_ms),
+        "render_ms": summarize(render_ms),
+        "frame_ms": summarize(frame_ms)
+    }
+
+
+def run_benchmarks(scene_names=None, frames=300, warmup=30, quiet=True):
+    """執行所有（或指定的）場景並產生報告"""
+    selected = [scene for scene in SCENES if not scene_names or scene[0] in scene_names]
+
+    os.chdir(ROOT_DIR)  # 素材路徑都是相對於專案根目錄
+    results = {}
+    with open(os.devnull, "w") as devnull:
+        # 遊戲本身大量 print，測量時導向 devnull 避免終端機輸出影響結果
+        output = contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()
+        with output:
+            for name, setup, drive in selected:
+                results[name] = run_scene(setup, drive, frames, warmup)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": frames,
+            "warmup": warmup,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+        },
+        "scenes": results
+    }
+
+
+def get_metric(scene_result, metric):
+    """讀取像 'frame_ms.p95' 這樣的指標"""
+    group, stat = metric.split(".")
+    return scene_result[group][stat]
+
+
+def compare_to_baseline(report, baseline, threshold, metric=DEFAULT_METRIC, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """與基準比較，回傳退步超過門檻的場景列表"""
+    regressions = []
+    for name, scene_result in report["scenes"].items():
+        if name not in baseline.get("scenes", {}):
+            continue
+
+        current = get_metric(scene_result, metric)
+        previous = get_metric(baseline["scenes"][name], metric)
+        if current - previous <= min_delta_ms:
+            continue
+        if previous <= 0 or current > previous * (1 + threshold):
+            regressions.append({
+                "scene": name,
+                "metric": metric,
+                "baseline": previous,
+                "current": current,
+                "change": (current - previous) / previous if previous > 0 else None
+            })
+    return regressions
+
+
+def print_report(report):
+    """印出易讀的摘要表格"""
+    print(f"{'場景':<22}{'update p95':>12}{'render p95':>12}{'frame p50':>12}{'frame p95':>12}{'frame p99':>12}")
+    for name, result in report["scenes"].items():
+        print(f"{name:<22}"
+              f"{result['update_ms']['p95']:>12.3f}"
+              f"{result['render_ms']['p95']:>12.3f}"
+              f"{result['frame_ms']['p50']:>12.3f}"
+              f"{result['frame_ms']['p95']:>12.3f}"
+              f"{result['frame_ms']['p99']:>12.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="末世第二餐廳 無頭效能基準測試")
+    parser.add_argument("--frames", type=int, default=300, help="每個場景測量的幀數")
+    parser.add_argument("--warmup", type=int, default=30, help="每個場景開始測量前的暖機幀數")
+    parser.add_argument("--scenes", help="只執行指定場景（以逗號分隔）")
+    parser.add_argument("--output", help="將 JSON 報告寫入檔案")
+    parser.add_argument("--baseline", help="與先前的 JSON 報告比較")
+    parser.add_argument("--threshold", type=float, default=0.15, help="允許的退步比例（0.15 = 15%%）")
+    parser.add_argument("--metric", default=DEFAULT_METRIC, help="比較用的指標，例如 frame_ms.p95")
+    parser.add_argument("--verbose", action="store_true", help="顯示遊戲本身的輸出")
+    args = parser.parse_args()
+
+    scene_names = args.scenes.split(",") if args.scenes else None
+    report = run_benchmarks(scene_names, args.frames, args.warmup, quiet=not args.verbose)
+
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 報告已寫入: {args.output}")
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.threshold, args.metric)
+        if regressions:
+            print(f"❌ {len(regressions)} 個場景退步超過 {args.threshold * 100:.0f}%:")
+            for regression in regressions:
+                print(f"   {regression['scene']}: {regression['metric']} "
+                      f"{regression['baseline']:.3f}ms → {regression['current']:.3f}ms")
+            return 1
+        print(f"✅ 沒有場景退步超過 {args.threshold * 100:.0f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+末世第二餐廳 - 戰鬥平衡模擬
+用和 combat.py / game_state.py 相同的傷害和升級公式，對每個角色 × 等級 × 敵人
+模擬大量戰鬥（玩家每回合都攻擊、開戰時滿血），回報勝率、回合數和損血分佈
+
+用 NumPy 一次模擬整批戰鬥（每個回合一次向量運算，NumPy 列在 requirements.txt）；
+環境裡沒有 NumPy 時退回純 Python 逐場模擬
+
+執行方式:
+    python tools/combat_balance.py
+    python tools/combat_balance.py --fights 100000 --levels 8 --output balance.json
+    python tools/combat_balance.py --backend python --seed 7
+"""
+
+import os
+import sys
+
+# 必須在匯入 pygame 之前設定，才能在沒有螢幕和音效卡的環境執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import json
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from combat import (PLAYER_DAMAGE_RANGE, CRITICAL_CHANCE, CRITICAL_MULTIPLIER,
+                    ENEMY_DAMAGE_SPREAD)
+from game_state import LEVEL_UP_GAINS
+from rng_service import RNGService
+
+HP_LOSS_BINS = 10  # 損血百分比直方圖的格數（每格 10%）
+
+
+def sample_level_stats(rng, base_hp, base_defense, level):
+    """從 1 級升到 level 級，依 level_up() 的隨機成長算出 (max_hp, defense)"""
+    max_hp, defense = base_hp, base_defense
+    for _ in range(level - 1):
+        max_hp += rng.randint(*LEVEL_UP_GAINS["max_hp"])
+        rng.randint(*LEVEL_UP_GAINS["attack"])  # 攻擊力目前不影響傷害，但照樣抽以維持順序
+        defense += rng.randint(*LEVEL_UP_GAINS["defense"])
+    return max_hp, defense
+
+
+def simulate_python(rng, base_hp, base_defense, level, enemy, fights, max_turns):
+    """逐場模擬，回傳 (是否獲勝, 回合數, 損血) 三個串列"""
+    low, high = PLAYER_DAMAGE_RANGE
+    won, turns, hp_lost = [], [], []
+    for _ in range(fights):
+        max_hp, defense = sample_level_stats(rng, base_hp, base_defense, level)
+        hp = max_hp
+        enemy_hp = enemy["hp"]
+        result = False
+        turn = 0
+        while turn < max_turns:
+            turn += 1
+            damage = max(1, rng.randint(low, high) - enemy["defense"])
+            if rng.random() < CRITICAL_CHANCE:
+                damage = int(damage * CRITICAL_MULTIPLIER)
+            enemy_hp -= damage
+            if enemy_hp <= 0:
+                result = True
+                break
+
+            enemy_damage = rng.randint(enemy["attack"] - ENEMY_DAMAGE_SPREAD,
+                                       enemy["attack"] + ENEMY_DAMAGE_SPREAD)
+            hp -= max(1, enemy_damage - defense)
+            if hp <= 0:
+                break
+        won.append(result)
+        turns.append(turn)
+        hp_lost.append((max_hp - max(hp, 0)) / max_hp)
+    return won, turns, hp_lost
+
+
+def simulate_numpy(rng, base_hp, base_defense, level, enemy, fights, max_turns):
+    """整批模擬：每個回合對所有還沒結束的戰鬥做一次向量運算"""
+    max_hp = np.full(fights, base_hp, dtype=np.int64)
+    defense = np.full(fights, base_defense, dtype=np.int64)
+    if level > 1:
+        low, high = LEVEL_UP_GAINS["max_hp"]
+        max_hp += rng.integers(low, high + 1, size=(fights, level - 1)).sum(axis=1)
+        low, high = LEVEL_UP_GAINS["defense"]
+        defense += rng.integers(low, high + 1, size=(fights, level - 1)).sum(axis=1)
+
+    hp = max_hp.copy()
+    enemy_hp = np.full(fights, enemy["hp"], dtype=np.int64)
+    won = np.zeros(fights, dtype=bool)
+    done = np.zeros(fights, dtype=bool)
+    turns = np.full(fights, max_turns, dtype=np.int64)
+
+    low, high = PLAYER_DAMAGE_RANGE
+    for turn in range(1, max_turns + 1):
+        active = ~done
+        if not active.any():
+            break
+
+        damage = np.maximum(1, rng.integers(low, high + 1, size=fights) - enemy["defense"])
+        critical = rng.random(fights) < CRITICAL_CHANCE
+        damage = np.where(critical, np.floor(damage * CRITICAL_MULTIPLIER).astype(np.int64), damage)
+        enemy_hp = np.where(active, enemy_hp - damage, enemy_hp)
+
+        killed = active & (enemy_hp <= 0)
+        won |= killed
+        turns[killed] = turn
+        done |= killed
+        active &= ~killed
+
+        enemy_damage = rng.integers(enemy["attack"] - ENEMY_DAMAGE_SPREAD,
+                                    enemy["attack"] + ENEMY_DAMAGE_SPREAD + 1, size=fights)
+        hp = np.where(active, hp - np.maximum(1, enemy_damage - defense), hp)
+
+        dead = active & (hp <= 0)
+        turns[dead] = turn
+        done |= dead
+
+    hp_lost = (max_hp - np.maximum(hp, 0)) / max_hp
+    return won.tolist(), turns.tolist(), hp_lost.tolist()
+
+
+def percentile(sorted_values, q):
+    """已排序串列的百分位數（最近排名法）"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def summarize(won, turns, hp_lost):
+    """一格（角色 × 等級 × 敵人）的統計"""
+    fights = len(won)
+    turns_sorted = sorted(turns)
+    # 只統計獲勝的戰鬥：輸掉的戰鬥損血一定是 100%
+    lost_sorted = sorted(loss for loss, result in zip(hp_lost, won) if result)
+
+    histogram = [0] * HP_LOSS_BINS
+    for loss in lost_sorted:
+        histogram[min(HP_LOSS_BINS - 1, int(loss * HP_LOSS_BINS))] += 1
+
+    return {
+        "fights": fights,
+        "win_rate": round(sum(won) / fights, 4) if fights else 0.0,
+        "turns_mean": round(sum(turns) / fights, 2) if fights else 0.0,
+        "turns_p50": percentile(turns_sorted, 50),
+        "turns_p90": percentile(turns_sorted, 90),
+        "hp_loss_p50": round(percentile(lost_sorted, 50), 3),
+        "hp_loss_p90": round(percentile(lost_sorted, 90), 3),
+        "hp_loss_p99": round(percentile(lost_sorted, 99), 3),
+        "hp_loss_histogram": histogram,
+    }
+
+
+def resolve_backend(backend):
+    """auto：有 NumPy 就用向量化版本"""
+    if backend == "auto":
+        return "numpy" if np is not None else "python"
+    if backend == "numpy" and np is None:
+        raise RuntimeError("沒有安裝 NumPy，請改用 --backend python")
+    return backend
+
+
+def load_game_data():
+    """從遊戲程式碼讀取角色、敵人和基礎數值（不重複抄一份）"""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        from character_selector import CHARACTERS
+        from game_state import GameState
+        game_state = GameState()
+    return CHARACTERS, game_state.enemies, game_state.player_stats
+
+
+def run_sweep(characters, enemies, base_stats, levels, fights, seed=0, max_turns=100, backend="auto"):
+    """對每個角色 × 等級 × 敵人模擬 fights 場，回傳報告"""
+    backend = resolve_backend(backend)
+    service = RNGService(seed)
+    if backend == "numpy":
+        rng = service.numpy_stream("balance")
+        simulate = simulate_numpy
+    else:
+        rng = service.stream("balance")
+        simulate = simulate_python
+
+    cells = []
+    start = time.perf_counter()
+    for character in characters:
+        base_hp = character["stats"].get("hp", base_stats["max_hp"])
+        for level in range(1, levels + 1):
+            for enemy in enemies:
+                won, turns, hp_lost = simulate(rng, base_hp, base_stats["defense"], level, enemy,
+                                               fights, max_turns)
+                cell = {"character": character["name"], "level": level, "enemy": enemy["name"]}
+                cell.update(summarize(won, turns, hp_lost))
+                cells.append(cell)
+    elapsed = time.perf_counter() - start
+
+    total = len(cells) * fights
+    return {
+        "backend": backend,
+        "seed": seed,
+        "fights_per_cell": fights,
+        "levels": levels,
+        "max_turns": max_turns,
+        "seconds": round(elapsed, 2),
+        "fights_per_second": round(total / elapsed, 1) if elapsed > 0 else 0.0,
+        "cells": cells,
+    }
+
+
+def print_report(report):
+    cells = report["cells"]
+    enemies = list(dict.fromkeys(cell["enemy"] for cell in cells))
+    characters = list(dict.fromkeys(cell["character"] for cell in cells))
+
+    print("=" * 70)
+    print(f"⚔️ 戰鬥平衡模擬: 每格 {report['fights_per_cell']:,} 場，種子 {report['seed']}，"
+          f"{report['backend']} ({report['fights_per_second']:,.0f} 場/秒)")
+    print("   格式: 勝率 / 平均回合 / 獲勝時損血 p90")
+    for name in characters:
+        print(f"\n👤 {name}")
+        print(f"{'等級':>4}  " + "  ".join(f"{enemy:<20}" for enemy in enemies))
+        rows = {}
+        for cell in cells:
+            if cell["character"] == name:
+                rows.setdefault(cell["level"], {})[cell["enemy"]] = cell
+        for level, row in sorted(rows.items()):
+            columns = []
+            for enemy in enemies:
+                cell = row[enemy]
+                text = f"{cell['win_rate']:>6.1%} / {cell['turns_mean']:>4.1f} / {cell['hp_loss_p90']:>4.0%}"
+                columns.append(f"{text:<20}")
+            print(f"{level:>4}  " + "  ".join(columns))
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="末世第二餐廳 戰鬥平衡模擬")
+    parser.add_argument("--fights", type=int, default=10000, help="每個角色 × 等級 × 敵人模擬的場數")
+    parser.add_argument("--levels", type=int, default=10, help="模擬 1 到幾級")
+    parser.add_argument("--max-turns", type=int, default=100, help="單場最多回合數（超過算沒打贏）")
+    parser.add_argument("--seed", type=int, default=0, help="隨機種子")
+    parser.add_argument("--backend", choices=["auto", "numpy", "python"], default="auto",
+                        help="模擬方式（auto：有 NumPy 就用向量化版本）")
+    parser.add_argument("--output", help="將 JSON 報告寫入檔案")
+    args = parser.parse_args()
+
+    if args.backend != "python" and np is None:
+        if args.backend == "numpy":
+            print("❌ 沒有安裝 NumPy，請改用 --backend python")
+            return 1
+        print("⚠️ 沒有安裝 NumPy，改用純 Python 逐場模擬（較慢，可減少 --fights）")
+
+    os.chdir(ROOT_DIR)  # 素材路徑都是相對於專案根目錄
+    characters, enemies, base_stats = load_game_data()
+    report = run_sweep(characters, enemies, base_stats, args.levels, args.fights,
+                       args.seed, args.max_turns, args.backend)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 報告已寫入: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+末世第二餐廳 - 重播輸入記錄
+用記錄檔裡的隨機種子建立 Game，不限速送入記錄的事件，最後比對遊戲狀態摘要
+
+執行方式:
+    python tools/play_replay.py                       # 重播 .cache/replays/last_session.rpl
+    python tools/play_replay.py bug_report.rpl --render
+    python tools/play_replay.py session.rpl --repeat 5  # 重複重播，量測 tick/秒
+"""
+
+import os
+import sys
+
+# 必須在匯入 pygame 之前設定，才能在沒有螢幕和音效卡的環境執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from replay import DEFAULT_REPLAY_PATH, ReplayLog, run_replay
+
+
+def replay_once(log, render=False, quiet=True):
+    """建立新的 Game 並重播一次，回傳 (摘要, 秒數)"""
+    from main import Game
+
+    with open(os.devnull, "w") as devnull:
+        output = contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()
+        with output:
+            game = Game(seed=log.seed)
+            start = time.perf_counter()
+            digest = run_replay(game, log, render=render)
+            elapsed = time.perf_counter() - start
+    return digest, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="末世第二餐廳 輸入重播")
+    parser.add_argument("path", nargs="?", default=DEFAULT_REPLAY_PATH, help="重播檔路徑（相對於專案根目錄）")
+    parser.add_argument("--render", action="store_true", help="每個 tick 都渲染畫面（量測含渲染的速度）")
+    parser.add_argument("--repeat", type=int, default=1, help="重播次數")
+    parser.add_argument("--verbose", action="store_true", help="顯示遊戲本身的輸出")
+    args = parser.parse_args()
+
+    os.chdir(ROOT_DIR)  # 素材路徑都是相對於專案根目錄
+    try:
+        log = ReplayLog.load(args.path)
+    except (OSError, ValueError) as e:
+        print(f"❌ 無法讀取重播檔 {args.path}: {e}")
+        return 1
+
+    print(f"🎬 {args.path}: 種子 {log.seed}, {len(log.events)} 個事件, {log.end_tick} tick "
+          f"({log.end_tick / log.tick_rate:.1f} 秒遊戲時間)")
+
+    mismatches = 0
+    for run in range(args.repeat):
+        digest, elapsed = replay_once(log, render=args.render, quiet=not args.verbose)
+        rate = log.end_tick / elapsed if elapsed > 0 else 0.0
+        if log.digest is None:
+            status = "⚠️ 記錄檔沒有結尾摘要，無法比對"
+        elif digest == log.digest:
+            status = "✅ 狀態一致"
+        else:
+            status = f"❌ 狀態不一致 (記錄 {log.digest:08x}, 重播 {digest:08x})"
+            mismatches += 1
+        print(f"  第 {run + 1} 次: {elapsed:.2f} 秒, {rate:,.0f} tick/秒  {status}")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
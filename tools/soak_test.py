@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+末世第二餐廳 - 無頭壓力測試（soak test）
+不開視窗、不初始化混音器、不點陣化文字，以最快速度執行 Game.update()，
+用腳本或隨機輸入驅動，回報每秒 tick 數、記憶體成長和卡住的狀態
+
+執行方式:
+    python tools/soak_test.py --ticks 1000000
+    python tools/soak_test.py --policy script --ticks 200000 --output soak.json
+    python tools/soak_test.py --seed 7 --stuck-ticks 30000
+"""
+
+import os
+import sys
+
+# 必須在匯入 pygame 之前設定，才能在沒有螢幕和音效卡的環境執行
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import contextlib
+import gc
+import json
+import random
+import resource
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import pygame
+
+# 隨機輸入的按鍵和權重（不含 F 鍵：那些是除錯開關，會重新載入素材）
+RANDOM_KEYS = [
+    (pygame.K_UP, 8), (pygame.K_DOWN, 8), (pygame.K_LEFT, 8), (pygame.K_RIGHT, 8),
+    (pygame.K_SPACE, 6), (pygame.K_RETURN, 2),
+    (pygame.K_1, 3), (pygame.K_2, 2), (pygame.K_3, 2), (pygame.K_4, 1),
+    (pygame.K_i, 1), (pygame.K_m, 1), (pygame.K_ESCAPE, 1), (pygame.K_r, 2),
+]
+
+# 腳本輸入：進入遊戲後繞圈走、互動、攻擊，結束畫面按 R 重來
+SCRIPT_KEYS = [pygame.K_RIGHT, pygame.K_SPACE, pygame.K_DOWN, pygame.K_1,
+               pygame.K_LEFT, pygame.K_SPACE, pygame.K_UP, pygame.K_1, pygame.K_r]
+
+# 一段時間內應該維持有界的容器
+WATCHES = {
+    "game_state.messages": lambda game: len(game.game_state.messages) if game.game_state else 0,
+    "combat.combat_log": lambda game: len(game.combat_system.combat_log) if game.combat_system else 0,
+    "map.collected_items": lambda game: len(game.map_manager.collected_items) if game.map_manager else 0,
+    "inventory.items": lambda game: len(game.inventory.get_items()) if game.inventory else 0,
+}
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="")
+
+
+class RandomPolicy:
+    """每隔 interval 個 tick 依權重隨機按一個鍵"""
+
+    def __init__(self, seed, interval=6):
+        self.rng = random.Random(seed)
+        self.interval = interval
+        self.keys = [key for key, _ in RANDOM_KEYS]
+        self.weights = [weight for _, weight in RANDOM_KEYS]
+
+    def events(self, game, tick):
+        if tick % self.interval:
+            return None
+        return [key_event(self.rng.choices(self.keys, self.weights)[0])]
+
+
+class ScriptPolicy:
+    """依固定順序循環按鍵；介紹和角色選擇畫面先按空白鍵進入遊戲"""
+
+    def __init__(self, interval=12):
+        self.interval = interval
+        self.step = 0
+
+    def events(self, game, tick):
+        if tick % self.interval:
+            return None
+        if not game.game_started:
+            return [key_event(pygame.K_SPACE)]
+        key = SCRIPT_KEYS[self.step % len(SCRIPT_KEYS)]
+        self.step += 1
+        return [key_event(key)]
+
+
+def get_rss_kb():
+    """目前的常駐記憶體（KB）；沒有 /proc 時退回最大常駐記憶體"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def screen_name(game):
+    """目前所在的畫面，用來統計各畫面的 tick 數"""
+    if game.show_intro:
+        return "intro"
+    if game.show_character_select:
+        return "character_select"
+    if not game.game_started:
+        return "not_started"
+    if game.ui.game_over:
+        return "game_over"
+    if game.ui.game_completed:
+        return "victory"
+    return game.game_state.current_state
+
+
+def describe_state(game):
+    """卡住時回報的狀態描述"""
+    if game.show_intro:
+        return "intro"
+    if game.show_character_select:
+        return "character_select"
+    if not game.game_started:
+        return "not_started"
+    ui = game.ui
+    return (f"{game.game_state.current_state} floor={game.map_manager.current_floor} "
+            f"dialogue={ui.dialogue_active} inventory={ui.show_inventory} map={ui.show_map} "
+            f"game_over={ui.game_over} completed={ui.game_completed}")
+
+
+def progress_signature(game):
+    """遊戲有沒有在前進：畫面、狀態、玩家位置和數值"""
+    signature = (game.show_intro, game.show_character_select, game.game_started)
+    if game.game_started:
+        stats = game.game_state.player_stats
+        signature += (game.game_state.current_state, game.map_manager.current_floor,
+                      game.player.x, game.player.y, stats["hp"], stats["exp"],
+                      game.ui.dialogue_active, game.ui.selected_option,
+                      game.ui.show_inventory, game.ui.show_map)
+    return signature
+
+
+def take_sample(game, tick, elapsed):
+    return {
+        "tick": tick,
+        "seconds": round(elapsed, 2),
+        "rss_kb": get_rss_kb(),
+        "gc_objects": len(gc.get_objects()),
+        "watches": {name: watch(game) for name, watch in WATCHES.items()},
+    }
+
+
+def find_growth(samples, min_growth=100):
+    """後半段樣本持續成長且總成長超過 min_growth 的指標"""
+    if len(samples) < 4:
+        return []
+    tail = samples[len(samples) // 2:]
+    growing = []
+    metrics = [("gc_objects", lambda sample: sample["gc_objects"])]
+    metrics += [(name, lambda sample, name=name: sample["watches"][name]) for name in WATCHES]
+    for name, value in metrics:
+        values = [value(sample) for sample in tail]
+        increasing = all(later >= earlier for earlier, later in zip(values, values[1:]))
+        if increasing and values[-1] - values[0] >= min_growth:
+            growing.append({"metric": name, "from": values[0], "to": values[-1]})
+    return growing
+
+
+def run_soak(ticks, policy, seed=0, sample_every=20000, stuck_ticks=20000, quiet=True):
+    """建立無頭 Game 並執行指定 tick 數，回傳報告"""
+    os.chdir(ROOT_DIR)  # 素材路徑都是相對於專案根目錄
+
+    with open(os.devnull, "w") as devnull:
+        output = contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext()
+        with output:
+            from font_manager import font_manager
+            from sound_manager import sound_manager
+            from main import Game
+
+            sound_manager.set_headless()
+            font_manager.set_headless()
+            game = Game(seed=seed)
+
+            samples = []
+            stuck = []
+            screens = {}
+            last_signature = None
+            last_progress_tick = 0
+            start = time.perf_counter()
+            for tick in range(1, ticks + 1):
+                events = policy.events(game, tick)
+                if events:
+                    game.handle_events(events)
+                game.update()
+
+                screen = screen_name(game)
+                screens[screen] = screens.get(screen, 0) + 1
+
+                signature = progress_signature(game)
+                if signature != last_signature:
+                    last_signature = signature
+                    last_progress_tick = tick
+                elif tick - last_progress_tick == stuck_ticks:
+                    stuck.append({"tick": tick, "since": last_progress_tick, "state": describe_state(game)})
+
+                if tick % sample_every == 0 or tick == ticks:
+                    samples.append(take_sample(game, tick, time.perf_counter() - start))
+            elapsed = time.perf_counter() - start
+
+    first, last = samples[0], samples[-1]
+    return {
+        "ticks": ticks,
+        "seed": seed,
+        "seconds": round(elapsed, 2),
+        "ticks_per_second": round(ticks / elapsed, 1) if elapsed > 0 else 0.0,
+        "game_seconds": round(ticks / game.SIM_HZ, 1),
+        "rss_growth_kb": last["rss_kb"] - first["rss_kb"],
+        "screens": screens,
+        "samples": samples,
+        "growing": find_growth(samples),
+        "stuck": stuck,
+    }
+
+
+def print_report(report):
+    print("=" * 70)
+    print(f"🧪 壓力測試: {report['ticks']:,} tick（遊戲時間 {report['game_seconds']:,} 秒），種子 {report['seed']}")
+    print(f"⏱️ 耗時 {report['seconds']} 秒，{report['ticks_per_second']:,} tick/秒")
+    print(f"💾 常駐記憶體成長: {report['rss_growth_kb']:,} KB")
+    print("🗺️ 各畫面 tick 數: " + ", ".join(f"{name} {count:,}" for name, count in
+                                        sorted(report["screens"].items(), key=lambda item: -item[1])))
+    print(f"{'tick':>10} {'RSS(KB)':>10} {'GC物件':>10}  " + "  ".join(WATCHES))
+    for sample in report["samples"]:
+        watches = "  ".join(f"{sample['watches'][name]:>{len(name)}}" for name in WATCHES)
+        print(f"{sample['tick']:>10,} {sample['rss_kb']:>10,} {sample['gc_objects']:>10,}  {watches}")
+    for growth in report["growing"]:
+        print(f"⚠️ 持續成長: {growth['metric']} {growth['from']:,} -> {growth['to']:,}")
+    for entry in report["stuck"]:
+        print(f"⚠️ 卡住: tick {entry['since']:,} 起沒有進展 ({entry['state']})")
+    if not report["growing"] and not report["stuck"]:
+        print("✅ 沒有發現持續成長或卡住的狀態")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="末世第二餐廳 無頭壓力測試")
+    parser.add_argument("--ticks", type=int, default=1000000, help="執行的模擬 tick 數")
+    parser.add_argument("--policy", choices=["random", "script"], default="random", help="輸入方式")
+    parser.add_argument("--seed", type=int, default=0, help="遊戲和隨機輸入的種子")
+    parser.add_argument("--interval", type=int, default=6, help="每隔幾個 tick 按一次鍵")
+    parser.add_argument("--sample-every", type=int, default=20000, help="每隔幾個 tick 取樣一次記憶體")
+    parser.add_argument("--stuck-ticks", type=int, default=20000, help="多少 tick 沒有進展視為卡住")
+    parser.add_argument("--output", help="將 JSON 報告寫入檔案")
+    parser.add_argument("--verbose", action="store_true", help="顯示遊戲本身的輸出")
+    args = parser.parse_args()
+
+    if args.policy == "random":
+        policy = RandomPolicy(args.seed, args.interval)
+    else:
+        policy = ScriptPolicy(args.interval)
+
+    report = run_soak(args.ticks, policy, args.seed, args.sample_every, args.stuck_ticks, quiet=not args.verbose)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"📊 報告已寫入: {args.output}")
+
+    return 1 if report["growing"] or report["stuck"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# typewriter.py - 打字機效果的對話文字
+import pygame
+from font_manager import font_manager
+
+# 🆕 預設每秒顯示的字數
+DEFAULT_CHARS_PER_SECOND = 30
+
+
+class Typewriter:
+    """逐字顯示文字：保留一張離屏 Surface，每次只把新出現的字畫上去
+
+    update() 每個模擬 tick 呼叫一次（tick_rate 次/秒），
+    所以一行 200 字的對話每幀只需要處理新出現的幾個字。
+    """
+
+    def __init__(self, size=24, color=(255, 255, 255), max_width=600, line_height=25,
+                 chars_per_second=DEFAULT_CHARS_PER_SECOND, tick_rate=60):
+        self.size = size
+        self.color = color
+        self.max_width = max_width
+        self.line_height = line_height
+        self.chars_per_second = chars_per_second
+        self.tick_rate = tick_rate
+
+        self.text = ""
+        self.lines = ()
+        self.surface = None
+        self.total = 0       # 總字數（不含換行）
+        self.revealed = 0    # 已顯示的字數
+        self.progress = 0.0  # 累計應顯示的字數（可以有小數）
+
+        # 下一個字的位置
+        self.line_index = 0
+        self.char_index = 0
+        self.pen_x = 0
+
+    def start(self, text):
+        """開始顯示新的文字"""
+        self.text = text
+        self.lines = font_manager.wrap_text(text, self.size, self.max_width)
+        self.surface = pygame.Surface((self.max_width, max(1, len(self.lines)) * self.line_height), pygame.SRCALPHA)
+        self.total = sum(len(line) for line in self.lines)
+        self.revealed = 0
+        self.progress = 0.0
+        self.line_index = 0
+        self.char_index = 0
+        self.pen_x = 0
+
+    def update(self):
+        """前進一個 tick，回傳這次新顯示的字數"""
+        if self.is_complete():
+            return 0
+        if self.chars_per_second <= 0:
+            return self.skip()
+        self.progress += self.chars_per_second / self.tick_rate
+        return self.reveal_to(int(self.progress))
+
+    def skip(self):
+        """立即顯示全部文字"""
+        return self.reveal_to(self.total)
+
+    def is_complete(self):
+        return self.revealed >= self.total
+
+    def reveal_to(self, count):
+        """把字畫到離屏 Surface 上直到已顯示 count 個字"""
+        count = min(count, self.total)
+        new_chars = 0
+        while self.revealed < count:
+            line = self.lines[self.line_index]
+            if self.char_index >= len(line):
+                self.line_index += 1
+                self.char_index = 0
+                self.pen_x = 0
+                continue
+
+            char = line[self.char_index]
+            if self.char_index > 0:
+                self.pen_x += font_manager.get_kerning(line[self.char_index - 1], char, self.size)
+            if not char.isspace():
+                glyph = font_manager.render_text(char, self.size, self.color)
+                # 離屏 Surface 是透明的，用 MAX 混合保留原本的 alpha
+                self.surface.blit(glyph, (self.pen_x, self.line_index * self.line_height),
+                                  special_flags=pygame.BLEND_RGBA_MAX)
+            self.pen_x += font_manager.get_text_size(char, self.size)[0]
+
+            self.char_index += 1
+            self.revealed += 1
+            new_chars += 1
+        self.progress = max(self.progress, float(self.revealed))
+        return new_chars
+
+    def get_height(self):
+        return len(self.lines) * self.line_height
+
+    def draw(self, screen, position):
+        if self.surface is not None:
+            screen.blit(self.surface, position)
@@ -1,6 +1,13 @@
 import pygame
 from font_manager import font_manager
 from sound_manager import sound_manager  # 🆕 導入音效管理器
+from hud_widgets import HudLayer, HudWidget, TextWidget, BarWidget
+from typewriter import Typewriter
+from scheduler import scheduler
+from dialogue_graph import dialogue_graph, DialogueContext
+
+# 🆕 記在 UI 上的對話旗標（其餘旗標在 GameState.flags）
+UI_DIALOGUE_FLAGS = ("has_keycard", "has_antidote")
 
 class UI:
     def __init__(self, screen):
@@ -19,13 +26,22 @@ class UI:
         self.dialogue_data = None
         self.dialogue_text = ""
         self.dialogue_options = []
+        self.dialogue_option_ids = []  # 🆕 與 dialogue_options 對應的選項 id
+        self.dialogue_node_key = None  # 🆕 目前的對話節點（對話 id/節點 id）
+        self.dialogue_name = ""
         self.selected_option = 0
         
         # 對話框設定
         self.dialogue_box_height = 150
         self.dialogue_box_y = self.screen_height - self.dialogue_box_height - 10
         
-        # 訊息顯示
+        # 🆕 打字機效果：對話文字逐字顯示（每秒字數可調整，0 表示立即顯示）
+        self.dialogue_chars_per_second = 30
+        self.typewriter = Typewriter(size=24, max_width=self.screen_width - 40,
+                                     chars_per_second=self.dialogue_chars_per_second)
+        
+        # 訊息顯示（🆕 由全域排程器倒數）
+        self.message_countdown = None
         self.message_display_time = 0
         self.current_message = ""
         
@@ -43,6 +59,12 @@ class UI:
         self.player_reference = None
         self.inventory_reference = None
         self.game_state_reference = None  # 添加遊戲狀態參考
+        
+        # 🆕 髒矩形追蹤
+        self.last_dirty_signature = None
+        
+        # 🆕 保留模式 HUD：綁定的值沒變就不重新渲染文字
+        self.hud = self.create_hud_widgets()
     
     def set_player_reference(self, player):
         """設定玩家物件參考，用於修改位置"""
@@ -118,167 +140,54 @@ class UI:
         elif interaction_data["type"] == "npc":
             self.setup_npc_dialogue(interaction_data)
         
+        self.typewriter.chars_per_second = self.dialogue_chars_per_second
+        self.typewriter.start(self.dialogue_text)
+        
         print(f"對話開始: {interaction_data['name']}")
     
     def setup_shop_dialogue(self, shop_data):
-        shop_name = shop_data["name"]
-        
-        if shop_data["id"] == "A":  # 7-11
-            self.dialogue_text = "歡迎來到7-11！雖然外面很危險，但這裡還算安全。需要什麼嗎？"
-            self.dialogue_options = [
-                "購買醫療用品",
-                "詢問情況",
-                "離開"
-            ]
-        elif shop_data["id"] == "B":  # Subway
-            self.dialogue_text = "Subway已經沒有新鮮食材了，但還有一些罐頭..."
-            self.dialogue_options = [
-                "購買罐頭食品",
-                "詢問逃生路線",
-                "離開"
-            ]
-        elif shop_data["id"] == "C":  # 茶壜
-            self.dialogue_text = "茶壜的飲料機還在運作，但店員已經不見了..."
-            self.dialogue_options = [
-                "搜尋飲料",
-                "查看櫃台",
-                "離開"
-            ]
-        elif shop_data["id"] == "L":  # 咖啡廳
-            if self.has_keycard:
-                self.dialogue_text = "你使用鑰匙卡進入了秘密區域，這裡可能有解藥..."
-                self.dialogue_options = [
-                    "深入搜查",
-                    "查看實驗設備",
-                    "離開"
-                ]
-            else:
-                self.dialogue_text = "這裡需要特殊的鑰匙卡才能進入深處..."
-                self.dialogue_options = [
-                    "仔細搜查",
-                    "查看櫃台",
-                    "離開"
-                ]
-        else:
-            self.dialogue_text = f"這是{shop_name}，看起來已經荒廢了..."
-            self.dialogue_options = [
-                "搜尋物品",
-                "查看周圍",
-                "離開"
-            ]
-        
-        self.selected_option = 0
-        print(f"🏪 商店對話設定完成: {shop_name}, 選項數: {len(self.dialogue_options)}")
+        self.open_dialogue_graph(f"shop:{shop_data['id']}", "shop:default", shop_data)
+        print(f"🏪 商店對話設定完成: {shop_data['name']}, 選項數: {len(self.dialogue_options)}")
     
     def setup_npc_dialogue(self, npc_data):
-        npc_id = npc_data["id"]
-
-        game_state = self.get_game_state()
-        
-        if npc_id == "npc1":  # 驚慌學生
-            self.dialogue_text = "救命！外面到處都是殭屍！我看到研究生們往樓上跑了！"
-            self.dialogue_options = [
-                "冷靜一點，告訴我更多",
-                "樓上有什麼？",
-                "離開"
-            ]
-        elif npc_id == "npc2":  # 受傷職員
-            self.dialogue_text = "我被咬了...但還沒完全感染。聽說三樓有解藥..."
-            self.dialogue_options = [
-                "解藥在哪裡？",
-                "你還好嗎？",
-                "給予醫療用品",
-                "離開"
-            ]
-        elif npc_id == "npc3":  # 神秘研究員
-            self.dialogue_text = "你也在找解藥嗎？需要特殊鑰匙卡才能進入實驗室..."
-            self.dialogue_options = [
-                "鑰匙卡在哪？",
-                "實驗室在哪裡？",
-                "我可以幫你什麼？",
-                "離開"
-            ]
-        
-        elif npc_id == "npc4":  # 神秘研究員（三樓第一個NPC）
-            if self.has_antidote:
-                self.dialogue_text = "太好了！你已經有解藥了，現在可以拯救所有人！"
-                self.dialogue_options = [
-                    "如何使用解藥？",
-                    "還有其他倖存者嗎？",
-                    "離開"
-                ]
-            else:
-                # 🔧 修改：需要更高的條件才能獲得解藥提示
-                if self.has_keycard and game_state.player_stats["level"] >= 3:
-                    self.dialogue_text = "你有鑰匙卡了！但解藥很危險，需要更高的等級才能安全使用..."
-                    self.dialogue_options = [
-                        "我需要多少等級？",
-                        "如何提升等級？",
-                        "我已經準備好了",
-                        "離開"
-                    ]
-                elif self.has_keycard:
-                    self.dialogue_text = "你有鑰匙卡了，但你還不夠強。繼續積累經驗吧..."
-                    self.dialogue_options = [
-                        "我需要多強？",
-                        "如何變強？",
-                        "先去訓練",
-                        "離開"
-                    ]
-                else:
-                    self.dialogue_text = "你找到了研究室，但需要特殊鑰匙卡才能進入核心區域..."
-                    self.dialogue_options = [
-                        "鑰匙卡在哪？",
-                        "我可以幫你什麼？",
-                        "離開"
-                    ]
-
-        # 同時找到 npc_id == "npc5" 的部分（如果有的話），或者新增：
-        elif npc_id == "npc5":  # 最後的研究者（三樓第二個NPC）
-            if self.has_antidote:
-                self.dialogue_text = "太好了！你已經有解藥了，現在可以拯救所有人！"
-                self.dialogue_options = [
-                    "如何使用解藥？",
-                    "還有其他倖存者嗎？",
-                    "離開"
-                ]
-            else:
-                # 🆕 這個NPC專門負責給予解藥
-                if self.has_keycard and game_state.player_stats["level"] >= 4:
-                    self.dialogue_text = "你找到了！而且你已經夠強了！解藥就在這裡，但要小心..."
-                    self.dialogue_options = [
-                        "拿取解藥",
-                        "詢問使用方法",
-                        "我還需要準備什麼？",
-                        "離開"
-                    ]
-                elif self.has_keycard:
-                    self.dialogue_text = "你有鑰匙卡了，但你還不夠強。解藥很危險，需要等級4以上..."
-                    self.dialogue_options = [
-                        "我需要多少等級？",
-                        "如何提升等級？",
-                        "先去訓練",
-                        "離開"
-                    ]
-                else:
-                    self.dialogue_text = "我是最後的研究者...解藥就在這裡，但需要鑰匙卡..."
-                    self.dialogue_options = [
-                        "鑰匙卡在哪？",
-                        "實驗室在哪裡？",
-                        "我可以幫你什麼？",
-                        "離開"
-                    ]
-        else:
-            # 🔧 修復：為其他未定義的NPC提供預設對話
-            self.dialogue_text = f"這是{npc_data.get('name', '神秘人物')}..."
-            self.dialogue_options = [
-                "詢問情況",
-                "尋求幫助",
-                "離開"
-            ]
-        
+        self.open_dialogue_graph(f"npc:{npc_data['id']}", "npc:default", npc_data)
+    
+    def open_dialogue_graph(self, dialogue_id, default_id, interaction_data):
+        """🆕 從對話圖（assets/data/dialogues.json）選出起始節點"""
+        if not dialogue_graph.has_dialogue(dialogue_id):
+            dialogue_id = default_id
+        self.dialogue_name = interaction_data.get("name") or dialogue_graph.get_name(dialogue_id)
+        self.enter_dialogue_node(dialogue_graph.enter(dialogue_id, self.create_dialogue_context()))
+    
+    def enter_dialogue_node(self, node_key):
+        """🆕 顯示對話節點的文字和選項；沒有節點時結束對話"""
+        node = dialogue_graph.get_node(node_key) if node_key else None
+        if node is None:
+            self.end_dialogue()
+            return
+        self.dialogue_node_key = node_key
+        self.dialogue_text = node.text(self.create_dialogue_context())
+        self.dialogue_option_ids = [option_id for option_id, _ in node.options]
+        self.dialogue_options = [text for _, text in node.options]
         self.selected_option = 0
     
+    def create_dialogue_context(self, option=""):
+        return DialogueContext(self, self.get_game_state(), self.get_inventory(),
+                               name=self.dialogue_name, option=option)
+    
+    def get_dialogue_flag(self, name):
+        """🆕 對話條件用的旗標：鑰匙卡和解藥記在 UI 上，其他記在 GameState.flags"""
+        if name in UI_DIALOGUE_FLAGS:
+            return getattr(self, name)
+        flags = getattr(self.get_game_state(), "flags", {})
+        return flags.get(name, False)
+    
+    def set_dialogue_flag(self, name, value=True):
+        if name in UI_DIALOGUE_FLAGS:
+            setattr(self, name, value)
+        else:
+            self.get_game_state().flags[name] = value
+    
     def select_dialogue_option(self, option_index):
         if 0 <= option_index < len(self.dialogue_options):
             self.selected_option = option_index
@@ -286,249 +195,22 @@ class UI:
             print(f"選擇選項 {option_index + 1}: {selected_text}")
             self.execute_dialogue_choice()
     
-    def check_has_medical_item(self, inventory):
-        """檢查背包中是否有醫療用品"""
-        if hasattr(inventory, 'get_items'):
-            items = inventory.get_items()
-            for item in items:
-                if "醫療" in item.get('name', '') or "藥" in item.get('name', '') or "治療" in item.get('name', ''):
-                    return item.get('quantity', 0) > 0
-        return False
-    
-    def consume_medical_item(self, inventory):
-        """消耗一個醫療用品"""
-        if hasattr(inventory, 'get_items') and hasattr(inventory, 'remove_item'):
-            items = inventory.get_items()
-            for item in items:
-                if "醫療" in item.get('name', '') or "藥" in item.get('name', '') or "治療" in item.get('name', ''):
-                    if item.get('quantity', 0) > 0:
-                        inventory.remove_item(item['name'], 1)
-                        print(f"消耗了 {item['name']}")
-                        return True
-        return False
-    
     def execute_dialogue_choice(self):
-        if not self.dialogue_data:
+        """🆕 依 (節點, 選項 id) 查分派表執行選項的動作"""
+        if not self.dialogue_data or not self.dialogue_option_ids:
             return
         
+        option_id = self.dialogue_option_ids[self.selected_option]
         option_text = self.dialogue_options[self.selected_option]
         print(f"執行選項: {option_text}")
         
-        # 修復：使用真正的遊戲狀態和背包參考
-        game_state = self.get_game_state()
-        inventory = self.get_inventory()
-        
-        # 除錯：顯示當前狀態
-        print(f"🔍 當前玩家狀態 - HP: {game_state.player_stats['hp']}, Level: {game_state.player_stats['level']}, EXP: {game_state.player_stats['exp']}")
-        
-        # 根據選擇執行相應行動
-        if "購買醫療用品" in option_text:
-            if game_state.player_stats["hp"] < game_state.player_stats["max_hp"]:
-                game_state.player_stats["hp"] = min(
-                    game_state.player_stats["max_hp"],
-                    game_state.player_stats["hp"] + 30
-                )
-                game_state.add_exp(10)
-                self.show_message("購買成功！HP +30, EXP +10")
-                print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            else:
-                self.show_message("你的血量已滿！")
-            self.end_dialogue()
-            
-        elif "購買罐頭食品" in option_text:
-            game_state.player_stats["hp"] = min(
-                game_state.player_stats["max_hp"],
-                game_state.player_stats["hp"] + 20
-            )
-            game_state.add_exp(5)
-            self.show_message("食物補充！HP +20, EXP +5")
-            print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "搜尋飲料" in option_text:
-            game_state.player_stats["hp"] = min(
-                game_state.player_stats["max_hp"],
-                game_state.player_stats["hp"] + 15
-            )
-            game_state.add_exp(8)
-            self.show_message("找到能量飲料！HP +15, EXP +8")
-            print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "深入搜查" in option_text and self.has_keycard:
-            # 🔧 修復：不再直接觸發勝利，改為劇情推進
-            game_state.add_exp(30)
-            self.show_message("你在咖啡廳深處發現了一些重要研究資料！(EXP +30)")
-            print(f"✅ 深入搜查咖啡廳，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            
-            # 🆕 根據等級給予不同的劇情反饋
-            if game_state.player_stats["level"] >= 3:
-                game_state.add_exp(20)
-                self.show_message("你的等級足夠高，理解了這些研究的重要性！額外 EXP +20")
-                print(f"✅ 高等級額外獎勵 - EXP: {game_state.player_stats['exp']}")
-            
-            # 🆕 提示玩家可能需要找到真正的解藥位置
-            self.show_message("研究資料顯示：真正的解藥可能在三樓的研究員那裡...")
-            self.end_dialogue()
-            
-        elif "仔細搜查" in option_text or "搜查" in option_text or "搜尋物品" in option_text:
-            import random
-            if random.random() < 0.3:  # 30% 機率找到鑰匙卡
-                if not self.has_keycard:
-                    self.has_keycard = True
-                    game_state.add_exp(50)
-                    self.show_message("找到了鑰匙卡！這應該能開啟特殊區域！EXP +50")
-                    print(f"✅ 找到鑰匙卡，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-                else:
-                    game_state.add_exp(15)
-                    self.show_message("找到了一些有用的物品！EXP +15")
-                    print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            else:
-                game_state.add_exp(10)
-                self.show_message("搜查完畢，找到了一些小物品。EXP +10")
-                print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "拿取解藥" in option_text:
-            # 🔧 提高獲得解藥的門檻
-            if game_state.player_stats["level"] >= 4:  # 需要等級4以上
-                self.has_antidote = True
-                game_state.add_exp(100)
-                game_state.level_up()
-                self.show_message("成功取得解藥！等級提升！")
-                print(f"✅ 取得解藥，經驗值增加後 - Level: {game_state.player_stats['level']}, EXP: {game_state.player_stats['exp']}")
-                self.check_victory_condition(game_state)
-            else:
-                game_state.damage_player(20)
-                self.show_message(f"等級不足！需要等級4以上！受到傷害！HP -20 (目前等級: {game_state.player_stats['level']})")
-                self.check_game_over(game_state)
-            self.end_dialogue()
-            
-        elif "離開" in option_text:
-            self.end_dialogue()
-            
-        elif "冷靜一點" in option_text:
-            game_state.add_exp(5)
-            self.show_message("學生: 我看到他們拿著什麼東西往樓上跑... (EXP +5)")
-            print(f"✅ 對話經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "樓上有什麼" in option_text:
-            game_state.add_exp(5)
-            self.show_message("學生: 聽說研究生們在三樓做實驗... (EXP +5)")
-            print(f"✅ 對話經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "解藥在哪" in option_text:
-            game_state.add_exp(10)
-            self.show_message("職員: 三樓...咖啡廳附近...快去... (EXP +10)")
-            print(f"✅ 對話經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "你還好嗎" in option_text:
-            game_state.add_exp(5)
-            self.show_message("職員: 還撐得住...你快去找解藥... (EXP +5)")
-            print(f"✅ 對話經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "給予醫療用品" in option_text:
-            has_medical_item = self.check_has_medical_item(inventory)
-            
-            if has_medical_item:
-                self.consume_medical_item(inventory)
-                game_state.add_exp(25)
-                self.show_message("你給了職員醫療用品！EXP +25")
-                print(f"✅ 幫助他人，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-                
-                # 額外對話：職員感謝並提供線索
-                self.show_message("職員: 謝謝你...三樓咖啡廳附近有秘密實驗室...")
-                
-                # 給予額外獎勵（線索相關的經驗值）
-                game_state.add_exp(15)
-                self.show_message("獲得重要線索！額外 EXP +15")
-                print(f"✅ 獲得線索，總經驗值 - EXP: {game_state.player_stats['exp']}")
-            else:
-                self.show_message("你沒有醫療用品可以給予！先去商店購買一些吧。")
-            self.end_dialogue()
-            
-        elif "鑰匙卡在哪" in option_text:
-            game_state.add_exp(15)
-            self.show_message("研究員: 應該在二樓的某個商店裡... (EXP +15)")
-            print(f"✅ 獲得線索，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            if self.player_reference:
-                self.player_reference.x = 300
-                self.player_reference.y = 150
-                self.show_message("研究員指引你到2樓搜尋！")
-            self.end_dialogue()
-            
-        elif "實驗室在哪裡" in option_text:
-            game_state.add_exp(15)
-            self.show_message("研究員: 三樓需要鑰匙卡才能進入... (EXP +15)")
-            print(f"✅ 獲得資訊，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "我可以幫你什麼" in option_text:
-            if game_state.player_stats["level"] >= 2:
-                game_state.add_exp(30)
-                self.has_keycard = True
-                self.show_message("研究員感謝你的幫助，給了你鑰匙卡！EXP +30")
-                print(f"✅ 幫助成功，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            else:
-                game_state.add_exp(10)
-                self.show_message("研究員: 你還太弱了，先去提升實力吧... (EXP +10)")
-                print(f"✅ 經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "詢問使用方法" in option_text:
-            game_state.add_exp(20)
-            self.show_message("研究者: 直接使用就行了，它會拯救所有人... (EXP +20)")
-            print(f"✅ 學習知識，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "我需要多少等級" in option_text:
-            game_state.add_exp(10)
-            self.show_message("研究者: 至少需要等級4，解藥對低等級者有危險... (EXP +10)")
-            print(f"✅ 獲得重要資訊，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-
-        elif "如何提升等級" in option_text:
-            game_state.add_exp(15)
-            self.show_message("研究者: 多與人對話、搜查物品、完成任務都能獲得經驗... (EXP +15)")
-            print(f"✅ 學習提升方法，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-
-        elif "先去訓練" in option_text:
-            game_state.add_exp(5)
-            self.show_message("研究者: 明智的選擇，去積累更多經驗再回來吧... (EXP +5)")
-            print(f"✅ 明智選擇，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-
-        elif "我還需要準備什麼" in option_text:
-            game_state.add_exp(20)
-            self.show_message("研究者: 你已經準備充分了！解藥在前方等著你... (EXP +20)")
-            print(f"✅ 獲得鼓勵，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
-            self.end_dialogue()
-            
-        elif "如何使用解藥" in option_text:
-            if self.has_antidote:
-                self.show_message("研究者: 在建築物頂樓使用，它會擴散到整個區域！")
-                if self.player_reference:
-                    self.player_reference.x = 500
-                    self.player_reference.y = 50
-                    self.show_message("你被帶到了頂樓！準備拯救所有人！")
-                self.check_victory_condition(game_state)
-            self.end_dialogue()
-            
+        context = self.create_dialogue_context(option_text)
+        next_key = dialogue_graph.choose(self.dialogue_node_key, option_id, context)
+        if next_key and self.dialogue_active:
+            self.enter_dialogue_node(next_key)
+            self.typewriter.start(self.dialogue_text)
         else:
-            # 其他選項也結束對話
-            if "離開" in option_text:
-                self.show_message("你離開了對話。")
-            else:
-                game_state.add_exp(2)
-                self.show_message(f"你選擇了：{option_text} (EXP +2)")
-                print(f"✅ 其他選項，經驗值增加後 - EXP: {game_state.player_stats['exp']}")
             self.end_dialogue()
-
     
     def check_level_up(self, game_state):
         """檢查是否升級 - 移除，改用遊戲狀態的升級系統"""
@@ -562,6 +244,8 @@ class UI:
         self.dialogue_data = None
         self.dialogue_text = ""
         self.dialogue_options = []
+        self.dialogue_option_ids = []
+        self.dialogue_node_key = None
         self.selected_option = 0
     
     def continue_dialogue(self):
@@ -569,6 +253,23 @@ class UI:
             print("繼續對話")
             self.end_dialogue()
     
+    def update_dialogue(self):
+        """🆕 每個模擬 tick 推進打字機效果，有新字出現時播放（已節流的）嗶嗶聲"""
+        if self.dialogue_active and self.typewriter.update():
+            sound_manager.play_sfx("dialogue_beep")
+    
+    def is_dialogue_revealing(self):
+        """🆕 對話文字是否還在逐字顯示中"""
+        return self.dialogue_active and not self.typewriter.is_complete()
+    
+    def skip_dialogue_reveal(self):
+        """🆕 立即顯示全部對話文字"""
+        self.typewriter.skip()
+    
+    def is_animating(self):
+        """🆕 閒置節能：訊息倒數或對話逐字顯示中"""
+        return self.message_display_time > 0 or self.is_dialogue_revealing()
+    
     def show_message(self, message):
         self.current_message = message
         self.message_display_time = 180  # 3秒 (60fps * 3)
@@ -594,9 +295,6 @@ class UI:
         
         if self.show_map:
             self.render_mini_map()
-        
-        if self.message_display_time > 0:
-            self.message_display_time -= 1
     
     def render_game_over(self):
         """渲染遊戲結束畫面"""
@@ -632,118 +330,147 @@ class UI:
         restart_rect = restart_text.get_rect(center=(self.screen_width//2, self.screen_height//2 + 50))
         self.screen.blit(restart_text, restart_rect)
     
-    def update_messages(self):
-        """更新訊息顯示"""
-        if self.message_display_time > 0:
-            self.message_display_time -= 1
+    def get_dirty_rects(self, game_state, player, inventory):
+        """🆕 回報本幀有變化的區域 - UI內容改變時整個畫面都要更新"""
+        stats = game_state.player_stats
+        messages = game_state.get_current_messages() if hasattr(game_state, 'get_current_messages') else []
+        items = inventory.get_items() if self.show_inventory and hasattr(inventory, 'get_items') else []
+        signature = (
+            stats["hp"], stats["max_hp"], stats["level"], stats["exp"],
+            player.get_character_name(),
+            sound_manager.is_music_enabled, sound_manager.is_sfx_enabled,
+            sound_manager.music_volume, sound_manager.sfx_volume,
+            self.has_keycard, self.has_antidote, self.game_over, self.game_completed,
+            self.dialogue_active, self.dialogue_text, self.typewriter.revealed,
+            tuple(self.dialogue_options), self.selected_option,
+            self.show_inventory, tuple((item["name"], item.get("quantity", 1)) for item in items),
+            self.show_map, self.current_message, self.message_display_time > 0, tuple(messages)
+        )
+        if signature == self.last_dirty_signature:
+            return []
+        
+        self.last_dirty_signature = signature
+        return [self.screen.get_rect()]
 
-    def render_hud(self, game_state, player):
-        # 血量條
-        hp_ratio = game_state.player_stats["hp"] / game_state.player_stats["max_hp"]
-        hp_bar_width = 200
-        hp_bar_height = 20
-        
-        # 血量條背景
-        hp_bg_rect = pygame.Rect(10, self.screen_height - 40, hp_bar_width, hp_bar_height)
-        pygame.draw.rect(self.screen, (100, 100, 100), hp_bg_rect)
-        
-        # 血量條
-        hp_rect = pygame.Rect(10, self.screen_height - 40, hp_bar_width * hp_ratio, hp_bar_height)
-        hp_color = (255, 0, 0) if hp_ratio < 0.3 else (255, 255, 0) if hp_ratio < 0.6 else (0, 255, 0)
-        pygame.draw.rect(self.screen, hp_color, hp_rect)
-        
-        # 血量文字
-        hp_text = f"HP: {game_state.player_stats['hp']}/{game_state.player_stats['max_hp']}"
-        hp_surface = font_manager.render_text(hp_text, 18, (255, 255, 255))
-        self.screen.blit(hp_surface, (220, self.screen_height - 35))
+    @property
+    def message_display_time(self):
+        """🆕 訊息剩餘顯示 tick 數"""
+        return self.message_countdown.remaining if self.message_countdown else 0
+
+    @message_display_time.setter
+    def message_display_time(self, ticks):
+        if self.message_countdown:
+            self.message_countdown.cancel()
+        self.message_countdown = scheduler.call_later(ticks) if ticks > 0 else None
+
+    def create_hud_widgets(self):
+        """🆕 建立 HUD 元件，每個元件的綁定函數接收 (game_state, player)"""
+        hud = HudLayer()
+        bottom = self.screen_height
+        
+        # 血量條和血量文字
+        hud.add(BarWidget(pygame.Rect(10, bottom - 40, 200, 20),
+                          lambda game_state, player: (game_state.player_stats["hp"], game_state.player_stats["max_hp"]),
+                          (100, 100, 100),
+                          lambda ratio: (255, 0, 0) if ratio < 0.3 else (255, 255, 0) if ratio < 0.6 else (0, 255, 0)))
+        hud.add(TextWidget((220, bottom - 35),
+                           lambda game_state, player: (f"HP: {game_state.player_stats['hp']}/{game_state.player_stats['max_hp']}", (255, 255, 255)),
+                           18))
         
         # 等級和經驗值 - 修復：確保正確顯示
-        level_text = f"Lv.{game_state.player_stats['level']}"
-        level_surface = font_manager.render_text(level_text, 18, (255, 255, 255))
-        self.screen.blit(level_surface, (10, self.screen_height - 65))
-        
-        required_exp = game_state.player_stats['level'] * 100
-        exp_text = f"EXP: {game_state.player_stats['exp']}/{required_exp}"
-        exp_surface = font_manager.render_text(exp_text, 18, (255, 255, 255))
-        self.screen.blit(exp_surface, (80, self.screen_height - 65))
+        hud.add(TextWidget((10, bottom - 65),
+                           lambda game_state, player: (f"Lv.{game_state.player_stats['level']}", (255, 255, 255)),
+                           18))
+        hud.add(TextWidget((80, bottom - 65),
+                           lambda game_state, player: (f"EXP: {game_state.player_stats['exp']}/{game_state.player_stats['level'] * 100}", (255, 255, 255)),
+                           18))
         
         # 經驗值條 - 視覺化經驗值條
-        exp_ratio = game_state.player_stats['exp'] / required_exp
-        exp_bar_width = 150
-        exp_bar_height = 8
-        exp_bar_x = 250
-        exp_bar_y = self.screen_height - 60
-        
-        # 經驗值條背景
-        exp_bg_rect = pygame.Rect(exp_bar_x, exp_bar_y, exp_bar_width, exp_bar_height)
-        pygame.draw.rect(self.screen, (50, 50, 50), exp_bg_rect)
-        
-        # 經驗值條
-        exp_rect = pygame.Rect(exp_bar_x, exp_bar_y, exp_bar_width * exp_ratio, exp_bar_height)
-        pygame.draw.rect(self.screen, (0, 255, 255), exp_rect)
-        
-        # 🆕 角色資訊顯示
-        character_name = player.get_character_name()
-        character_text = f"🎭 {character_name}"
-        character_surface = font_manager.render_text(character_text, 16, (255, 150, 255))
-        self.screen.blit(character_surface, (10, self.screen_height - 90))
-        
-        # 🆕 角色屬性顯示（顯示速度）
-        character_stats = player.get_character_stats()
-        speed_text = f"速度: {character_stats.get('speed', 8)}"
-        speed_surface = font_manager.render_text(speed_text, 14, (150, 255, 150))
-        self.screen.blit(speed_surface, (150, self.screen_height - 90))
+        hud.add(BarWidget(pygame.Rect(250, bottom - 60, 150, 8),
+                          lambda game_state, player: (game_state.player_stats["exp"], game_state.player_stats["level"] * 100),
+                          (50, 50, 50), (0, 255, 255)))
+        
+        # 🆕 角色資訊顯示和屬性（速度）
+        hud.add(TextWidget((10, bottom - 90),
+                           lambda game_state, player: (f"🎭 {player.get_character_name()}", (255, 150, 255)),
+                           16))
+        hud.add(TextWidget((150, bottom - 90),
+                           lambda game_state, player: (f"速度: {player.get_character_stats().get('speed', 8)}", (150, 255, 150)),
+                           14))
         
         # 🎵 音效狀態顯示 (右上角)
         sound_status_x = self.screen_width - 200
         sound_status_y = 50
-        
-        music_status = "🎵ON" if sound_manager.is_music_enabled else "🎵OFF"
-        music_color = (100, 255, 100) if sound_manager.is_music_enabled else (255, 100, 100)
-        music_surface = font_manager.render_text(music_status, 14, music_color)
-        self.screen.blit(music_surface, (sound_status_x, sound_status_y))
-        
-        sfx_status = "🔊ON" if sound_manager.is_sfx_enabled else "🔊OFF"
-        sfx_color = (100, 255, 100) if sound_manager.is_sfx_enabled else (255, 100, 100)
-        sfx_surface = font_manager.render_text(sfx_status, 14, sfx_color)
-        self.screen.blit(sfx_surface, (sound_status_x + 60, sound_status_y))
+        hud.add(TextWidget((sound_status_x, sound_status_y),
+                           lambda game_state, player: ("🎵ON", (100, 255, 100)) if sound_manager.is_music_enabled else ("🎵OFF", (255, 100, 100)),
+                           14))
+        hud.add(TextWidget((sound_status_x + 60, sound_status_y),
+                           lambda game_state, player: ("🔊ON", (100, 255, 100)) if sound_manager.is_sfx_enabled else ("🔊OFF", (255, 100, 100)),
+                           14))
         
         # 音量顯示
-        music_vol_text = f"M:{int(sound_manager.music_volume * 100)}%"
-        music_vol_surface = font_manager.render_text(music_vol_text, 12, (200, 200, 200))
-        self.screen.blit(music_vol_surface, (sound_status_x, sound_status_y + 20))
-        
-        sfx_vol_text = f"S:{int(sound_manager.sfx_volume * 100)}%"
-        sfx_vol_surface = font_manager.render_text(sfx_vol_text, 12, (200, 200, 200))
-        self.screen.blit(sfx_vol_surface, (sound_status_x + 60, sound_status_y + 20))
-        
-        # 道具狀態
-        item_y = 10
-        if self.has_keycard:
-            keycard_text = "🔑 鑰匙卡"
-            keycard_surface = font_manager.render_text(keycard_text, 18, (255, 255, 0))
-            self.screen.blit(keycard_surface, (10, item_y))
-            item_y += 25
+        hud.add(TextWidget((sound_status_x, sound_status_y + 20),
+                           lambda game_state, player: (f"M:{int(sound_manager.music_volume * 100)}%", (200, 200, 200)),
+                           12))
+        hud.add(TextWidget((sound_status_x + 60, sound_status_y + 20),
+                           lambda game_state, player: (f"S:{int(sound_manager.sfx_volume * 100)}%", (200, 200, 200)),
+                           12))
+        
+        # 道具狀態（解藥的位置取決於是否有鑰匙卡，所以合成一張）
+        hud.add(HudWidget((10, 10),
+                          lambda game_state, player: (self.has_keycard, self.has_antidote),
+                          self.compose_item_badges))
+        
+        # 操作提示（對話中隱藏）
+        hud.add(HudWidget((self.screen_width - 150, 10),
+                          lambda game_state, player: self.dialogue_active,
+                          self.compose_control_hints))
+        return hud
+    
+    def compose_item_badges(self, value):
+        """🆕 合成道具狀態標示"""
+        has_keycard, has_antidote = value
+        badges = []
+        if has_keycard:
+            badges.append(font_manager.render_text("🔑 鑰匙卡", 18, (255, 255, 0)))
+        if has_antidote:
+            badges.append(font_manager.render_text("💉 解藥", 18, (0, 255, 0)))
+        if not badges:
+            return None
+        
+        surface = pygame.Surface((max(badge.get_width() for badge in badges),
+                                  25 * (len(badges) - 1) + badges[-1].get_height()), pygame.SRCALPHA)
+        for i, badge in enumerate(badges):
+            surface.blit(badge, (0, i * 25), special_flags=pygame.BLEND_RGBA_MAX)
+        return surface
+    
+    def compose_control_hints(self, dialogue_active):
+        """🆕 合成操作提示"""
+        if dialogue_active:
+            return None
+        
+        controls = [
+            "方向鍵: 移動",
+            "空白鍵: 互動",
+            "I: 背包",
+            "M: 地圖",
+            "F6: 音樂 F7: 音效"  # 🎵 新增音效控制提示
+        ]
         
-        if self.has_antidote:
-            antidote_text = "💉 解藥"
-            antidote_surface = font_manager.render_text(antidote_text, 18, (0, 255, 0))
-            self.screen.blit(antidote_surface, (10, item_y))
+        surfaces = []
+        for control in controls:
+            color = (100, 255, 255) if "F6:" in control or "F7:" in control else (200, 200, 200)
+            surfaces.append(font_manager.render_text(control, 16 if "F6:" in control else 18, color))
         
-        # 操作提示
-        if not self.dialogue_active:
-            controls = [
-                "方向鍵: 移動",
-                "空白鍵: 互動",
-                "I: 背包",
-                "M: 地圖",
-                "F6: 音樂 F7: 音效"  # 🎵 新增音效控制提示
-            ]
-            
-            for i, control in enumerate(controls):
-                color = (100, 255, 255) if "F6:" in control or "F7:" in control else (200, 200, 200)
-                control_surface = font_manager.render_text(control, 16 if "F6:" in control else 18, color)
-                self.screen.blit(control_surface, (self.screen_width - 150, 10 + i * 20))
+        surface = pygame.Surface((max(item.get_width() for item in surfaces),
+                                  20 * (len(surfaces) - 1) + surfaces[-1].get_height()), pygame.SRCALPHA)
+        for i, item in enumerate(surfaces):
+            surface.blit(item, (0, i * 20), special_flags=pygame.BLEND_RGBA_MAX)
+        return surface
+    
+    def render_hud(self, game_state, player):
+        """渲染 HUD - 🆕 只有綁定的值改變的元件才會重新組合"""
+        self.hud.draw(self.screen, game_state, player)
     
     def render_messages(self, game_state):
         # 渲染遊戲訊息
@@ -774,27 +501,9 @@ class UI:
         # 對話文字
         y_offset = self.dialogue_box_y + 10
         
-        # 分行顯示對話文字
-        words = self.dialogue_text.split()
-        lines = []
-        current_line = ""
-        
-        for word in words:
-            test_line = current_line + word + " "
-            if font_manager.get_font(24).size(test_line)[0] < self.screen_width - 40:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line.strip())
-                current_line = word + " "
-        
-        if current_line:
-            lines.append(current_line.strip())
-        
-        for line in lines:
-            text_surface = font_manager.render_text(line, 24, (255, 255, 255))
-            self.screen.blit(text_surface, (20, y_offset))
-            y_offset += 25
+        # 🆕 打字機效果：已顯示的字保存在離屏 Surface，每幀只 blit 一次
+        self.typewriter.draw(self.screen, (20, y_offset))
+        y_offset += self.typewriter.get_height()
         
         # 選項
         y_offset += 10